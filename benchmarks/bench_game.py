@@ -0,0 +1,69 @@
+"""
+bench_game.py
+
+Benchmarks for the Game class, offscreen: the latency of restarting from the
+game-over screen, and the CPU used while sitting in the main menu.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import time
+
+from harness import metric, timing_metrics, init_display
+
+import pygame
+
+import settings
+
+RESTART_REPEAT = 20
+MENU_SECONDS = 2
+
+def bench_restart():
+    """
+    Times pressing Enter on the game-over screen until the new session is ready.
+    """
+    init_display()
+    import game
+
+    session = game.Game(seed=1)
+    samples = []
+    for _ in range(RESTART_REPEAT):
+        session.state = "game-over"
+        session.shown_state = "game-over"
+        pygame.event.clear()
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN))
+
+        start = time.perf_counter()
+        session.game_over()
+        samples.append(time.perf_counter() - start)
+    session.quit()
+
+    metrics = timing_metrics("restart", samples)
+    metrics["restart_p95"]["budget"] = settings.RESTART_BUDGET_MS
+    return metrics
+
+def bench_menu():
+    """
+    Measures the share of a CPU core used while the main menu is shown and
+    no input arrives.
+    """
+    init_display()
+    import game
+
+    session = game.Game(seed=1)
+    pygame.event.clear()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    while time.perf_counter() - wall_start < MENU_SECONDS:
+        session.main_menu()
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    session.quit()
+    return {"menu.cpu": metric(cpu * 100, "%", slack=2)}
+
+BENCHMARKS = {
+    "restart": bench_restart,
+    "menu": bench_menu,
+}
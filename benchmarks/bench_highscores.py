@@ -0,0 +1,64 @@
+"""
+bench_highscores.py
+
+Benchmarks for the high-score pipeline: the time submit() takes on the game
+loop, leaderboard queries against a store of a million runs, and upload
+throughput to the stand-in leaderboard server.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import random
+import tempfile
+import time
+
+from harness import metric, timing_metrics, time_calls
+
+import settings
+from highscores import HighScores, ScoreStore, LeaderboardServer
+
+STORE_RUNS = 1_000_000      # Runs in the store the leaderboard queries run against
+QUERY_REPEAT = 1000
+SUBMIT_RUNS = 1000          # Runs submitted (and uploaded) by the submit benchmark
+
+def bench_highscores():
+    """
+    Times submit() and the upload of the submitted runs to a stand-in server,
+    then top-K queries against a large store.
+    """
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # Submitting: the game loop only pays for queueing the run
+        server = LeaderboardServer().start()
+        scores = HighScores(os.path.join(directory, "submit.db"), endpoint=server.url())
+        rng = random.Random(1)
+        start = time.perf_counter()
+        samples = time_calls(lambda: scores.submit(rng.randrange(10_000), 1, 600), SUBMIT_RUNS)
+        while server.count() < SUBMIT_RUNS:
+            time.sleep(0.001)
+        upload_time = time.perf_counter() - start
+        scores.close()
+        server.close()
+        metrics.update(timing_metrics("highscores.submit", samples, unit="us", scale=1_000_000))
+        metrics["highscores.uploads_per_second"] = metric(SUBMIT_RUNS / upload_time, "runs/s", lower_is_better=False)
+
+        # Querying the leaderboard of a large store
+        store = ScoreStore(os.path.join(directory, "large.db"))
+        with store.connection:
+            store.connection.executemany(
+                "INSERT INTO runs (score, seed, frames, finished, uploaded) VALUES (?, 0, 0, 0, 1)",
+                ((rng.randrange(10_000_000),) for _ in range(STORE_RUNS))
+            )
+        samples = time_calls(lambda: store.top(settings.HIGH_SCORE_TOP), QUERY_REPEAT)
+        metrics.update(timing_metrics("highscores.top", samples, unit="us", scale=1_000_000))
+        samples = time_calls(lambda: store.pending(settings.HIGH_SCORE_BATCH), QUERY_REPEAT)
+        metrics.update(timing_metrics("highscores.pending", samples, unit="us", scale=1_000_000))
+        store.close()
+    return metrics
+
+BENCHMARKS = {
+    "highscores": bench_highscores,
+}
@@ -0,0 +1,202 @@
+"""
+bench_rendering.py
+
+Benchmarks for rendering, offscreen: PlatformStore.draw and Player.render
+throughput, the time to render a whole frame of the game (alone, or split
+between four players), what racing ghosts adds to it, and baking and drawing animations against transforming their
+frames while drawing.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import tempfile
+import time
+
+from harness import metric, timing_metrics, time_calls, init_display
+
+import pygame
+
+import settings
+
+DRAW_REPEAT = 20_000
+FRAME_REPEAT = 600
+FRAME_SEED = 1
+GHOST_COUNT = 64            # Ghosts raced by the ghosts benchmark
+SPLIT_PLAYERS = 4           # Players sharing the screen in the split benchmark
+
+def throughput(function, repeat):
+    """
+    Returns how many times per second a function can be called.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return repeat / (time.perf_counter() - start)
+
+def bench_draw():
+    """
+    Measures how many platforms and players can be drawn per second.
+    """
+    init_display()
+    import game
+
+    session = game.Game(seed=FRAME_SEED)
+    screen = session.screen
+    simulation = session.simulation
+    store = simulation.pool.store
+    player = simulation.player
+
+    # Every platform on the first screen, drawn in one batch
+    high = settings.SCREEN_HEIGHT / settings.PIXELS_PER_METER
+    visible = len(store.visible(0, high))
+
+    def draw_platforms():
+        store.draw(screen, session.platform_sprites, 0, 0, high)
+
+    return {
+        "draw.platforms_per_second": metric(
+            throughput(draw_platforms, DRAW_REPEAT // visible) * visible, "draws/s", lower_is_better=False
+        ),
+        "draw.players_per_second": metric(
+            throughput(lambda: player.render(screen, 0, 0.5), DRAW_REPEAT), "draws/s", lower_is_better=False
+        ),
+    }
+
+def bench_frame():
+    """
+    Times the rendering of whole frames (Game.render and the display update)
+    while the simulation advances.
+    """
+    init_display()
+    import game
+
+    session = game.Game(seed=FRAME_SEED)
+    simulation = session.simulation
+
+    def frame():
+        simulation.step()
+        changed = session.render(0.5)
+        if changed is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(changed)
+
+    return timing_metrics("frame", time_calls(frame, FRAME_REPEAT))
+
+def bench_split():
+    """
+    Times whole frames (a step, Game.render and the display update) of a
+    split-screen game, with a climber bot steering every player so their
+    views drift apart, against settings.FRAME_BUDGET.
+    """
+    init_display()
+    import game
+    from headless import climber_bot
+
+    session = game.Game(seed=FRAME_SEED, players=SPLIT_PLAYERS)
+    simulation = session.simulation
+    bots = [climber_bot(FRAME_SEED, index) for index in range(SPLIT_PLAYERS)]
+
+    def frame():
+        if not simulation.step([bot(simulation) for bot in bots]):
+            simulation.reset(FRAME_SEED)
+        session.render(0.5)
+        pygame.display.flip()
+
+    metrics = timing_metrics("split.frame", time_calls(frame, FRAME_REPEAT))
+    metrics["split.frame_p95"]["budget"] = settings.FRAME_BUDGET * 1000
+    return metrics
+
+def bench_ghosts():
+    """
+    Times whole frames with GHOST_COUNT ghosts of random runs on the same seed,
+    against the same frames without ghosts.
+    """
+    init_display()
+    import game
+    from ghosts import GhostWriter, save_ghost
+    from headless import BOTS
+    from simulation import Simulation
+
+    def frame_times(session):
+        simulation = session.simulation
+
+        def frame():
+            simulation.step()
+            session.render(0.5)
+            pygame.display.flip()  # The whole screen, so both runs update the same area
+
+        return time_calls(frame, FRAME_REPEAT)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(GHOST_COUNT):
+            simulation = Simulation(FRAME_SEED, background=False)
+            bot = BOTS["random"](i)
+            writer = GhostWriter(FRAME_SEED)
+            while simulation.step(bot(simulation)) and simulation.frame < FRAME_REPEAT:
+                writer.record(simulation.frame, *simulation.player.body.position)
+            writer.record(simulation.frame, *simulation.player.body.position)
+            save_ghost(writer, simulation.score, directory, keep=GHOST_COUNT)
+
+        plain = frame_times(game.Game(seed=FRAME_SEED))
+        session = game.Game(seed=FRAME_SEED, ghost_dirs=[directory])
+        raced = frame_times(session)
+        session.race.close()
+
+    metrics = timing_metrics("ghosts.frame", raced)
+    metrics["ghosts.frame_overhead"] = metric(
+        (sum(raced) - sum(plain)) / FRAME_REPEAT * 1000, "ms", slack=0.5
+    )
+    return metrics
+
+def bench_animation():
+    """
+    Times baking every animation set, and drawing the player with gear from
+    the baked frames against scaling, mirroring and rotating its frames at
+    draw time.
+    """
+    init_display()
+    from animation import PlayerAnimator, bake_animation
+    from assets import AssetManager
+
+    assets = AssetManager()
+    screen = pygame.display.get_surface()
+    start = time.perf_counter()
+    sets = {name: bake_animation(assets, name) for name in settings.ANIMATIONS}
+    bake = time.perf_counter() - start
+
+    animator = PlayerAnimator(sets["space"], sets["jetpack"]["worn"])
+    animator.clock.play("jump")
+    animator.mirrored = True
+    animator.lean = 1
+
+    body = assets.image("space-left@2x.png")
+    gear = [assets.tile(sheet, rect) for sheet, rect in settings.ANIMATIONS["jetpack"]["clips"]["worn"]]
+    frame = 0
+
+    def transformed():
+        # What drawing costs without baking, for comparison
+        nonlocal frame
+        frame += 1
+        for image in (gear[frame % len(gear)], body):
+            width, height = image.get_size()
+            size = (round(width * settings.PLAYER_SCALE[0]), round(height * settings.PLAYER_SCALE[1]))
+            image = pygame.transform.flip(pygame.transform.smoothscale(image, size), True, False)
+            screen.blit(pygame.transform.rotozoom(image, -settings.ANIMATION_LEAN / 3, 1), (300, 400))
+
+    baked = throughput(lambda: animator.draw(screen, 300, 400), DRAW_REPEAT)
+    return {
+        "animation.bake": metric(bake * 1000, "ms"),
+        "animation.draws_per_second": metric(baked, "draws/s", lower_is_better=False),
+        "animation.speedup": metric(baked / throughput(transformed, DRAW_REPEAT // 20), "x", lower_is_better=False),
+    }
+
+BENCHMARKS = {
+    "draw": bench_draw,
+    "frame": bench_frame,
+    "split": bench_split,
+    "ghosts": bench_ghosts,
+    "animation": bench_animation,
+}
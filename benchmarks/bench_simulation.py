@@ -0,0 +1,109 @@
+"""
+bench_simulation.py
+
+Benchmarks for the simulation: a long seeded climb, the cost of a world step
+against the number of platforms in the world, and the cost of a snapshot.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import time
+
+from harness import metric, timing_metrics, rss_bytes
+
+import Box2D
+
+import settings
+from simulation import Simulation
+from player import Player
+from platforms import PlatformPool
+
+CLIMB_HEIGHT = 10_000       # Meters climbed by the climb benchmark
+CLIMB_SPEED = 30            # Meters per second the player is carried up at
+CLIMB_SEED = 1
+STEP_PLATFORM_COUNTS = (10, 100, 1000)
+STEP_REPEAT = 600
+SNAPSHOT_STEPS = 600        # Steps climbed before snapshotting, one snapshot per step
+
+def bench_climb():
+    """
+    Carries the player straight up to CLIMB_HEIGHT meters through seeded
+    platforms, timing every step. The body count and memory must stay flat
+    however high the player goes.
+    """
+    simulation = Simulation(CLIMB_SEED)
+    player = simulation.player.body
+
+    samples = []
+    rss_start = rss_bytes()
+    while player.position.y < CLIMB_HEIGHT and not simulation.game_over:
+        player.linearVelocity = (0, CLIMB_SPEED)
+        start = time.perf_counter()
+        simulation.step()
+        samples.append(time.perf_counter() - start)
+    rss_growth = rss_bytes() - rss_start
+
+    metrics = timing_metrics("climb.step", samples)
+    metrics["climb.steps_per_second"] = metric(len(samples) / sum(samples), "steps/s", lower_is_better=False)
+    metrics["climb.bodies"] = metric(simulation.world.bodyCount, "bodies")
+    metrics["climb.rss_growth"] = metric(rss_growth / 2 ** 20, "MB", slack=2)
+    return metrics
+
+def bench_step():
+    """
+    Times world.Step with an increasing number of active platforms around a
+    falling player.
+    """
+    metrics = {}
+    for count in STEP_PLATFORM_COUNTS:
+        world = Box2D.b2.world(gravity=settings.GRAVITY, doSleep=True)
+        Player(world)
+        pool = PlatformPool(world, size=count)
+        for i in range(count):
+            x = (i % 10 + 0.5) * settings.SCREEN_WIDTH / 10 / settings.PIXELS_PER_METER
+            pool.acquire(x, i // 10).set_active(True)
+
+        samples = []
+        for _ in range(STEP_REPEAT):
+            start = time.perf_counter()
+            world.Step(settings.PHYSICS_STEP, 6, 2)
+            samples.append(time.perf_counter() - start)
+        metrics.update(timing_metrics(f"step.{count}_platforms", samples, unit="us", scale=1_000_000))
+    return metrics
+
+def bench_snapshot():
+    """
+    Times capturing a snapshot after every step of a short climb, then
+    restoring each of them, newest first, as rewinding does.
+    """
+    simulation = Simulation(CLIMB_SEED)
+    player = simulation.player.body
+
+    capture_samples = []
+    snapshots = []
+    for _ in range(SNAPSHOT_STEPS):
+        player.linearVelocity = (0, CLIMB_SPEED)
+        simulation.step()
+        start = time.perf_counter()
+        snapshots.append(simulation.snapshot())
+        capture_samples.append(time.perf_counter() - start)
+
+    restore_samples = []
+    for data in reversed(snapshots):
+        start = time.perf_counter()
+        simulation.restore(data)
+        restore_samples.append(time.perf_counter() - start)
+    simulation.close()
+
+    metrics = timing_metrics("snapshot.capture", capture_samples, unit="us", scale=1_000_000)
+    metrics.update(timing_metrics("snapshot.restore", restore_samples, unit="us", scale=1_000_000))
+    metrics["snapshot.size"] = metric(max(map(len, snapshots)), "bytes")
+    return metrics
+
+BENCHMARKS = {
+    "climb": bench_climb,
+    "step": bench_step,
+    "snapshot": bench_snapshot,
+}
@@ -0,0 +1,69 @@
+"""
+bench_startup.py
+
+Benchmarks for cold startup, each measured in a fresh interpreter: importing
+the game's modules, everything src/main.py does before the main menu is on
+screen (held to settings.STARTUP_BUDGET_MS), and until the gameplay images it
+loads while the menu is up are ready.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import subprocess
+import sys
+import time
+
+from harness import SRC, metric, percentile
+import settings
+
+STARTUP_REPEAT = 5
+
+# Imports what src/main.py imports to play
+IMPORT_PROBE = "import pygame, Box2D, game"
+
+# Initializes pygame, creates the Game and shows the main menu, as src/main.py does
+MENU_PROBE = """
+import pygame
+import game
+pygame.display.init()
+pygame.font.init()
+session = game.Game(background_load=True)
+session.show(session.main_menu_screen)
+"""
+
+# Then waits for the gameplay images
+PLAY_PROBE = MENU_PROBE + """
+session.wait_for_assets()
+"""
+
+def run_probe(code):
+    """
+    Runs code in a fresh interpreter (with src/ as the working directory) and
+    returns the wall time it took, in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=SRC)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=SRC, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def bench_startup():
+    """
+    Times cold imports and time-to-menu, keeping the median of several runs.
+    """
+    run_probe("pass")  # Warm the file system cache
+    interpreter = percentile([run_probe("pass") for _ in range(STARTUP_REPEAT)], 0.5)
+    imports = percentile([run_probe(IMPORT_PROBE) for _ in range(STARTUP_REPEAT)], 0.5)
+    menu = percentile([run_probe(MENU_PROBE) for _ in range(STARTUP_REPEAT)], 0.5)
+    play = percentile([run_probe(PLAY_PROBE) for _ in range(STARTUP_REPEAT)], 0.5)
+    return {
+        "startup.imports": metric((imports - interpreter) * 1000, "ms"),
+        "startup.time_to_menu": metric((menu - interpreter) * 1000, "ms", budget=settings.STARTUP_BUDGET_MS),
+        "startup.time_to_play": metric((play - interpreter) * 1000, "ms"),
+    }
+
+BENCHMARKS = {
+    "startup": bench_startup,
+}
@@ -0,0 +1,95 @@
+"""
+harness.py
+
+This module contains the helpers shared by the benchmarks: offscreen setup,
+timing statistics and memory measurement.
+
+Importing it points SDL at its dummy video and audio drivers and puts src/ on
+the import path, so the benchmarks run the real game code without a window.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+from utils import percentile
+
+def metric(value, unit, lower_is_better=True, slack=0, budget=None):
+    """
+    Returns a metric as stored in the results JSON.
+
+    Args:
+        value: The measured value.
+        unit: The unit of the value (e.g. "ms", "MB", "steps/s").
+        lower_is_better: Whether a smaller value is an improvement.
+        slack: A change (in the metric's unit) that never counts as a
+               regression, for metrics whose baseline is close to zero.
+        budget: An optional hard limit the value must stay within (below it
+                if lower is better), whatever the baseline.
+    """
+    return {"value": value, "unit": unit, "lower_is_better": lower_is_better, "slack": slack, "budget": budget}
+
+def timing_metrics(prefix, samples, unit="ms", scale=1000):
+    """
+    Returns the p50/p95/p99 of a list of durations as metrics.
+
+    Args:
+        prefix: The name the metrics start with (e.g. "climb.step").
+        samples: The durations, in seconds.
+        unit: The unit the metrics are reported in.
+        scale: The factor converting seconds to that unit.
+    """
+    return {
+        f"{prefix}_{label}": metric(percentile(samples, fraction) * scale, unit)
+        for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+    }
+
+def time_calls(function, repeat):
+    """
+    Calls a function repeatedly and returns the duration of every call, in seconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def rss_bytes():
+    """
+    Returns the resident set size of the process, in bytes (Linux), or its
+    peak resident set size on other platforms.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def init_display():
+    """
+    Initializes pygame with an offscreen display of the game's size.
+
+    Returns:
+        The display surface.
+    """
+    import pygame
+    import settings
+
+    pygame.init()
+    return pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
@@ -0,0 +1,160 @@
+"""
+run.py
+
+Runs the benchmark suite offscreen, compares it with a saved baseline and fails
+when a metric regresses past a threshold or exceeds its budget (such as
+settings.RESTART_BUDGET_MS for restart_p95).
+
+Each benchmark runs in a fresh interpreter, so benchmarks cannot affect each
+other's memory or timings.
+
+Usage:
+    python benchmarks/run.py --save-baseline     # Record the baseline
+    python benchmarks/run.py                     # Compare against it (exit code 1 on regression)
+    python benchmarks/run.py climb frame         # Run only some benchmarks
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import harness
+import bench_game
+import bench_highscores
+import bench_rendering
+import bench_simulation
+import bench_startup
+
+BENCHMARKS = {
+    **bench_simulation.BENCHMARKS,
+    **bench_rendering.BENCHMARKS,
+    **bench_game.BENCHMARKS,
+    **bench_startup.BENCHMARKS,
+    **bench_highscores.BENCHMARKS,
+}
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(DIRECTORY, "baseline.json")
+RESULTS = os.path.join(DIRECTORY, "results", "latest.json")
+
+def run_benchmark(name):
+    """
+    Runs one benchmark in a fresh interpreter.
+
+    Returns:
+        The benchmark's metrics dictionary.
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+def compare(results, baseline, threshold):
+    """
+    Compares results with a baseline.
+
+    Args:
+        results: The metrics of this run.
+        baseline: The metrics of the baseline.
+        threshold: The relative change past which a metric has regressed (e.g. 0.25).
+
+    Returns:
+        A list of (name, baseline value, value, change, regressed) tuples, one
+        per metric present in both.
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        value, base = current["value"], previous["value"]
+        change = (value - base) / base if base else 0
+        if current["lower_is_better"]:
+            regressed = value > base * (1 + threshold) + current["slack"]
+        else:
+            regressed = value < base * (1 - threshold) - current["slack"]
+        rows.append((name, base, value, change, regressed))
+    return rows
+
+def over_budget(results):
+    """
+    Returns the names of the metrics outside their budget.
+    """
+    names = []
+    for name, current in results.items():
+        budget = current.get("budget")
+        if budget is None:
+            continue
+        if (current["value"] > budget) if current["lower_is_better"] else (current["value"] < budget):
+            names.append(name)
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Pydood Jump benchmark suite")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change that counts as a regression")
+    parser.add_argument("--child", metavar="NAME", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Inside the interpreter of a single benchmark
+    if args.child:
+        print(json.dumps(BENCHMARKS[args.child]()))
+        return 0
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        print(f"Running {name}...", flush=True)
+        results.update(run_benchmark(name))
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, "w") as file:
+        json.dump(results, file, indent=1)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=1)
+
+    failed = over_budget(results)
+    for name in failed:
+        print(f"{name} is over budget: {results[name]['value']:.3f} {results[name]['unit']} "
+              f"(budget {results[name]['budget']} {results[name]['unit']})")
+
+    if not os.path.exists(args.baseline):
+        for name, current in results.items():
+            print(f"{name:<36}{current['value']:>12.3f} {current['unit']}")
+        print(f"No baseline at {args.baseline}, run with --save-baseline to record one")
+        return 1 if failed else 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    rows = compare(results, baseline, args.threshold)
+    for name, base, value, change, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(f"{name:<36}{base:>12.3f}{value:>12.3f} {results[name]['unit']:<8}{change:>+8.1%}  {flag}")
+
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} metrics regressed by more than {args.threshold:.0%}")
+    return 1 if regressions or failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+animation.py
+
+This module plays animated sprites without transforming images while they are
+drawn: every frame of an animation is scaled, converted, mirrored and rotated
+once, when the animation is baked, and drawing only picks one of the prepared
+surfaces and blits it.
+
+Animation sets are defined in settings.ANIMATIONS: named clips (e.g. the
+player's "stand", "jump" and "fall" poses), each a list of frames taken from
+image files or cut from sprite sheets. Images face left, and facing right is
+their mirror image. The rotated variants lean a sprite into its horizontal
+movement, by up to settings.ANIMATION_LEAN degrees in
+settings.ANIMATION_LEAN_STEPS steps on each side. A frame used by several
+clips is baked once.
+
+AnimationClock:
+- Keeps one entity's position in its current clip. Clocks advance by the
+  simulation's fixed steps, not by wall time, so replays and captures animate
+  identically.
+
+PlayerAnimator:
+- Chooses the player's clip, facing and lean from its velocity and whether it
+  stands on a platform, once per physics step, and draws it with the gear it
+  wears (e.g. a propeller), whose clock runs faster the faster it moves.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import math
+
+import pygame
+
+import settings
+
+class Animation:
+    """
+    A baked clip: every frame, facing either way and at every lean.
+
+    Attributes:
+        fps: The frames played per second at rate 1 (0 for a still clip).
+        loop: Whether the clip loops, or holds its last frame once played.
+        speed_rate: The extra playback rate per m/s of the entity's speed.
+        behind: Whether the clip is drawn behind the entity it is worn by.
+
+    Methods:
+        frame(time, mirrored, lean):
+            Returns the surface to draw and where.
+    """
+    def __init__(self, frames, fps=0, loop=True, speed_rate=0, behind=False):
+        """
+        Args:
+            frames: The baked frames, each a list of two rows (facing left,
+                    then right) of (surface, offset) per lean step.
+            fps: The frames played per second at rate 1.
+            loop: Whether the clip loops.
+            speed_rate: The extra playback rate per m/s of the entity's speed.
+            behind: Whether the clip is drawn behind the entity it is worn by.
+        """
+        self.fps = fps
+        self.loop = loop
+        self.speed_rate = speed_rate
+        self.behind = behind
+        self._frames = frames
+
+    def __len__(self):
+        return len(self._frames)
+
+    def frame(self, time, mirrored=False, lean=0):
+        """
+        Returns the surface to draw at a time in the clip.
+
+        Args:
+            time: The time since the clip started, in seconds (at rate 1).
+            mirrored: Whether the sprite faces right.
+            lean: The lean step, from -settings.ANIMATION_LEAN_STEPS (leaning
+                  right) to settings.ANIMATION_LEAN_STEPS (leaning left).
+
+        Returns:
+            A tuple (surface, offset), offset being the position of the
+            surface's top-left corner relative to the entity's center.
+        """
+        index = int(time * self.fps)
+        index = index % len(self._frames) if self.loop else min(index, len(self._frames) - 1)
+        variants = self._frames[index][mirrored]
+        return variants[lean + len(variants) // 2]
+
+
+def bake_animation(assets, name, lean=settings.ANIMATION_LEAN, lean_steps=settings.ANIMATION_LEAN_STEPS, scale=1):
+    """
+    Bakes the clips of an animation set from settings.ANIMATIONS.
+
+    Args:
+        assets: The AssetManager to load the images from.
+        name: The name of the animation set.
+        lean: The most a sprite leans, in degrees.
+        lean_steps: The number of lean angles on each side of upright.
+        scale: How much smaller or larger than the game's screen the sprites
+               are drawn (e.g. in a split-screen viewport).
+
+    Returns:
+        A dictionary of Animations by clip name.
+    """
+    spec = settings.ANIMATIONS[name]
+    frame_scale = (spec["scale"][0] * scale, spec["scale"][1] * scale)
+    anchor = spec.get("anchor", (0, 0))
+    anchor = (anchor[0] * scale, anchor[1] * scale)
+    angles = [lean * step / lean_steps for step in range(-lean_steps, lean_steps + 1)] if lean_steps else [0]
+    baked = {}
+    clips = {}
+    for clip, sources in spec["clips"].items():
+        frames = []
+        for source in sources:
+            if source not in baked:
+                baked[source] = _bake_frame(assets, source, frame_scale, anchor, angles)
+            frames.append(baked[source])
+        clips[clip] = Animation(frames, spec.get("fps", 0), spec.get("loop", True),
+                                spec.get("speed_rate", 0), spec.get("behind", False))
+    return clips
+
+def _bake_frame(assets, source, scale, anchor, angles):
+    """
+    Loads a frame (a file name, or a sheet and a rectangle on it), scales it,
+    and prepares it facing either way at every angle.
+    """
+    if isinstance(source, str):
+        width, height = assets.image(source).get_size()
+        size = (round(width * scale[0]), round(height * scale[1]))
+        image = assets.image(source, size=size)
+    else:
+        sheet, rect = source
+        size = (round(rect[2] * scale[0]), round(rect[3] * scale[1]))
+        image = assets.tile(sheet, rect, size=size)
+
+    rows = []
+    for mirrored in (False, True):
+        facing = pygame.transform.flip(image, True, False) if mirrored else image
+        anchor_x, anchor_y = (-anchor[0], anchor[1]) if mirrored else anchor
+        row = []
+        for angle in angles:
+            # Rotate counterclockwise around the entity's center, anchor included
+            surface = pygame.transform.rotozoom(facing, angle, 1) if angle else facing
+            radians = math.radians(angle)
+            x = anchor_x * math.cos(radians) + anchor_y * math.sin(radians)
+            y = anchor_y * math.cos(radians) - anchor_x * math.sin(radians)
+            width, height = surface.get_size()
+            row.append((surface, (round(x - width / 2), round(y - height / 2))))
+        rows.append(row)
+    return rows
+
+
+class AnimationClock:
+    """
+    An entity's position in its current clip.
+
+    Attributes:
+        clip: The name of the clip being played.
+        time: The time since the clip started, in seconds at rate 1.
+
+    Methods:
+        play(clip):
+            Switches to a clip, restarting it unless it is already playing.
+        advance(seconds, rate=1):
+            Moves the clock forward.
+    """
+    __slots__ = ("clip", "time")
+
+    def __init__(self):
+        self.clip = None
+        self.time = 0.0
+
+    def play(self, clip):
+        """
+        Switches to a clip, from its start, unless it is already playing.
+        """
+        if clip != self.clip:
+            self.clip = clip
+            self.time = 0.0
+
+    def advance(self, seconds, rate=1.0):
+        """
+        Moves the clock forward by a time, played at a rate.
+        """
+        self.time += seconds * rate
+
+
+class PlayerAnimator:
+    """
+    Animates the player from its physics state.
+
+    The clip is "stand" on a platform, otherwise "jump" while rising and
+    "fall" while falling. The player faces the way it moves (and keeps facing
+    it while still), and leans into its horizontal movement.
+
+    Attributes:
+        clips: The player's Animations by clip name (see bake_animation).
+        gear: The Animation of the gear the player wears, or None.
+        clock: The player's AnimationClock.
+        gear_clock: The gear's AnimationClock.
+        mirrored: Whether the player faces right.
+        lean: The current lean step.
+
+    Methods:
+        step(player):
+            Updates the animation after a physics step.
+        draw(screen, x, y):
+            Draws the player centered on a point.
+    """
+    def __init__(self, clips, gear=None):
+        """
+        Args:
+            clips: The player's Animations by clip name.
+            gear: The Animation of the gear the player wears, if any.
+        """
+        self.clips = clips
+        self.gear = gear
+        self.clock = AnimationClock()
+        self.gear_clock = AnimationClock()
+        self.mirrored = False
+        self.lean = 0
+
+    def step(self, player):
+        """
+        Chooses the clip, facing and lean from the player's state after a
+        physics step, and advances the clocks by the step.
+
+        Args:
+            player: The Player.
+        """
+        velocity_x, velocity_y = player.body.linearVelocity
+        if velocity_x < -settings.ANIMATION_FACING_SPEED:
+            self.mirrored = False
+        elif velocity_x > settings.ANIMATION_FACING_SPEED:
+            self.mirrored = True
+        tilt = max(-1.0, min(1.0, -velocity_x / settings.PLAYER_MAX_SPEED))
+        self.lean = round(tilt * settings.ANIMATION_LEAN_STEPS)
+
+        if player.grounded:
+            self.clock.play("stand")
+        else:
+            self.clock.play("jump" if velocity_y > 0 else "fall")
+        self.clock.advance(settings.PHYSICS_STEP)
+        if self.gear is not None:
+            speed = math.hypot(velocity_x, velocity_y)
+            self.gear_clock.advance(settings.PHYSICS_STEP, 1 + self.gear.speed_rate * speed)
+
+    def draw(self, screen, x, y):
+        """
+        Draws the player (and its gear) centered on a point.
+
+        Args:
+            screen: The Pygame screen to draw on.
+            x: The horizontal position of the player's center, in pixels.
+            y: The vertical position of the player's center, in pixels.
+
+        Returns:
+            The rectangle of the screen drawn to.
+        """
+        surface, (left, top) = self.clips[self.clock.clip or "stand"].frame(self.clock.time, self.mirrored, self.lean)
+        if self.gear is None:
+            return screen.blit(surface, (x + left, y + top))
+
+        gear, (gear_left, gear_top) = self.gear.frame(self.gear_clock.time, self.mirrored, self.lean)
+        if self.gear.behind:
+            drawn = screen.blit(gear, (x + gear_left, y + gear_top))
+            return drawn.union(screen.blit(surface, (x + left, y + top)))
+        drawn = screen.blit(surface, (x + left, y + top))
+        return drawn.union(screen.blit(gear, (x + gear_left, y + gear_top)))
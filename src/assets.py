@@ -0,0 +1,326 @@
+"""
+assets.py
+
+This module contains the AssetManager class, which loads images from the assets
+directory on first use and caches them ready to blit.
+
+AssetManager:
+- Loads an image the first time it is asked for, converts it to the display's
+  pixel format (convert or convert_alpha) and caches it by name and size.
+- Keeps the cache under a memory budget by evicting the least recently used images.
+- Serves images packed into texture atlases transparently, by name. The images
+  cut from a sheet share its pixels, so the sheet is charged to the budget once,
+  and unloaded, while any of them is cached.
+
+build_atlas:
+- Packs a family of images (e.g. every "hop-*" frame) into one sheet plus a JSON
+  index. Run at build time with "python src/assets.py <name> <prefix>...".
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import argparse
+import glob
+import json
+import os
+from collections import OrderedDict
+
+import pygame
+
+import settings
+
+class AssetManager:
+    """
+    Lazily loads and caches converted images.
+
+    Attributes:
+        directory: The directory images are loaded from.
+        budget: The maximum number of bytes of pixel data kept in the cache.
+        used: The number of bytes of pixel data currently cached, counting
+              each atlas sheet in use once.
+
+    Methods:
+        image(name, size=None, alpha=True):
+            Returns the converted (and optionally scaled) image.
+        tile(name, rect, size=None):
+            Returns a region of a tile sheet (optionally scaled).
+        file_name(name):
+            Returns the file an image is loaded from.
+        decode(name):
+            Decodes an image file without converting it.
+        add_decoded(name, surface):
+            Provides a file decoded ahead of time.
+        load_atlas(index_path):
+            Registers the images packed in an atlas.
+        clear():
+            Empties the cache.
+    """
+    def __init__(self, directory=settings.ASSET_DIR, budget=settings.ASSET_CACHE_BUDGET):
+        """
+        Initializes the manager and registers every atlas in the atlas directory.
+
+        Args:
+            directory: The directory images are loaded from.
+            budget: The maximum number of bytes of pixel data to cache.
+        """
+        self.directory = directory
+        self.budget = budget
+        self.used = 0
+        self._cache = OrderedDict()
+        self._atlas_frames = {}
+        self._sheets = {}
+        self._frame_sheets = {}  # The sheet of every cached atlas image, by cache key
+        self._decoded = {}  # Files decoded ahead of time (see add_decoded), by file name
+        self._sheet_users = {}  # The number of cached images cut from each loaded sheet
+
+        for index_path in sorted(glob.glob(os.path.join(directory, settings.ATLAS_SUBDIR, "*.json"))):
+            self.load_atlas(index_path)
+
+    def image(self, name, size=None, alpha=True):
+        """
+        Returns an image ready to blit.
+
+        Args:
+            name: The file name of the image, relative to the assets directory.
+            size: Optional (width, height) to scale the image to.
+            alpha: Whether the image keeps per-pixel alpha (convert_alpha) or
+                   is converted to the opaque display format (convert).
+
+        Returns:
+            The cached pygame Surface.
+        """
+        key = (name, size, alpha)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            return surface
+
+        sheet = None
+        if size is None:
+            surface = self._load(name, alpha)
+            if name in self._atlas_frames:
+                sheet = (self._atlas_frames[name][0], alpha)
+        else:
+            surface = pygame.transform.scale(self.image(name, alpha=alpha), size)
+        self._store(key, surface, sheet)
+        return surface
+
+    def tile(self, name, rect, size=None):
+        """
+        Returns a region of a tile sheet (e.g. one platform of game-tiles@2x.png)
+        ready to blit, with per-pixel alpha.
+
+        Args:
+            name: The file name of the sheet, relative to the assets directory.
+            rect: The (x, y, width, height) of the region on the sheet.
+            size: Optional (width, height) to scale the region to.
+
+        Returns:
+            The cached pygame Surface.
+        """
+        key = (name, tuple(rect), size)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            return surface
+
+        # Copied or scaled, so the region owns its pixels instead of keeping
+        # the whole sheet alive after the sheet is evicted
+        surface = self.image(name).subsurface(rect)
+        if size is not None:
+            surface = pygame.transform.smoothscale(surface, size)
+        else:
+            surface = surface.copy()
+        self._store(key, surface)
+        return surface
+
+    def file_name(self, name):
+        """
+        Returns the file an image is loaded from: the sheet of its atlas if it
+        was packed into one, otherwise its own.
+        """
+        frame = self._atlas_frames.get(name)
+        return frame[0] if frame is not None else name
+
+    def decode(self, name):
+        """
+        Decodes an image file without converting it. Unlike converting, which
+        needs the display, decoding can run on a worker thread.
+
+        Args:
+            name: The file name, relative to the assets directory (see file_name).
+
+        Returns:
+            The decoded pygame Surface.
+        """
+        return pygame.image.load(os.path.join(self.directory, name))
+
+    def add_decoded(self, name, surface):
+        """
+        Provides a file decoded ahead of time (see decode), so loading the
+        images it holds only has to convert them.
+
+        Args:
+            name: The file name, relative to the assets directory.
+            surface: The decoded pygame Surface.
+        """
+        self._decoded[name] = surface
+
+    def _load(self, name, alpha):
+        """
+        Loads and converts an image from its atlas or from its own file.
+        """
+        frame = self._atlas_frames.get(name)
+        if frame is not None:
+            sheet_name, rect = frame
+            sheet = self._sheets.get((sheet_name, alpha))
+            if sheet is None:
+                sheet = self._sheets[(sheet_name, alpha)] = self._load_file(sheet_name, alpha)
+            return sheet.subsurface(rect)
+        return self._load_file(name, alpha)
+
+    def _load_file(self, name, alpha):
+        """
+        Loads an image file (unless it was decoded ahead of time) and converts
+        it to the display format.
+        """
+        surface = self._decoded.pop(name, None)
+        if surface is None:
+            surface = self.decode(name)
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def _store(self, key, surface, sheet=None):
+        """
+        Caches a surface, evicting the least recently used ones to stay within budget.
+
+        Args:
+            key: The cache key.
+            surface: The surface to cache.
+            sheet: The key of the atlas sheet in _sheets the surface was cut
+                   from, if it was.
+        """
+        while self._cache and self.used + self._charge(surface, sheet) > self.budget:
+            self._evict()
+        self.used += self._charge(surface, sheet)
+        self._cache[key] = surface
+        if sheet is not None:
+            self._sheets.setdefault(sheet, surface.get_parent())
+            self._frame_sheets[key] = sheet
+            self._sheet_users[sheet] = self._sheet_users.get(sheet, 0) + 1
+
+    def _charge(self, surface, sheet):
+        """
+        Returns the number of bytes caching a surface adds: its own pixels, or
+        for an image cut from an atlas sheet, the sheet's unless another cached
+        image already keeps the sheet loaded.
+        """
+        if sheet is None:
+            return self._size(surface)
+        return 0 if sheet in self._sheet_users else self._size(surface.get_parent())
+
+    def _evict(self):
+        """
+        Drops the least recently used surface from the cache, and the atlas
+        sheet it was cut from if no other cached image uses the sheet.
+        """
+        key, surface = self._cache.popitem(last=False)
+        sheet = self._frame_sheets.pop(key, None)
+        if sheet is None:
+            self.used -= self._size(surface)
+            return
+        self._sheet_users[sheet] -= 1
+        if not self._sheet_users[sheet]:
+            del self._sheet_users[sheet]
+            self.used -= self._size(self._sheets.pop(sheet))
+
+    @staticmethod
+    def _size(surface):
+        """
+        Returns the number of bytes of pixel data of a surface.
+        """
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def load_atlas(self, index_path):
+        """
+        Registers the images packed in an atlas, so that image() serves them
+        from the atlas sheet instead of their own files.
+
+        Args:
+            index_path: The path of the atlas's JSON index (see build_atlas).
+        """
+        with open(index_path) as file:
+            index = json.load(file)
+        sheet = os.path.relpath(os.path.join(os.path.dirname(index_path), index["image"]), self.directory)
+        for name, rect in index["frames"].items():
+            self._atlas_frames[name] = (sheet, pygame.Rect(rect))
+
+    def clear(self):
+        """
+        Empties the cache and unloads every atlas sheet.
+        """
+        self._cache.clear()
+        self._sheets.clear()
+        self._frame_sheets.clear()
+        self._sheet_users.clear()
+        self._decoded.clear()
+        self.used = 0
+
+
+def build_atlas(directory, names, output_path, max_width=2048, padding=2):
+    """
+    Packs images into a single sheet, row by row (tallest first), and writes
+    the sheet and a JSON index mapping each image name to its rectangle.
+
+    Args:
+        directory: The directory the images are read from.
+        names: The file names of the images to pack.
+        output_path: The path of the sheet to write (the index is written next
+                     to it, with a .json extension).
+        max_width: The maximum width of the sheet, in pixels.
+        padding: The number of empty pixels between images.
+
+    Returns:
+        The frames dictionary written to the index.
+    """
+    images = {name: pygame.image.load(os.path.join(directory, name)) for name in names}
+    order = sorted(images, key=lambda name: images[name].get_height(), reverse=True)
+
+    frames = {}
+    x = y = row_height = width = 0
+    for name in order:
+        image_width, image_height = images[name].get_size()
+        if x and x + image_width > max_width:
+            x = 0
+            y += row_height + padding
+            row_height = 0
+        frames[name] = [x, y, image_width, image_height]
+        x += image_width + padding
+        row_height = max(row_height, image_height)
+        width = max(width, x)
+
+    sheet = pygame.Surface((max(width - padding, 1), max(y + row_height, 1)), pygame.SRCALPHA)
+    for name, (x, y, _, _) in frames.items():
+        sheet.blit(images[name], (x, y))
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    pygame.image.save(sheet, output_path)
+    with open(os.path.splitext(output_path)[0] + ".json", "w") as file:
+        json.dump({"image": os.path.basename(output_path), "frames": frames}, file, indent=1)
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack asset families into texture atlases")
+    parser.add_argument("name", help="name of the atlas, e.g. hop")
+    parser.add_argument("prefixes", nargs="+", help="file name prefixes of the images to pack, e.g. hop- propeller")
+    args = parser.parse_args()
+
+    names = sorted(
+        name for name in os.listdir(settings.ASSET_DIR)
+        if name.endswith(".png") and name.startswith(tuple(args.prefixes))
+    )
+    output = os.path.join(settings.ASSET_DIR, settings.ATLAS_SUBDIR, f"{args.name}.png")
+    frames = build_atlas(settings.ASSET_DIR, names, output)
+    print(f"Packed {len(frames)} images into {output}")
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+background.py
+
+This module contains the Background class, which draws the scrolling
+background behind the game.
+
+The background image is scaled to the screen's width (or a split-screen
+viewport's) and converted once, then
+tiled vertically into a pre-composited strip, so any scroll position is a single
+rectangle of that strip. It scrolls with the camera at a parallax factor.
+Frames after the first reuse what is already on the screen: the areas sprites
+were drawn over are repainted, then, if the background scrolled, the screen is
+scrolled in place and only the strip it uncovered is copied from the cache.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import math
+
+import pygame
+
+import settings
+
+class Background:
+    """
+    A vertically tiled background that scrolls with the camera.
+
+    Attributes:
+        parallax: How fast the background scrolls relative to the camera
+                  (0 keeps it still, 1 moves it with the platforms).
+        width, height: The size of the screen (or viewport) drawn to, in pixels.
+        scale: The size of the screen drawn to relative to the game's.
+        tile_height: The height of one tile of the scaled image, in pixels.
+
+    Methods:
+        draw(screen, camera_offset, dirty):
+            Draws the background, entirely or by updating the last frame's.
+        set_parallax(parallax, camera_offset):
+            Changes the scroll speed without moving the background.
+    """
+    def __init__(self, image, parallax=settings.BACKGROUND_PARALLAX,
+                 size=(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)):
+        """
+        Prescales the image to the screen's width and composites the strip.
+
+        Args:
+            image: The background image (already converted to the display format).
+            parallax: How fast the background scrolls relative to the camera.
+            size: The (width, height) of the screen drawn to, smaller than the
+                  game's for a split-screen viewport.
+        """
+        self.parallax = parallax
+        self.width, self.height = size
+        self.scale = self.width / settings.SCREEN_WIDTH
+
+        width = self.width
+        self.tile_height = round(image.get_height() * width / image.get_width())
+        tile = pygame.transform.smoothscale(image, (width, self.tile_height))
+
+        # Enough tiles that a screen-high window starting anywhere in the first tile fits
+        repeats = math.ceil(self.height / self.tile_height) + 1
+        self._strip = pygame.Surface((width, self.tile_height * repeats)).convert()
+        for i in range(repeats):
+            self._strip.blit(tile, (0, i * self.tile_height))
+
+        # The background scrolls from where it was at _origin (a camera offset)
+        # when the parallax was last changed, by _scroll pixels at that point
+        self._origin = 0
+        self._scroll = 0
+
+        # The scroll position (in whole pixels) and strip row last drawn
+        self._position = None
+        self._top = None
+
+    def set_parallax(self, parallax, camera_offset):
+        """
+        Changes how fast the background scrolls, continuing from where it is
+        now instead of jumping.
+
+        Args:
+            parallax: How fast the background scrolls relative to the camera.
+            camera_offset: The current vertical offset of the camera, in pixels.
+        """
+        self._scroll += (camera_offset - self._origin) * self.parallax
+        self._origin = camera_offset
+        self.parallax = parallax
+
+    def draw(self, screen, camera_offset, dirty=None):
+        """
+        Draws the background.
+
+        Args:
+            screen: The Pygame screen to draw on.
+            camera_offset: The vertical offset of the camera, in pixels.
+            dirty: The rectangles drawn over since the last call, or None if
+                   the screen holds something else (e.g. a menu).
+
+        Returns:
+            True if all of the screen changed (it was redrawn or scrolled),
+            False if only the dirty rectangles did.
+        """
+        # Rising cameras move the background down the screen
+        position = int((self._scroll + (camera_offset - self._origin) * self.parallax) * self.scale)
+        top = -position % self.tile_height
+        shift = None if self._position is None else position - self._position
+
+        if dirty is None or shift is None or abs(shift) >= self.height:
+            screen.blit(self._strip, (0, 0), pygame.Rect(0, top, self.width, self.height))
+            self._position, self._top = position, top
+            return True
+
+        # Clear last frame's sprites off the background it was drawn on
+        for rect in dirty:
+            screen.blit(self._strip, rect, rect.move(0, self._top))
+        if shift == 0:
+            return False
+
+        # Scroll the screen and fill the rows scrolled in at the top (or bottom)
+        screen.scroll(0, shift)
+        if shift > 0:
+            exposed = pygame.Rect(0, 0, self.width, shift)
+        else:
+            exposed = pygame.Rect(0, self.height + shift, self.width, -shift)
+        screen.blit(self._strip, exposed, exposed.move(0, top))
+        self._position, self._top = position, top
+        return True
@@ -0,0 +1,694 @@
+"""
+batch_env.py
+
+This module contains the BatchEnv class, which advances many independent games
+at once using NumPy arrays instead of one Box2D world per game.
+
+BatchEnv reproduces the rules of a Simulation step as batched array operations:
+- Player.move: the horizontal velocity is set directly from the input.
+- Player.jump: an impulse of JUMP_STRENGTH when grounded and the cooldown is over.
+- The grounded flag from ContactListener: set when any platform contact begins
+  and cleared when one ends, the last event of a step winning.
+- The one-way rule from ContactListener.PreSolve: a contact is disabled while
+  the player's center is below the platform's.
+- Camera scrolling, culling and level streaming exactly as in Simulation.step.
+
+World.Step is reproduced by following Box2D's own pipeline for one box against
+static boxes: contacts are updated from the positions at the start of the step,
+gravity is integrated, the velocity solver stops the player against solid
+contacts (with friction), the position solver pushes it out of them, and the
+continuous collision pass stops the player where it would cross a platform
+during the step, which begins the contact mid-step even when it is disabled.
+The constants are Box2D's (b2Settings.h).
+
+The player is a box that never rotates, like the Player's body (which has
+fixedRotation set).
+
+Each game's level is generated chunk by chunk with level_stream.generate_chunk,
+like a Simulation's, so a BatchEnv game plays the same level as a Simulation
+with the same seed (see tests/test_batch_env.py).
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import random
+
+import numpy as np
+
+import settings
+from level_stream import generate_chunk
+from simulation import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+# Box2D computes in single precision. Positions and velocities are kept in the
+# same precision and updated in the same order, so positions that land exactly
+# on a contact threshold round to the same side as they do in Box2D.
+FLOAT = np.float32
+
+TIME_STEP = FLOAT(settings.PHYSICS_STEP)
+GRAVITY = FLOAT(settings.GRAVITY[1])
+
+# Half extents of the collision boxes, in meters
+PLAYER_HALF_SIZE = np.array([settings.PLAYER_HITBOX_WIDTH / 2, settings.PLAYER_HITBOX_HEIGHT / 2], dtype=FLOAT)
+PLATFORM_HALF_SIZE = np.array([settings.PLATFORM_WIDTH / 2 / settings.PIXELS_PER_METER,
+                               settings.PLATFORM_HEIGHT / 2 / settings.PIXELS_PER_METER], dtype=FLOAT)
+
+# Box2D's contact constants (b2Settings.h): polygons touch when their cores are
+# closer than their two polygon radii, and the solvers leave a linear slop of overlap
+LINEAR_SLOP = FLOAT(0.005)
+POLYGON_RADIUS = 2 * LINEAR_SLOP
+CONTACT_RADIUS = POLYGON_RADIUS + POLYGON_RADIUS
+BAUMGARTE = FLOAT(0.2)
+TOI_BAUMGARTE = FLOAT(0.75)
+MAX_LINEAR_CORRECTION = FLOAT(0.2)
+MAX_SUB_STEPS = 8
+
+# The solver iterations Simulation.step passes to World.Step, and the ones
+# Box2D uses for the sub-steps of its continuous collision pass
+VELOCITY_ITERATIONS = 6
+POSITION_ITERATIONS = 2
+TOI_POSITION_ITERATIONS = 20
+
+# The continuous collision pass stops a moving body when the distance between
+# the polygons' cores reaches TOI_TARGET, within TOI_TOLERANCE (b2TimeOfImpact)
+TOI_TARGET = max(LINEAR_SLOP, CONTACT_RADIUS - 3 * LINEAR_SLOP)
+TOI_TOLERANCE = FLOAT(0.25) * LINEAR_SLOP
+TOI_ITERATIONS = 20
+TOI_PUSH_BACKS = 8
+TOI_ROOT_ITERATIONS = 50
+TOI_END = 1 - 10 * np.finfo(FLOAT).eps
+
+# The player's inverse mass (density 1 times the hitbox area), used to turn impulses
+# into velocity, and its fixture friction, mixed with each platform's (settings.PLATFORM_KINDS)
+PLAYER_INVERSE_MASS = FLOAT(1 / (settings.PLAYER_HITBOX_WIDTH * settings.PLAYER_HITBOX_HEIGHT))
+PLAYER_FRICTION = FLOAT(0.3)
+
+# Only player/platform pairs within reach of the player's motion need the contact
+# rules; the solvers can push the player up to this far beyond it in one step
+PAIR_MARGIN = 1.0
+
+class BatchEnv:
+    """
+    Advances N independent games per call.
+
+    Every per-game quantity is stored as a NumPy array with one entry per game
+    (and one column per platform slot for the layouts). Empty platform slots
+    hold a height of -inf, so they never collide. The platform arrays grow
+    when a game's level needs more slots, like the Simulation's PlatformPool.
+
+    Attributes:
+        num_envs: The number of games simulated at once.
+        capacity: The number of platform slots per game.
+        seeds: The seed of each game's level.
+        chunk_index: (N,) the index of the next chunk of each game's level.
+        level_top: (N,) the height of the highest platform placed in each
+                   game so far, in meters.
+        position: (N, 2) player positions in meters.
+        velocity: (N, 2) player velocities in meters per second.
+        grounded: (N,) whether each player is grounded (see ContactListener).
+        jump_cooldown: (N,) jump cooldown timers, in steps.
+        platform_x, platform_y: (N, P) platform positions in meters.
+        platform_friction: (N, P) platform frictions (see settings.PLATFORM_KINDS).
+        platform_alive: (N, P) which platform slots are in use (read-only).
+        touching: (N, P) which platforms each player is in contact with.
+        camera_offset: (N,) camera offsets, in pixels.
+        score: (N,) highest height reached by each player.
+        frame: (N,) steps taken by each game.
+        done: (N,) whether each game is over.
+
+    Methods:
+        reset(mask=None, seeds=None):
+            Starts new games in every slot (or in the slots selected by mask).
+        step(inputs):
+            Advances every running game by one step.
+    """
+    def __init__(self, num_envs, seed=None, capacity=settings.PLATFORM_POOL_SIZE):
+        """
+        Initializes the environment and starts a game in every slot.
+
+        Args:
+            num_envs: The number of games simulated at once.
+            seed: The seed of the first game's level. Game i plays the level
+                  of seed + i, like the episodes of runner.py (random if None).
+            capacity: The initial number of platform slots per game.
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.num_envs = num_envs
+        self.capacity = capacity
+        self.seeds = [seed + index for index in range(num_envs)]
+        self.chunk_index = np.zeros(num_envs, dtype=np.int64)
+        self.level_top = np.ones(num_envs)
+
+        self.position = np.zeros((num_envs, 2), dtype=FLOAT)
+        self.velocity = np.zeros((num_envs, 2), dtype=FLOAT)
+        self.grounded = np.zeros(num_envs, dtype=bool)
+        self.jump_cooldown = np.zeros(num_envs, dtype=np.int32)
+        self.platform_x = np.zeros((num_envs, capacity), dtype=FLOAT)
+        self.platform_y = np.full((num_envs, capacity), -np.inf, dtype=FLOAT)
+        self.platform_friction = np.full((num_envs, capacity), settings.PLATFORM_KINDS["normal"]["friction"],
+                                         dtype=FLOAT)
+        self.touching = np.zeros((num_envs, capacity), dtype=bool)
+        self.camera_offset = np.zeros(num_envs)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.frame = np.zeros(num_envs, dtype=np.int64)
+        self.done = np.zeros(num_envs, dtype=bool)
+
+        # The rest of each contact's state: whether PreSolve left it enabled, and
+        # the normal from the platform towards the player it was last updated with
+        self._enabled = np.ones((num_envs, capacity), dtype=bool)
+        self._normal = np.zeros((num_envs, capacity, 2), dtype=FLOAT)
+
+        self.reset()
+
+    @property
+    def platform_alive(self):
+        return self.platform_y > -np.inf
+
+    def reset(self, mask=None, seeds=None):
+        """
+        Starts new games.
+
+        Args:
+            mask: Optional (N,) boolean array selecting the games to restart.
+                  Every game is restarted if None.
+            seeds: Optional seeds for the restarted games, in order. They
+                   replay their levels if None.
+        """
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        if seeds is not None:
+            for index, seed in zip(np.flatnonzero(mask), seeds):
+                self.seeds[index] = seed
+
+        self.position[mask] = (settings.SCREEN_WIDTH // 2 / settings.PIXELS_PER_METER,
+                               settings.SCREEN_HEIGHT // 4 / settings.PIXELS_PER_METER)
+        self.velocity[mask] = 0
+        self.grounded[mask] = False
+        self.jump_cooldown[mask] = 0
+        self.platform_y[mask] = -np.inf
+        self.touching[mask] = False
+        self._enabled[mask] = True
+        self.camera_offset[mask] = 0
+        self.score[mask] = 0
+        self.frame[mask] = 0
+        self.done[mask] = False
+
+        # Place the initial chunks of the levels
+        self.chunk_index[mask] = 0
+        self.level_top[mask] = 1
+        self._stream_level(mask)
+
+    def _stream_level(self, mask):
+        """
+        Places the chunks of the level coming into view in every game in mask,
+        like Simulation.stream_level: chunks are generated until the level
+        reaches settings.LEVEL_LOOKAHEAD meters above the top of the screen.
+
+        Args:
+            mask: (N,) boolean array selecting the games to place chunks in.
+        """
+        screen_top = (self.camera_offset + settings.SCREEN_HEIGHT) / settings.PIXELS_PER_METER
+        for index in np.flatnonzero(mask & (self.level_top < screen_top + settings.LEVEL_LOOKAHEAD)):
+            platforms = []
+            while self.level_top[index] < screen_top[index] + settings.LEVEL_LOOKAHEAD:
+                chunk = generate_chunk(self.seeds[index], int(self.chunk_index[index]), float(self.level_top[index]))
+                platforms += chunk.platforms
+                self.chunk_index[index] += 1
+                self.level_top[index] = chunk.top
+            if not platforms:
+                continue
+
+            free = np.flatnonzero(self.platform_y[index] == -np.inf)
+            if free.size < len(platforms):
+                self._grow(self.capacity - free.size + len(platforms))
+                free = np.flatnonzero(self.platform_y[index] == -np.inf)
+            slots = free[:len(platforms)]
+            x, y, kinds = zip(*platforms)
+            self.platform_x[index, slots] = x
+            self.platform_y[index, slots] = y
+            self.platform_friction[index, slots] = [settings.PLATFORM_KINDS[kind]["friction"] for kind in kinds]
+
+    def _grow(self, capacity):
+        """
+        Adds empty platform slots to every game, at least doubling the capacity
+        like the Simulation's PlatformPool.
+
+        Args:
+            capacity: The number of platform slots needed per game.
+        """
+        extra = max(capacity, 2 * self.capacity) - self.capacity
+        shape = (self.num_envs, extra)
+        self.platform_x = np.concatenate((self.platform_x, np.zeros(shape, dtype=FLOAT)), axis=1)
+        self.platform_y = np.concatenate((self.platform_y, np.full(shape, -np.inf, dtype=FLOAT)), axis=1)
+        self.platform_friction = np.concatenate((self.platform_friction, np.zeros(shape, dtype=FLOAT)), axis=1)
+        self.touching = np.concatenate((self.touching, np.zeros(shape, dtype=bool)), axis=1)
+        self._enabled = np.concatenate((self._enabled, np.ones(shape, dtype=bool)), axis=1)
+        self._normal = np.concatenate((self._normal, np.zeros(shape + (2,), dtype=FLOAT)), axis=1)
+        self.capacity += extra
+
+    def step(self, inputs):
+        """
+        Advances every running game by one step. Finished games are left untouched
+        until they are reset.
+
+        Args:
+            inputs: An integer or an (N,) integer array of INPUT_* bitmasks.
+
+        Returns:
+            The done array. A game is done on the step its player falls below
+            the screen, just like Simulation.step.
+        """
+        inputs = np.broadcast_to(np.asarray(inputs), (self.num_envs,))
+        running = ~self.done
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        vx = self.velocity[:, 0]
+        vy = self.velocity[:, 1]
+
+        # Initial upward impulse while the camera has not moved yet
+        vy[running & (self.camera_offset == 0)] += PLAYER_INVERSE_MASS
+
+        # Player.move
+        direction = np.where(inputs & INPUT_LEFT, -1, np.where(inputs & INPUT_RIGHT, 1, 0))
+        vx[running] = direction[running] * settings.PLAYER_MAX_SPEED
+
+        # Player.jump
+        jumping = running & (inputs & INPUT_JUMP > 0) & self.grounded & (self.jump_cooldown == 0)
+        vy[jumping] += PLAYER_INVERSE_MASS * FLOAT(settings.JUMP_STRENGTH)
+        self.jump_cooldown[jumping] = settings.JUMP_COOLDOWN
+
+        # Falling below the screen ends the game (after this step, as in Simulation.step)
+        fallen = running & (y.astype(float) * settings.PIXELS_PER_METER < -settings.PLAYER_SPRITE_HEIGHT)
+
+        # Gravity (Box2D integrates velocities before solving contacts)
+        vy[running] += TIME_STEP * GRAVITY
+
+        # Only player/platform pairs within reach of each other need the contact rules
+        reach = PLAYER_HALF_SIZE + PLATFORM_HALF_SIZE + CONTACT_RADIUS + PAIR_MARGIN + np.abs(self.velocity) * TIME_STEP
+        close = ((np.abs(x[:, None] - self.platform_x) < reach[:, 0, None])
+                 & (np.abs(y[:, None] - self.platform_y) < reach[:, 1, None]))
+        close |= self.touching
+        close &= running[:, None]
+        rows, cols = np.nonzero(close)
+
+        # The contacts are updated from the positions at the start of the step
+        self._update_contacts(rows, cols)
+        solid = self.touching[rows, cols] & self._enabled[rows, cols]
+        start = self.position.copy()
+
+        # Solve velocities, integrate positions and push the player out of solid contacts
+        self._solve_velocities(rows[solid], cols[solid])
+        self.position[running] += TIME_STEP * self.velocity[running]
+        self._solve_positions(rows[solid], cols[solid], BAUMGARTE, POSITION_ITERATIONS, -3 * LINEAR_SLOP)
+
+        # Stop the player where it would cross a platform during the step
+        self._solve_time_of_impact(rows, cols, start)
+
+        # Player.update
+        self.jump_cooldown -= running & (self.jump_cooldown > 0)
+        self.frame += running
+
+        # Camera follows the player upwards
+        screen_y = settings.SCREEN_HEIGHT - (y.astype(float) * settings.PIXELS_PER_METER - self.camera_offset)
+        rising = running & (screen_y < settings.SCREEN_HEIGHT / 2)
+        self.camera_offset[rising] += settings.SCREEN_HEIGHT / 2 - screen_y[rising]
+
+        # Return platforms below the view to the pool (PlatformIndex.cull_below)
+        lowest = (self.camera_offset - settings.PLATFORM_HEIGHT) / settings.PIXELS_PER_METER
+        culled = (self.platform_y <= lowest[:, None]) & self.platform_alive
+        culled &= running[:, None]
+        self._remove_contacts(*np.nonzero(culled))
+        self.platform_y[culled] = -np.inf
+
+        # Place the chunks coming into view
+        self._stream_level(running)
+
+        # Update score
+        self.score = np.where(running, np.maximum(self.score, np.trunc(y).astype(np.int64)), self.score)
+
+        self.done |= fallen
+        return self.done
+
+    def _platforms(self, rows, cols):
+        """
+        Returns the (M, 2) positions of the given platforms.
+        """
+        return np.stack((self.platform_x[rows, cols], self.platform_y[rows, cols]), axis=1)
+
+    def _update_contacts(self, rows, cols):
+        """
+        Updates the given player/platform contacts from the current positions,
+        like b2Contact::Update. Contacts beginning or ending set or clear the
+        grounded flag, and PreSolve disables touching contacts whose platform
+        is above the player's center.
+
+        Args:
+            rows: The game index of each contact.
+            cols: The platform slot of each contact, in the order they are updated.
+        """
+        position = self.position[rows]
+        platform = self._platforms(rows, cols)
+        side = _side(position, platform)
+        gaps = _gaps(position, platform, side)
+        touching = gaps.max(axis=1) <= CONTACT_RADIUS
+
+        # The grounded flag keeps the last event of each game
+        changed = touching != self.touching[rows, cols]
+        self.grounded[rows[changed]] = touching[changed]
+        self.touching[rows, cols] = touching
+        self._enabled[rows, cols] = ~touching | (position[:, 1] >= platform[:, 1])
+
+        # The contact normal is the axis the boxes are furthest apart along
+        vertical = gaps[:, 1] >= gaps[:, 0]
+        self._normal[rows, cols] = side * np.stack((~vertical, vertical), axis=1)
+
+    def _remove_contacts(self, rows, cols):
+        """
+        Drops the contacts of platforms taken out of play, ending the ones that
+        were touching.
+
+        Args:
+            rows: The game index of each platform.
+            cols: The platform slot of each platform.
+        """
+        ending = self.touching[rows, cols]
+        self.grounded[rows[ending]] = False
+        self.touching[rows, cols] = False
+        self._enabled[rows, cols] = True
+
+    def _solve_velocities(self, rows, cols):
+        """
+        Runs the velocity solver over the given contacts: each iteration applies
+        friction, then the normal impulse that stops the player from approaching
+        the platform, one contact at a time.
+
+        Box2D reduces the two points of a face contact to one when the bodies
+        cannot rotate, so each contact is solved at a single point. Impulses are
+        kept per unit of mass, which scales Box2D's by a power of two and so
+        rounds the same way.
+
+        Args:
+            rows: The game index of each contact.
+            cols: The platform slot of each contact, in solving order within a game.
+        """
+        if rows.size == 0:
+            return
+        normal = self._normal[rows, cols]
+        tangent = np.stack((normal[:, 1], -normal[:, 0]), axis=1)
+        friction = np.sqrt(PLAYER_FRICTION * self.platform_friction[rows, cols])
+        normal_impulse = np.zeros(rows.size, dtype=FLOAT)
+        tangent_impulse = np.zeros(rows.size, dtype=FLOAT)
+        batches = _batches(rows)
+        for _ in range(VELOCITY_ITERATIONS):
+            for batch in batches:
+                games = rows[batch]
+                velocity = self.velocity[games]
+
+                limit = friction[batch] * normal_impulse[batch]
+                impulse = np.clip(tangent_impulse[batch] - (velocity * tangent[batch]).sum(axis=1), -limit, limit)
+                velocity += (impulse - tangent_impulse[batch])[:, None] * tangent[batch]
+                tangent_impulse[batch] = impulse
+
+                impulse = np.maximum(normal_impulse[batch] - (velocity * normal[batch]).sum(axis=1), 0)
+                velocity += (impulse - normal_impulse[batch])[:, None] * normal[batch]
+                normal_impulse[batch] = impulse
+
+                self.velocity[games] = velocity
+
+    def _solve_positions(self, rows, cols, baumgarte, iterations, tolerance):
+        """
+        Runs the position solver over the given contacts: both points of each
+        contact push the player out along the contact normal in turn, by a
+        fraction of the overlap beyond the linear slop. A game stops iterating
+        once no contact overlapped by more than the tolerance.
+
+        Args:
+            rows: The game index of each contact.
+            cols: The platform slot of each contact, in solving order within a game.
+            baumgarte: The fraction of the overlap corrected per point.
+            iterations: The most iterations to run.
+            tolerance: The separation (negative) every contact must reach.
+        """
+        if rows.size == 0:
+            return
+        normal = self._normal[rows, cols]
+        platform = self._platforms(rows, cols)
+        solving = np.zeros(self.num_envs, dtype=bool)
+        solving[rows] = True
+        batches = _batches(rows)
+        for _ in range(iterations):
+            min_separation = np.zeros(self.num_envs, dtype=FLOAT)
+            for batch in batches:
+                batch = batch[solving[rows[batch]]]
+                games = rows[batch]
+                for _point in range(2):
+                    position = self.position[games]
+                    separation = (_gaps(position, platform[batch], normal[batch]).sum(axis=1)
+                                  - POLYGON_RADIUS - POLYGON_RADIUS)
+                    min_separation[games] = np.minimum(min_separation[games], separation)
+                    correction = np.clip(baumgarte * (separation + LINEAR_SLOP), -MAX_LINEAR_CORRECTION, 0)
+                    self.position[games] = position - correction[:, None] * normal[batch]
+            solving &= min_separation < tolerance
+            if not solving.any():
+                break
+
+    def _solve_time_of_impact(self, rows, cols, start):
+        """
+        Runs Box2D's continuous collision pass after the discrete solvers.
+
+        The player sweeps from its position at the start of the step to its
+        solved one. Until no enabled contact is reached before the end of the
+        sweep, the player is moved to the earliest time of impact and that
+        contact is updated there (which begins it). A disabled contact puts
+        the player back and drops out of the pass. Otherwise the other contacts
+        are updated too, the touching ones are solved with the TOI solvers, and
+        the player moves for the rest of the step with its new velocity.
+
+        Args:
+            rows: The game index of each player/platform pair.
+            cols: The platform slot of each pair.
+            start: (N, 2) player positions at the start of the step.
+        """
+        if rows.size == 0:
+            return
+        sweep_start = start.copy()
+        sweep_end = self.position.copy()
+        alpha0 = np.zeros(self.num_envs, dtype=FLOAT)
+        platform = self._platforms(rows, cols)
+        toi = np.full(rows.size, np.nan, dtype=FLOAT)
+        sub_steps = np.zeros(rows.size, dtype=np.int32)
+        pairs = np.arange(rows.size)
+        while True:
+            candidates = self._enabled[rows, cols] & (sub_steps <= MAX_SUB_STEPS)
+            stale = np.flatnonzero(candidates & np.isnan(toi))
+            if stale.size:
+                games = rows[stale]
+                beta = _time_of_impact(sweep_start[games], sweep_end[games], platform[stale])
+                toi[stale] = np.where(np.isnan(beta), 1, np.minimum(alpha0[games] + (1 - alpha0[games]) * beta, 1))
+
+            # The earliest time of impact of each game, the first pair winning ties
+            alpha = np.where(candidates, toi, np.inf)
+            order = np.lexsort((pairs, alpha, rows))
+            first = order[np.r_[True, rows[order][1:] != rows[order][:-1]]]
+            first = first[alpha[first] < TOI_END]
+            if first.size == 0:
+                break
+            games = rows[first]
+            min_alpha = alpha[first]
+
+            # Advance the player to the time of impact and update the contact there
+            impact = _sweep(sweep_start[games], sweep_end[games], (min_alpha - alpha0[games]) / (1 - alpha0[games]))
+            self.position[games] = impact
+            self._update_contacts(games, cols[first])
+            toi[first] = np.nan
+            sub_steps[first] += 1
+
+            # A disabled contact puts the player back and is skipped from now on
+            solid = self.touching[games, cols[first]] & self._enabled[games, cols[first]]
+            missed = games[~solid]
+            self.position[missed] = sweep_end[missed]
+            self._enabled[missed, cols[first[~solid]]] = False
+            first, games, min_alpha = first[solid], games[solid], min_alpha[solid]
+            if games.size == 0:
+                continue
+            alpha0[games] = min_alpha
+
+            # Update the player's other contacts at the time of impact, and solve the touching ones
+            island = np.zeros(self.num_envs, dtype=bool)
+            island[games] = True
+            others = np.flatnonzero(island[rows])
+            others = others[~np.isin(others, first)]
+            self._update_contacts(rows[others], cols[others])
+            others = others[self.touching[rows[others], cols[others]] & self._enabled[rows[others], cols[others]]]
+            contacts = np.concatenate((first, others))
+            contacts = contacts[np.argsort(rows[contacts], kind="stable")]
+            self._solve_positions(rows[contacts], cols[contacts], TOI_BAUMGARTE, TOI_POSITION_ITERATIONS,
+                                  FLOAT(-1.5) * LINEAR_SLOP)
+            sweep_start[games] = self.position[games]
+            self._solve_velocities(rows[contacts], cols[contacts])
+
+            # Move the player for the rest of the step, which changes every time of impact in its game
+            sweep_end[games] = sweep_start[games] + ((1 - min_alpha) * TIME_STEP)[:, None] * self.velocity[games]
+            self.position[games] = sweep_end[games]
+            toi[island[rows]] = np.nan
+
+
+def _batches(rows):
+    """
+    Splits contacts into batches holding at most one contact per game, so the
+    batches can be solved one after another like Box2D solves contacts in turn.
+
+    Args:
+        rows: The game index of each contact, grouped by game.
+
+    Returns:
+        A list of index arrays, the first contact of every game first.
+    """
+    starts = np.r_[True, rows[1:] != rows[:-1]]
+    index = np.arange(rows.size)
+    rank = index - np.maximum.accumulate(np.where(starts, index, 0))
+    return [np.flatnonzero(rank == r) for r in range(rank.max() + 1)]
+
+
+def _side(position, platform):
+    """
+    Returns which side (-1 or 1) of each platform the player is on, along x and y.
+    """
+    return np.where(position < platform, FLOAT(-1), FLOAT(1))
+
+
+def _gaps(position, platform, side):
+    """
+    Measures the gaps between the player's and the platforms' facing sides,
+    along x and y, from the corners of the boxes the way Box2D places polygon
+    vertices. Gaps are negative where the boxes overlap.
+
+    Args:
+        position: (M, 2) player positions.
+        platform: (M, 2) platform positions.
+        side: (M, 2) the side of each platform the player is measured from
+              (-1 or 1), or 0 to leave an axis out.
+
+    Returns:
+        (M, 2) gaps in meters.
+    """
+    return side * ((position - side * PLAYER_HALF_SIZE) - (platform + side * PLATFORM_HALF_SIZE))
+
+
+def _sweep(start, end, beta):
+    """
+    Returns the (M, 2) positions a fraction beta of the way along sweeps, as b2Sweep does.
+    """
+    return (1 - beta)[:, None] * start + beta[:, None] * end
+
+
+def _separation(start, end, platform, side, axis, t):
+    """
+    Returns the separations of swept players from platforms along fixed axes
+    at time t, like b2SeparationFunction.
+    """
+    return (_gaps(_sweep(start, end, t), _sweep(platform, platform, t), side) * axis).sum(axis=1)
+
+
+def _time_of_impact(start, end, platform):
+    """
+    Finds when swept players first come within TOI_TARGET of platforms,
+    following b2TimeOfImpact: conservative advancement along separating axes,
+    whose roots are found with alternating bisection and secant steps.
+
+    Args:
+        start: (M, 2) player positions at the start of the sweep.
+        end: (M, 2) player positions at the end of the sweep.
+        platform: (M, 2) platform positions.
+
+    Returns:
+        (M,) fractions of the sweep at which the boxes touch, or NaN for the
+        pairs that do not (that stay apart, or whose cores already overlap).
+    """
+    result = np.full(len(start), np.nan, dtype=FLOAT)
+    t1 = np.zeros(len(start), dtype=FLOAT)
+    pending = np.arange(len(start))
+    for _ in range(TOI_ITERATIONS):
+        if pending.size == 0:
+            break
+
+        # Overlapping cores are left to the discrete solvers, and cores within the target touch
+        position = _sweep(start[pending], end[pending], t1[pending])
+        fixed = _sweep(platform[pending], platform[pending], t1[pending])
+        side = _side(position, fixed)
+        gap = _gaps(position, fixed, side)
+        outside = np.maximum(gap, 0)
+        corners = (gap > 0).all(axis=1)
+        distance = np.where(corners, np.sqrt((outside * outside).sum(axis=1)), gap.max(axis=1))
+        touching = (distance > 0) & (distance < TOI_TARGET + TOI_TOLERANCE)
+        result[pending[touching]] = t1[pending[touching]]
+        apart = distance >= TOI_TARGET + TOI_TOLERANCE
+        pending, side, outside, distance, corners = (
+            pending[apart], side[apart], outside[apart], distance[apart], corners[apart])
+
+        # The separating axis joins the closest corners, or is the normal of the closest face
+        axis = np.where(corners[:, None], outside * (1 / distance)[:, None], outside > 0)
+        sweep = (start[pending], end[pending], platform[pending], side, axis)
+
+        # Resolve the separation at the end of the sweep, pushing it back to the root
+        t_start = t1[pending]
+        t_end = np.ones(pending.size, dtype=FLOAT)
+        active = np.ones(pending.size, dtype=bool)
+        done = np.zeros(pending.size, dtype=bool)
+        for _push_back in range(TOI_PUSH_BACKS):
+            s_end = _separation(*sweep, t_end)
+            separated = active & (s_end > TOI_TARGET + TOI_TOLERANCE)
+            reached = active & ~separated & (s_end > TOI_TARGET - TOI_TOLERANCE)
+            t_start[reached] = t_end[reached]
+            done |= separated
+            active &= ~(separated | reached)
+
+            s_start = _separation(*sweep, t_start)
+            failed = active & (s_start < TOI_TARGET - TOI_TOLERANCE)
+            touched = active & ~failed & (s_start <= TOI_TARGET + TOI_TOLERANCE)
+            result[pending[touched]] = t_start[touched]
+            done |= failed | touched
+            active &= ~(failed | touched)
+            if not active.any():
+                break
+            t_end = _find_root(sweep, active, t_start, t_end, s_start, s_end)
+        t1[pending] = t_start
+        pending = pending[~done]
+    return result
+
+
+def _find_root(sweep, searching, a1, a2, s1, s2):
+    """
+    Finds when the separations along the sweeps reach TOI_TARGET between a1
+    and a2, alternating bisection and secant steps like b2TimeOfImpact.
+
+    Args:
+        sweep: The sweeps and separating axes (see _separation).
+        searching: (M,) which sweeps to search.
+        a1, a2: (M,) times bracketing the roots.
+        s1, s2: (M,) separations at a1 and a2.
+
+    Returns:
+        (M,) times within TOI_TOLERANCE of the roots, or a2 where none was found.
+    """
+    root = a2.copy()
+    searching = searching.copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for iteration in range(TOI_ROOT_ITERATIONS):
+            if iteration % 2:
+                t = a1 + (TOI_TARGET - s1) * (a2 - a1) / (s2 - s1)
+            else:
+                t = FLOAT(0.5) * (a1 + a2)
+            s = _separation(*sweep, t)
+            found = searching & (np.abs(s - TOI_TARGET) < TOI_TOLERANCE)
+            root[found] = t[found]
+            searching &= ~found
+            if not searching.any():
+                break
+            above = searching & (s > TOI_TARGET)
+            below = searching & ~above
+            a1, s1 = np.where(above, t, a1), np.where(above, s, s1)
+            a2, s2 = np.where(below, t, a2), np.where(below, s, s2)
+    return root
@@ -0,0 +1,310 @@
+"""
+capture.py
+
+This module records the frames the game renders, to a raw capture file or a
+sequence of PNG images, on a background writer thread.
+
+Capturing a frame copies the display surface's pixels (through
+Surface.get_buffer, without converting them) into one of a few preallocated
+buffers and queues it for the writer. When the writer falls behind and every
+buffer is waiting to be written, frames are dropped instead of stalling the
+game loop; their indices are skipped, so gaps show in the capture. PNG frames
+are encoded with NumPy and zlib, which lets the game loop run while they are
+compressed (pygame.image.save holds the GIL for the whole encoding), and by
+several writer threads, since every image is a file of its own.
+
+Replays can be captured headless, one frame per physics step and without
+dropping any, which gives the same capture every time (see capture_replay).
+
+Raw capture format (little-endian):
+- Header: magic b"PDCF", format version (u8), width, height and pitch (u16),
+  bytes per pixel (u8), and the red, green, blue and alpha masks (u32).
+- Frames: frame index (u32) and time since the capture started in seconds
+  (f64), then pitch * height bytes of pixels.
+
+Usage:
+    python src/capture.py capture.pdc frames/   # Convert a raw capture to PNG images
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+import settings
+
+MAGIC = b"PDCF"
+VERSION = 1
+HEADER = struct.Struct("<4sBHHHB4I")
+FRAME = struct.Struct("<Id")
+EXTENSION = ".pdc"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+class FrameCapture:
+    """
+    Captures frames of a surface to a raw capture file (if the path ends in
+    .pdc) or to PNG images in a directory, on writer threads.
+
+    Attributes:
+        path: The capture file or directory.
+        block: Whether capture() waits for a free buffer instead of dropping
+               the frame (for deterministic captures).
+        captured: The number of frames captured.
+        dropped: The number of frames dropped because the writer was behind.
+
+    Methods:
+        capture(surface, seconds):
+            Queues a copy of a frame for the writer.
+        close():
+            Writes the queued frames and stops the writer.
+    """
+    def __init__(self, path, surface, buffers=settings.CAPTURE_BUFFERS, block=False):
+        """
+        Opens the capture and starts the writer threads.
+
+        Args:
+            path: The capture file (.pdc) or the directory for PNG images.
+            surface: The surface that will be captured (its size and pixel
+                     format must not change).
+            buffers: The number of frames that can wait for the writers.
+            block: Whether to wait for the writers instead of dropping frames.
+
+        Raises:
+            ValueError: If the surface does not have 32-bit pixels.
+        """
+        if surface.get_bytesize() != 4:
+            raise ValueError(f"can't capture {surface.get_bitsize()}-bit surfaces")
+        self.path = path
+        self.block = block
+        self.captured = 0
+        self.dropped = 0
+        self._size = surface.get_size()
+        self._pitch = surface.get_pitch()
+        self._masks = surface.get_masks()
+        self._frame = 0
+        self._start = time.perf_counter()
+
+        if path.endswith(EXTENSION):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "wb")
+            self._file.write(HEADER.pack(MAGIC, VERSION, *self._size, self._pitch, 4, *self._masks))
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._file = None
+
+        # Buffers cycle from the free pool to the writer's queue and back, so
+        # at most `buffers` frames are ever waiting
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put(bytearray(self._pitch * self._size[1]))
+        self._queue = queue.Queue()
+        writers = 1 if self._file is not None else settings.CAPTURE_PNG_WRITERS
+        self._threads = [
+            threading.Thread(target=self._work, name=f"frame-capture-{i}", daemon=True) for i in range(writers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def capture(self, surface, seconds=None):
+        """
+        Queues a copy of a frame for the writer, or drops it if the writer is
+        behind (unless block is set).
+
+        Args:
+            surface: The surface to capture.
+            seconds: The frame's time since the capture started (measured if None).
+
+        Returns:
+            True if the frame was queued, False if it was dropped.
+        """
+        index = self._frame
+        self._frame += 1
+        try:
+            buffer = self._free.get(block=self.block)
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        # One copy of the pixels, as they are (the buffer proxy locks the
+        # surface until it is released)
+        pixels = surface.get_buffer()
+        memoryview(buffer)[:] = pixels
+        del pixels
+
+        if seconds is None:
+            seconds = time.perf_counter() - self._start
+        self._queue.put((index, seconds, buffer))
+        self.captured += 1
+        return True
+
+    def _work(self):
+        """
+        A writer thread: writes queued frames until closed, returning their
+        buffers to the pool.
+        """
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            index, seconds, buffer = frame
+            if self._file is not None:
+                self._file.write(FRAME.pack(index, seconds))
+                self._file.write(buffer)
+            else:
+                png = encode_png(to_rgb(buffer, self._size, self._pitch, self._masks))
+                with open(os.path.join(self.path, f"frame-{index:06d}.png"), "wb") as file:
+                    file.write(png)
+            self._free.put(buffer)
+
+    def close(self):
+        """
+        Writes the queued frames, stops the writers and closes the file.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._file is not None:
+            self._file.close()
+
+
+def to_rgb(buffer, size, pitch, masks):
+    """
+    Converts 32-bit pixels to an RGB array.
+
+    Args:
+        buffer: The pixels, row by row.
+        size: The width and height of the image.
+        pitch: The number of bytes per row.
+        masks: The red, green, blue and alpha masks of the pixels.
+
+    Returns:
+        A (height, width, 3) uint8 NumPy array.
+    """
+    width, height = size
+    pixels = np.frombuffer(buffer, np.uint8).reshape(height, pitch)[:, :width * 4].reshape(height, width, 4)
+    # Each byte-aligned mask picks one byte of the little-endian pixel
+    channels = [(mask.bit_length() - 8) // 8 for mask in masks[:3]]
+    return pixels[:, :, channels]
+
+def encode_png(rgb, level=settings.CAPTURE_PNG_LEVEL):
+    """
+    Encodes an RGB array as a PNG image.
+
+    Args:
+        rgb: A (height, width, 3) uint8 NumPy array.
+        level: The zlib compression level.
+
+    Returns:
+        The PNG file's bytes.
+    """
+    height, width, _ = rgb.shape
+    rows = np.zeros((height, 1 + width * 3), np.uint8)  # Each row starts with its filter type (0, none)
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return PNG_SIGNATURE + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, level)) + chunk(b"IEND", b"")
+
+def read_capture(path):
+    """
+    Reads a raw capture file.
+
+    Args:
+        path: The path of the capture file.
+
+    Yields:
+        (index, seconds, rgb) tuples, rgb being a (height, width, 3) uint8 array.
+
+    Raises:
+        ValueError: If the file is not a capture or has an unsupported version.
+    """
+    with open(path, "rb") as file:
+        magic, version, width, height, pitch, _, *masks = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a capture file")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported capture version {version}")
+        while True:
+            record = file.read(FRAME.size)
+            if len(record) < FRAME.size:
+                return
+            index, seconds = FRAME.unpack(record)
+            buffer = file.read(pitch * height)
+            if len(buffer) < pitch * height:
+                return
+            yield index, seconds, to_rgb(buffer, (width, height), pitch, masks)
+
+def export_png(path, directory):
+    """
+    Converts a raw capture file to PNG images named after their frame index.
+
+    Returns:
+        The number of images written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for index, _, rgb in read_capture(path):
+        with open(os.path.join(directory, f"frame-{index:06d}.png"), "wb") as file:
+            file.write(encode_png(rgb))
+        count += 1
+    return count
+
+def capture_replay(replay, path):
+    """
+    Re-simulates a replay offscreen and captures one frame per step, without
+    dropping any, so the same replay always gives the same capture.
+
+    Args:
+        replay: The path of the replay file.
+        path: The capture file (.pdc) or the directory for PNG images.
+
+    Returns:
+        The result dictionary of headless.run_headless, with the number of
+        frames captured.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import game
+    from replay import read_replay
+
+    seed, inputs = read_replay(replay)
+    pygame.init()
+    session = game.Game(seed=seed)
+    simulation = session.simulation
+    capture = FrameCapture(path, session.screen, block=True)
+
+    start = time.perf_counter()
+    for bitmask in inputs:
+        alive = simulation.step(bitmask)
+        session.render()
+        capture.capture(session.screen, seconds=simulation.frame * settings.PHYSICS_STEP)
+        if not alive:
+            break
+    capture.close()
+    seconds = time.perf_counter() - start
+    session.quit()
+    return {
+        "seed": seed, "score": simulation.score, "frames": simulation.frame,
+        "died": simulation.game_over, "seconds": seconds, "captured": capture.captured,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a Pydood Jump capture to PNG images")
+    parser.add_argument("capture", help="raw capture file (.pdc)")
+    parser.add_argument("directory", help="directory to write the images to")
+    args = parser.parse_args()
+    print(f"Wrote {export_png(args.capture, args.directory)} images to {args.directory}")
@@ -5,12 +5,12 @@ This module contains the ContactListener class, which handles collision events
 in the Box2D world.
 
 The ContactListener class is responsible for:
-- Detecting when the player lands on or leaves a platform.
+- Detecting when a player lands on or leaves a platform.
 - Enabling one-way collision behavior for platforms (pass-through from below).
 
 Dependencies:
 - Box2D: Used for physics simulation.
-- Player: The player object that interacts with platforms.
+- Player: The player objects that interact with platforms.
 
 Author:     DevXCVIII
 Date:       March 24, 2025
@@ -18,69 +18,102 @@ Date:       March 24, 2025
 
 import Box2D
 
+import settings
+
 class ContactListener(Box2D.b2.contactListener):
     """
     Handles collision events in the Box2D world.
 
     This class is used to:
-    - Detect when the player lands on or leaves a platform.
-    - Enable one-way collision behavior for platforms, allowing the player to
+    - Detect when a player lands on or leaves a platform.
+    - Enable one-way collision behavior for platforms, allowing players to
       pass through from below but land on them from above.
 
+    Collision filtering (settings.CATEGORY_*) ensures the only contacts in the
+    world are between a player and a platform, so the callbacks only need to
+    find out which fixture is the platform's, by its integer userData tag. The
+    other fixture's body userData is the index of the player it belongs to,
+    which looks the player up in the players list.
+
+    Attributes:
+        players: The Player objects, by index.
+        begin_contacts: The number of BeginContact calls since the last reset.
+        end_contacts: The number of EndContact calls since the last reset.
+        pre_solves: The number of PreSolve calls since the last reset.
+
     Methods:
         BeginContact(contact):
-            Called when two fixtures begin to touch. Sets the player as grounded
+            Called when two fixtures begin to touch. Sets a player as grounded
             if they land on a platform.
         EndContact(contact):
-            Called when two fixtures cease to touch. Sets the player as not
+            Called when two fixtures cease to touch. Sets a player as not
             grounded when they leave a platform.
         PreSolve(contact, old_manifold):
             Called before the physics engine resolves a collision. Disables
-            collision if the player is below a platform, enabling one-way behavior.
+            collision if a player is below a platform, enabling one-way behavior.
+        reset_counters():
+            Resets the callback counters, once per step.
     """
 
-    def __init__(self, player):
+    def __init__(self, players):
         super().__init__()
-        self.player = player
+        self.players = players
+        self.reset_counters()
+
+    def reset_counters(self):
+        """
+        Resets the callback counters.
+        """
+        self.begin_contacts = 0
+        self.end_contacts = 0
+        self.pre_solves = 0
 
-    def _get_other_fixture(self, contact):
+    @property
+    def callbacks(self):
+        """
+        The total number of callbacks since the last reset.
         """
-        Helper method to get the fixture that is not the player's body.
+        return self.begin_contacts + self.end_contacts + self.pre_solves
+
+    @staticmethod
+    def _get_fixtures(contact):
+        """
+        Helper method to tell the fixtures of a player/platform contact apart.
 
         Args:
             contact: The Box2D contact object.
 
         Returns:
-            The fixture that is not the player's body, or None if the player
-            is not involved in the collision.
+            A tuple (player fixture, platform fixture), or (None, None) if
+            neither fixture is tagged as a platform.
         """
-        player_body = self.player.body
         fixture_a = contact.fixtureA
         fixture_b = contact.fixtureB
-
-        if fixture_a.body == player_body:
-            return fixture_b
-        elif fixture_b.body == player_body:
-            return fixture_a
-        return None
+        if fixture_a.userData == settings.CATEGORY_PLATFORM:
+            return fixture_b, fixture_a
+        if fixture_b.userData == settings.CATEGORY_PLATFORM:
+            return fixture_a, fixture_b
+        return None, None
 
     def BeginContact(self, contact):
         """
         Called when two fixtures begin to touch.
         Sets the player as grounded if they land on a platform.
         """
-        other_fixture = self._get_other_fixture(contact)
-        if other_fixture and other_fixture.body.userData == "platform":
-            self.player.grounded = True
+        self.begin_contacts += 1
+        player_fixture, platform_fixture = self._get_fixtures(contact)
+        if platform_fixture is not None:
+            self.players[player_fixture.body.userData].grounded = True
 
     def EndContact(self, contact):
         """
         Called when two fixtures cease to touch.
         Sets the player as not grounded when they leave a platform.
         """
-        other_fixture = self._get_other_fixture(contact)
-        if other_fixture and other_fixture.body.userData == "platform":
-            self.player.grounded = False
+        self.end_contacts += 1
+        player_fixture, platform_fixture = self._get_fixtures(contact)
+        if platform_fixture is not None:
+            self.players[player_fixture.body.userData].grounded = False
 
     def PreSolve(self, contact, old_manifold):
         """
@@ -95,9 +128,8 @@ class ContactListener(Box2D.b2.contactListener):
             contact: The Box2D contact object representing the collision.
             old_manifold: The previous collision manifold (not used here).
         """
-        other_fixture = self._get_other_fixture(contact)
-        if other_fixture and other_fixture.body.userData == "platform":
-            platform_y = other_fixture.body.position.y
-            player_y = self.player.body.position.y
-            if player_y < platform_y:
-                contact.enabled = False
\ No newline at end of file
+        self.pre_solves += 1
+        player_fixture, platform_fixture = self._get_fixtures(contact)
+        if platform_fixture is not None:
+            if player_fixture.body.position.y < platform_fixture.body.position.y:
+                contact.enabled = False
@@ -8,19 +8,32 @@ Game Mechanics:
 - The player jumps between platforms to score points.
 - Platforms are one-way colliders: the player can pass through from below but lands on them from above.
 - The game ends when the player falls below the screen.
+- Several local players can share the level on a split screen, each steering
+  with their own keys (settings.PLAYER_KEYS) and followed by their own view.
 
 Author:     DevXCVIII
 Date:       March 24, 2025
 """
 
 # Imports
+import math
+import threading
+import time
+
 import pygame
-import Box2D
 
 import settings
-from player import Player
-from platforms import generate_platforms
-from contact_listener import ContactListener
+from simulation import Simulation, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_ESCAPE
+from animation import PlayerAnimator, bake_animation
+from assets import AssetManager
+from background import Background
+from ghosts import GhostRace, GhostWriter, load_ghosts, save_ghost
+from governor import FrameGovernor
+from platforms import PLATFORM_KIND_NAMES, PLATFORM_THEME_NAMES
+from snapshot import RewindBuffer
+from startup import StartupTimer
+from text_cache import TextCache, NumberText, load_font
+from profiler import FrameProfiler
 from utils import blit_text_with_anchor
 
 class Game:
@@ -32,48 +45,261 @@ class Game:
     """
 
     """------------------------------------- Initialization -------------------------------------"""
-    def __init__(self):
+    def __init__(self, seed=None, record=None, telemetry=None, profiler=None, scores=None, ghost_dirs=(),
+                 capture=None, startup=None, background_load=False, players=1):
         """
         Initializes the game.
+
+        Args:
+            seed: Optional seed for platform generation. Restarts reuse it, so a
+                  seeded game always plays the same layout.
+            record: Optional directory to save a replay of every session in.
+            telemetry: Optional TelemetrySink that receives the score while playing.
+            profiler: Optional FrameProfiler to record frames into (one is
+                      created if None). Restarts keep the same profiler.
+            scores: Optional highscores.HighScores that records every finished
+                    run and provides the leaderboard shown on game over.
+            ghost_dirs: Directories of ghosts to race against, in seeded games.
+                        The player's own runs are saved as ghosts in the first.
+            capture: Optional capture file (.pdc) or directory (for PNG images)
+                     to record every frame rendered while playing to.
+            startup: Optional StartupTimer timing the phases until the main
+                     menu is on screen.
+            background_load: Whether the gameplay images are loaded on a worker
+                             thread while the main menu is up (see load_assets),
+                             instead of before this returns.
+            players: The number of local players sharing the level on a split
+                     screen. Split-screen sessions are not recorded, rewound,
+                     raced against ghosts or put on the leaderboard, which all
+                     follow a single player.
+
+        Raises:
+            ValueError: If there are more players than settings.PLAYER_KEYS.
         """
-        # Initialize the Pygame screen and set the window title
-        self.screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+        if not 1 <= players <= len(settings.PLAYER_KEYS):
+            raise ValueError(f"the game takes 1 to {len(settings.PLAYER_KEYS)} players, not {players}")
+        self.startup = startup if startup is not None else StartupTimer()
+
+        # Initialize the Pygame screen and set the window title; split screens
+        # tile the players' views, scaled down, in rows of SPLIT_SCREEN_COLUMNS
+        self.split_screen = players > 1
+        if self.split_screen:
+            columns = min(players, settings.SPLIT_SCREEN_COLUMNS)
+            rows = math.ceil(players / columns)
+            width, height = settings.SCREEN_WIDTH // columns, settings.SCREEN_HEIGHT // columns
+            self.screen = pygame.display.set_mode((settings.SCREEN_WIDTH, rows * height))
+            self.viewports = [
+                self.screen.subsurface((index % columns * width, index // columns * height, width, height))
+                for index in range(players)
+            ]
+            # Each view is drawn straight into its viewport, with images prescaled to it
+            self.view_scale = width / settings.SCREEN_WIDTH
+        else:
+            self.screen = pygame.display.set_mode((settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT))
+            self.viewports = [self.screen]
+            self.view_scale = 1
         pygame.display.set_caption("Pydood Jump")
+        self.startup.mark("open the window")
 
         # Set the game to "running"
         self.running = True
 
-        # Initialize the Box2D world with gravity
-        self.world = Box2D.b2.world(gravity=settings.GRAVITY, doSleep=True)
-
-        # Initialize the game clock for frame rate control
+        # Initialize the game clock for frame rate control, and the accumulator
+        # of real time not yet simulated by fixed physics steps
         self.clock = pygame.time.Clock()
+        self.accumulator = 0
 
         # Set the initial game state to the main menu
         self.state = "main-menu"
 
-        # Load the game font for rendering text
+        # Load the game font for rendering text (looked up once, then cached)
         #self.font = pygame.font.Font("../assets/FiraCode.ttf", 24)
-        self.font = pygame.font.SysFont("Arial", 24)
-
-        # Initialize the player
-        self.player = Player(self.world)
-
-        # Load the background image
-        self.background = pygame.image.load("assets/space-bck@2x.png")
-
-        # Initialize the camera offset for scrolling
-        self.camera_offset = 0
+        self.font = load_font("Arial", 24)
+        self.startup.mark("load the font")
+
+        # Cache rendered text, and compose the score from pre-rendered digits
+        self.text = TextCache()
+        self.score_text = NumberText(self.font, (255, 255, 255), "Score: ")
+        self.player_score_texts = [NumberText(self.font, (255, 255, 255), f"P{index + 1}: ") for index in range(players)]
+        self.telemetry = telemetry
+        self.scores = scores
+
+        # Time every frame; F3 toggles the overlay and F4 exports the profile
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+
+        # Lower the rendering quality while frames near their budget (see governor.py)
+        self.governor = FrameGovernor()
+        self.overlay_font = pygame.font.Font(None, 18)
+
+        # Pre-render the menus, and remember which state's screen is displayed
+        # so menus only redraw when they are entered
+        self.build_menu_screens()
+        self.shown_state = None
+        self.startup.mark("build the menus")
+
+        # Initialize the simulation (world, player, platforms, camera and score)
+        self.seed = seed
+        self.simulation = Simulation(seed, players=players)
+        self.simulation.profiler = self.profiler
+
+        # Each player's left, right and jump keys
+        self.player_keys = [[pygame.key.key_code(name) for name in keys] for keys in settings.PLAYER_KEYS[:players]]
+
+        # Load images on first use, converted to the display format. If
+        # requested, the files gameplay draws from are decoded on a worker
+        # thread while the menu is up, and converted when the game starts
+        self.assets = AssetManager()
+        self.loader = None
+        self.decoded = None
+        if background_load:
+            self.loader = threading.Thread(target=self.decode_assets, args=(self.gameplay_files(),),
+                                           name="asset-loader", daemon=True)
+            self.loader.start()
+        else:
+            self.load_assets()
+        self.dirty = None  # The rectangles drawn over the background last frame (None to redraw it all)
+
+        # Race the best ghosts recorded on the level, and record this run's
+        self.ghost_dirs = list(ghost_dirs) if not self.split_screen else []
+        self.race = None
+        self.start_race()
+        if self.loader is None:
+            self.apply_quality()
+
+        # Keep recent steps for rewinding (Backspace held); rewound sessions
+        # are left off the leaderboard
+        self.rewind = None
+        if not self.split_screen:
+            self.rewind = RewindBuffer()
+            self.rewind.push(self.simulation)
+        self.rewound = False
+
+        # Record the session if requested (replays hold a single player's input)
+        self.record = record if not self.split_screen else None
+        self.start_recording()
+
+        # Capture the rendered frames if requested (see capture.py)
+        self.capture = None
+        if capture is not None:
+            from capture import FrameCapture
+            self.capture = FrameCapture(capture, self.screen)
+        self.startup.mark("create the game")
+
+    def gameplay_files(self):
+        """
+        Returns the image files load_assets() loads the gameplay images from
+        (the atlas sheets of the images packed in one).
+        """
+        names = [settings.BACKGROUND_IMAGE, settings.GHOST_IMAGE, *settings.THEME_TILE_SHEETS.values()]
+        for animation in (settings.PLAYER_ANIMATION, settings.PLAYER_GEAR):
+            if animation is not None:
+                for sources in settings.ANIMATIONS[animation]["clips"].values():
+                    names += [source if isinstance(source, str) else source[0] for source in sources]
+        return list(dict.fromkeys(self.assets.file_name(name) for name in names))
+
+    def decode_assets(self, files):
+        """
+        Decodes the files of the gameplay images on the worker thread, while
+        the main menu is up. Converting, scaling and caching the images need
+        the display and the AssetManager, so wait_for_assets() does them on
+        the main thread.
 
-        # Generate initial platforms
-        self.platforms = generate_platforms(self.world, start_y=1)
+        Args:
+            files: The file names to decode (see gameplay_files).
+        """
+        start = time.perf_counter()
+        self.decoded = [(name, self.assets.decode(name)) for name in files]
+        self.startup.mark("decode the gameplay images (worker thread)", since=start)
 
-        # Set up the contact listener for collision handling
-        self.contact_listener = ContactListener(self.player)
-        self.world.contactListener = self.contact_listener
+    def load_assets(self):
+        """
+        Loads the images gameplay draws (converting and scaling them, after
+        decoding them unless the worker thread did): the background, the
+        player's animations, the platform and ghost sprites. Split screens
+        scale them to the viewports' size.
+        """
+        start = time.perf_counter()
+
+        # The scrolling background
+        scale = self.view_scale
+        self.background = Background(self.assets.image(settings.BACKGROUND_IMAGE, alpha=False),
+                                     size=self.viewports[0].get_size())
+
+        # The player, in every pose, facing and lean (see animation.py), and its gear
+        # (baked once, and shared by the players' animators)
+        clips = bake_animation(self.assets, settings.PLAYER_ANIMATION, scale=scale)
+        gear = bake_animation(self.assets, settings.PLAYER_GEAR, scale=scale)["worn"] if settings.PLAYER_GEAR else None
+        for player in self.simulation.players:
+            player.animator = PlayerAnimator(clips, gear)
+
+        # Cut the platform sprites from each theme's tile sheet, in theme then kind code order
+        size = (round(settings.PLATFORM_SPRITE_WIDTH * scale), round(settings.PLATFORM_SPRITE_HEIGHT * scale))
+        self.platform_sprites = [
+            [self.platform_sprite(theme, kind, size) for kind in PLATFORM_KIND_NAMES]
+            for theme in PLATFORM_THEME_NAMES
+        ]
+
+        # The ghosts
+        self.ghost_sprite = self.assets.image(
+            settings.GHOST_IMAGE, size=(settings.PLAYER_SPRITE_WIDTH, settings.PLAYER_SPRITE_HEIGHT)
+        ).copy()  # Not the cached image, which must stay opaque
+        # Fade the sprite in its per-pixel alpha: blitting with a surface alpha
+        # on top of per-pixel alpha is about 4x slower
+        self.ghost_sprite.fill((255, 255, 255, settings.GHOST_ALPHA), special_flags=pygame.BLEND_RGBA_MULT)
+
+        self.startup.mark("load the gameplay images", since=start)
+
+    def platform_sprite(self, theme, kind, size):
+        """
+        Returns the sprite of a kind of platform in a theme. Kinds with a tint
+        (see settings.PLATFORM_KINDS) are tinted, so they stand out from
+        normal platforms on every tile sheet.
+
+        Args:
+            theme: The name of the theme (a key of settings.THEME_TILE_SHEETS).
+            kind: The kind of platform (a key of settings.PLATFORM_KINDS).
+            size: The (width, height) to scale the sprite to.
+        """
+        spec = settings.PLATFORM_KINDS[kind]
+        sprite = self.assets.tile(settings.THEME_TILE_SHEETS[theme], spec["tile"], size=size)
+        if "tint" in spec:
+            sprite = sprite.copy()  # Not the cached tile
+            sprite.fill(spec["tint"], special_flags=pygame.BLEND_RGB_MULT)
+        return sprite
+
+    def wait_for_assets(self):
+        """
+        Waits for the worker thread to finish decoding the gameplay images, if
+        it is, then converts them and applies the quality level (which needs
+        the background).
+        """
+        if self.loader is not None:
+            self.loader.join()
+            self.loader = None
+            for name, surface in self.decoded:
+                self.assets.add_decoded(name, surface)
+            self.decoded = None
+            self.load_assets()
+            self.apply_quality()
+
+    def reset(self):
+        """
+        Starts a new session from the game-over screen.
 
-        # Initialize the score tracker
-        self.score = 0
+        The display, fonts and loaded images are kept, and the simulation is
+        reset in place (see Simulation.reset), so restarting takes well under
+        settings.RESTART_BUDGET_MS.
+        """
+        self.stop_recording()
+        self.simulation.reset(self.seed)
+        if self.rewind is not None:
+            self.rewind.clear()
+            self.rewind.push(self.simulation)
+        self.rewound = False
+        self.start_race()
+        self.accumulator = 0
+        self.clock.tick()  # Don't count time spent on the game-over screen as game time
+        self.start_recording()
 
     """-------------------------------------- Game Loop -----------------------------------------"""
     def run(self):
@@ -98,44 +324,53 @@ class Game:
     """-------------------------------------- Game States ---------------------------------------"""
     def main_menu(self):
         """
-        Renders the main menu and handles input.
+        Shows the main menu and handles input.
+
+        The menu is drawn once when it is entered (or when the window is
+        exposed), and otherwise the game sleeps until an event arrives.
         """
-        for event in pygame.event.get():
+        if self.shown_state != "main-menu":
+            self.show(self.main_menu_screen)
+            if self.shown_state is None:
+                self.startup.mark("show the main menu", budget=settings.STARTUP_BUDGET_MS)
+            self.shown_state = "main-menu"
+
+        for event in self.wait_events():
             match event.type:
                 case pygame.QUIT:
                     self.state = "quit"
                 case pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN:  # Start the game
+                        self.wait_for_assets()
                         self.state = "playing"
+                        self.clock.tick()  # Don't count time spent in the menu as game time
                     if event.key == pygame.K_ESCAPE:  # Quit the game
                         self.state = "quit"
-
-        # Render the main menu UI
-        self.screen.fill((0, 0, 0))  # Black background
-
-        # Title Text (centered at the top, with an offset)
-        title_text = self.font.render("Pydood Jump", True, (255, 255, 255))
-        blit_text_with_anchor(self.screen, title_text, anchor=(0.5, 0.25))
-
-        # Start Text (centered in the middle)
-        start_text = self.font.render("Press Enter to Start", True, (255, 255, 255))
-        blit_text_with_anchor(self.screen, start_text, anchor=(0.5, 0.5))
-
-        # Quit Text (centered at the bottom)
-        quit_text = self.font.render("Press Esc to Quit", True, (255, 255, 255))
-        blit_text_with_anchor(self.screen, quit_text, anchor=(0.5, 0.75))
-
-        # Update the display
-        pygame.display.flip()
+                case pygame.WINDOWEXPOSED:
+                    self.show(self.main_menu_screen)
 
     def playing(self):
         """
         Handles the main gameplay loop.
-        """
-        # Apply an initial upward force to the player when the game starts
-        if self.camera_offset == 0:  # Check if the game is just starting
-            self.player.body.ApplyLinearImpulse((0, 1), self.player.body.worldCenter, True)
 
+        Physics runs in fixed steps of settings.PHYSICS_STEP, decoupled from the
+        frame rate: each frame runs as many steps as the real time elapsed calls
+        for (possibly none), and rendering interpolates between the last two steps.
+        """
+        if self.shown_state != "playing":
+            self.dirty = None  # The screen still shows a menu
+            self.governor.reset()  # Menu frames say nothing about the game's load
+            self.shown_state = "playing"
+        profiler = self.profiler
+        lap = profiler.begin_frame()
+
+        # Measure the real time since the last frame (and cap the frame rate)
+        frame_time = self.clock.tick(settings.MAX_FPS) / 1000
+        self.accumulator += frame_time
+        lap = profiler.lap("wait", lap)
+        work_start = lap
+
+        inputs = 0
         for event in pygame.event.get():
             match event.type:
                 case pygame.QUIT:
@@ -143,102 +378,336 @@ class Game:
                 case pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:  # Pause the game
                         self.state = "main-menu"
+                        inputs |= INPUT_ESCAPE
+                    elif event.key == pygame.K_F3:  # Toggle the profiler overlay
+                        profiler.toggle_overlay()
+                    elif event.key == pygame.K_F4:  # Export the profile
+                        profiler.notify(f"profile saved to {profiler.export_snapshot()}")
+        lap = profiler.lap("events", lap)
 
         # Handle player movement
         keys = pygame.key.get_pressed()
 
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.player.move(-1)
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.player.move(1)
+        if self.split_screen:
+            # One bitmask per player, from their own keys (Escape pauses for all)
+            inputs = [inputs] * len(self.player_keys)
+            for index, (left, right, jump) in enumerate(self.player_keys):
+                if keys[left]:
+                    inputs[index] |= INPUT_LEFT
+                elif keys[right]:
+                    inputs[index] |= INPUT_RIGHT
+                if keys[jump]:
+                    inputs[index] |= INPUT_JUMP
         else:
-            self.player.move(0)
-
-        if keys[pygame.K_SPACE]:
-            self.player.jump()
+            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+                inputs |= INPUT_LEFT
+            elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+                inputs |= INPUT_RIGHT
 
-        # Check if the player has fallen below the screen
-        if self.player.body.position.y * settings.PIXELS_PER_METER < -settings.PLAYER_SPRITE_HEIGHT:
-            self.state = "game-over"
+            if keys[pygame.K_SPACE]:
+                inputs |= INPUT_JUMP
+        rewinding = keys[pygame.K_BACKSPACE] and self.rewind is not None
+        profiler.lap("input", lap)
 
         # Game Update
-        self.world.Step(1 / 60, 6, 2)
-        self.world.ClearForces()
-        self.player.update()
+        steps = 0
+        while self.accumulator >= settings.PHYSICS_STEP and self.state != "game-over":
+            if steps == settings.MAX_STEPS_PER_FRAME:
+                # Too far behind to catch up: drop the backlog instead of spiralling
+                self.accumulator = 0
+                break
+            if rewinding:
+                # Step back instead of forward; a replay can't express that,
+                # so the session stops being recorded
+                self.stop_recording()
+                self.rewind.rewind(self.simulation, 2)
+                self.rewound = True
+            elif not self.simulation.step(inputs):
+                self.record_ghost()
+                self.state = "game-over"
+                self.stop_recording()
+                self.submit_score()
+                self.finish_race()
+            else:
+                self.record_ghost()
+                if self.rewind is not None:
+                    self.rewind.push(self.simulation)
+            self.accumulator -= settings.PHYSICS_STEP
+            steps += 1
 
-        # Update the camera offset to follow the player
-        player_screen_y = settings.SCREEN_HEIGHT - (self.player.body.position.y * 30 - self.camera_offset)
-        if player_screen_y < settings.SCREEN_HEIGHT / 2:
-            self.camera_offset += settings.SCREEN_HEIGHT / 2 - player_screen_y
+        # Game Rendering
+        lap = time.perf_counter()
+        changed = self.render(self.accumulator / settings.PHYSICS_STEP)
+        lap = profiler.lap("render", lap)
+        if changed is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(changed)
+        lap = profiler.lap("flip", lap)
+        if self.capture is not None:
+            self.capture.capture(self.screen)
+            profiler.lap("capture", lap)
+        profiler.add("quality", self.governor.level)
+        profiler.end_frame(self.simulation.world)
+
+        # Trade quality for time if the frame came close to its budget, or
+        # take it back once there is headroom
+        if self.governor.update(time.perf_counter() - work_start):
+            self.apply_quality()
+
+    def render(self, alpha=1.0):
+        """
+        Renders the current simulation state to the screen.
 
-        # Remove off-screen platforms
-        self.platforms = [p for p in self.platforms if p.body.position.y * 30 - self.camera_offset > -settings.PLATFORM_HEIGHT]
+        The background is updated from last frame's instead of redrawn (see
+        Background.draw). While it has not scrolled, only the areas drawn over
+        last frame and this frame change.
 
-        # Spawn new platforms
-        highest_platform_y = max([p.body.position.y for p in self.platforms], default=1)
-        if len(self.platforms) < 10 or self.player.body.position.y > highest_platform_y - 3:
-            new_platforms = generate_platforms(self.world, start_y=highest_platform_y + 2, num_platforms=5)
-            self.platforms.extend(new_platforms)
+        Args:
+            alpha: How far between the previous physics step (0) and the current
+                   one (1) to draw the world.
 
-        # Update score
-        self.score = max(self.score, int(self.player.body.position.y))
+        Returns:
+            The rectangles of the screen that changed, or None if all of it did.
+        """
+        if self.split_screen:
+            return self.render_split(alpha)
+        simulation = self.simulation
+        camera_offset = simulation.interpolated_camera_offset(alpha)
+
+        # Render the background (clearing last frame's sprites, then scrolling it)
+        redrawn = self.background.draw(self.screen, camera_offset, self.dirty)
+
+        # Render the ghosts where they were at the same time, under the player
+        drawn = self.race.draw(self.screen, self.ghost_sprite, camera_offset, simulation.frame - 1 + alpha)
+        drawn.append(simulation.player.render(self.screen, camera_offset, alpha))
+
+        # Render the platforms inside the camera window in one batch
+        low = (camera_offset - settings.PLATFORM_SPRITE_HEIGHT) / settings.PIXELS_PER_METER
+        high = (camera_offset + settings.SCREEN_HEIGHT + settings.PLATFORM_SPRITE_HEIGHT) / settings.PIXELS_PER_METER
+        drawn += simulation.pool.store.draw(self.screen, self.platform_sprites, camera_offset, low, high)
+
+        # Render the score on top
+        score_text = self.score_text.render(simulation.score)
+        if self.telemetry is not None:
+            self.telemetry.emit("Score", simulation.score)
+        drawn.append(blit_text_with_anchor(self.screen, score_text, anchor=(0.05, 0.05)))  # 5% from left and top
+
+        overlay = self.profiler.draw_overlay(self.screen, self.overlay_font)
+        if overlay is not None:
+            drawn.append(overlay)
+
+        changed = None if redrawn else self.dirty + drawn
+        self.dirty = drawn
+        return changed
+
+    def render_split(self, alpha=1.0):
+        """
+        Renders every player's view of the simulation into their viewport.
 
-        # Render the score
-        score_text = self.font.render(f"Score: {self.score}", True, (255, 255, 255))
-        print(f"Score: {self.score}")
-        blit_text_with_anchor(self.screen, score_text, anchor=(0.05, 0.05))  # 5% from left and top
+        Each view follows its player's camera and is drawn straight into its
+        viewport, with the background and sprites prescaled to the viewport's
+        size (see load_assets), so nothing is scaled while drawing.
 
-        # Game Rendering
-        self.screen.blit(self.background, (0, 0))
-        self.player.render(self.screen, self.camera_offset)
+        Args:
+            alpha: How far between the previous physics step (0) and the current
+                   one (1) to draw the world.
 
-        # Render platforms
-        for platform in self.platforms:
-            platform.draw(self.screen, self.camera_offset)
-            platform.update_sensor(self.player)
-        pygame.display.flip()
-
-        self.clock.tick(60)  # Limit the frame rate to 60 FPS
+        Returns:
+            None, since all of the screen changes.
+        """
+        simulation = self.simulation
+        scale = self.view_scale
+        for index, viewport in enumerate(self.viewports):
+            camera_offset = simulation.interpolated_camera_offset(alpha, index)
+            self.background.draw(viewport, camera_offset)
+
+            # Render every player still in the game, then the platforms in view
+            for player in simulation.players:
+                if player.alive:
+                    player.render(viewport, camera_offset, alpha, scale)
+            view_height = viewport.get_height() / scale  # In the game's pixels
+            low = (camera_offset - settings.PLATFORM_SPRITE_HEIGHT) / settings.PIXELS_PER_METER
+            high = (camera_offset + view_height + settings.PLATFORM_SPRITE_HEIGHT) / settings.PIXELS_PER_METER
+            simulation.pool.store.draw(viewport, self.platform_sprites, camera_offset, low, high, scale)
+
+            score_text = self.player_score_texts[index].render(simulation.scores[index])
+            blit_text_with_anchor(viewport, score_text, anchor=(0.05, 0.05))
+
+        if self.telemetry is not None:
+            self.telemetry.emit("Score", simulation.score)
+        self.profiler.draw_overlay(self.screen, self.overlay_font)
+        return None
 
     def game_over(self):
         """
-        Handles the game-over screen.
+        Shows the game-over screen and handles input.
+
+        Like the main menu, the screen is drawn once and the game then sleeps
+        until an event arrives.
         """
-        for event in pygame.event.get():
+        if self.shown_state != "game-over":
+            self.show_game_over()
+            self.shown_state = "game-over"
+
+        for event in self.wait_events():
             match event.type:
                 case pygame.QUIT:
                     self.state = "quit"
                 case pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN:  # Restart the game
-                        self.__init__()  # Reinitialize the game
+                        self.reset()
                         self.state = "playing"
                     elif event.key == pygame.K_ESCAPE:  # Quit the game
                         self.state = "quit"
+                case pygame.WINDOWEXPOSED:
+                    self.show_game_over()
 
-        # Render the game-over screen
-        self.screen.fill((0, 0, 0))  # Black background
-
-        # Game Over Text
-        game_over_text = self.font.render("Game Over", True, (255, 0, 0))
-        blit_text_with_anchor(self.screen, game_over_text, anchor=(0.5, 0.4))
+    """------------------------------------- Menu Screens ---------------------------------------"""
+    def build_menu_screens(self):
+        """
+        Pre-renders the static parts of the main menu and game-over screens.
+        """
+        white = (255, 255, 255)
+
+        # Main menu
+        self.main_menu_screen = pygame.Surface(self.screen.get_size()).convert()
+        self.main_menu_screen.fill((0, 0, 0))  # Black background
+        blit_text_with_anchor(self.main_menu_screen, self.text.render(self.font, "Pydood Jump", white), anchor=(0.5, 0.25))
+        blit_text_with_anchor(self.main_menu_screen, self.text.render(self.font, "Press Enter to Start", white), anchor=(0.5, 0.5))
+        blit_text_with_anchor(self.main_menu_screen, self.text.render(self.font, "Press Esc to Quit", white), anchor=(0.5, 0.75))
+
+        # Game over (the final score is drawn on top when the screen is shown)
+        self.game_over_screen = pygame.Surface(self.screen.get_size()).convert()
+        self.game_over_screen.fill((0, 0, 0))  # Black background
+        blit_text_with_anchor(self.game_over_screen, self.text.render(self.font, "Game Over", (255, 0, 0)), anchor=(0.5, 0.4))
+        blit_text_with_anchor(self.game_over_screen, self.text.render(self.font, "Press Enter to Restart", white), anchor=(0.5, 0.6))
+        blit_text_with_anchor(self.game_over_screen, self.text.render(self.font, "Press Esc to Quit", white), anchor=(0.5, 0.7))
+
+    def show(self, screen):
+        """
+        Copies a pre-rendered screen to the display.
+        """
+        self.screen.blit(screen, (0, 0))
+        pygame.display.flip()
 
-        # Final Score Text
-        score_text = self.font.render(f"Final Score: {self.score}", True, (255, 255, 255))
+    def show_game_over(self):
+        """
+        Shows the game-over screen with the final score.
+        """
+        self.screen.blit(self.game_over_screen, (0, 0))
+        if self.split_screen:
+            final = "Final Scores: " + " / ".join(str(score) for score in self.simulation.scores)
+        else:
+            final = f"Final Score: {self.simulation.score}"
+        score_text = self.text.render(self.font, final, (255, 255, 255))
         blit_text_with_anchor(self.screen, score_text, anchor=(0.5, 0.5))
 
-        # Restart Text
-        restart_text = self.font.render("Press Enter to Restart", True, (255, 255, 255))
-        blit_text_with_anchor(self.screen, restart_text, anchor=(0.5, 0.6))
+        # List the best runs above, from the in-memory leaderboard
+        if self.scores is not None and not self.split_screen:
+            white = (255, 255, 255)
+            blit_text_with_anchor(self.screen, self.text.render(self.font, "High Scores", white), anchor=(0.5, 0.08))
+            for i, (score, *_) in enumerate(self.scores.top(settings.HIGH_SCORE_SHOWN)):
+                line = self.text.render(self.font, f"{i + 1}. {score}", white)
+                blit_text_with_anchor(self.screen, line, anchor=(0.5, 0.13 + 0.04 * i))
+        pygame.display.flip()
 
-        # Quit Text
-        quit_text = self.font.render("Press Esc to Quit", True, (255, 255, 255))
-        blit_text_with_anchor(self.screen, quit_text, anchor=(0.5, 0.7))
+    def submit_score(self):
+        """
+        Records the finished run, if runs are being recorded. Sessions that
+        were rewound are not recorded, since their score was not earned in
+        one go. Split-screen sessions are not recorded.
+        """
+        if self.scores is not None and not self.rewound and not self.split_screen:
+            simulation = self.simulation
+            self.scores.submit(simulation.score, simulation.seed, simulation.frame)
 
-        # Update the display
-        pygame.display.flip()
+    def wait_events(self):
+        """
+        Sleeps until an event arrives (or settings.MENU_WAIT_MS passes), then
+        returns every pending event.
+        """
+        event = pygame.event.wait(settings.MENU_WAIT_MS)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def apply_quality(self):
+        """
+        Applies the governor's current quality level: how many ghosts are
+        drawn, whether the background scrolls (a still background only needs
+        repainting under the sprites), and how often the profiler overlay is
+        rebuilt.
+        """
+        quality = self.governor.quality()
+        self.race.limit = quality["ghosts"]
+        parallax = settings.BACKGROUND_PARALLAX if quality["parallax"] else 0
+        if parallax != self.background.parallax:
+            self.background.set_parallax(parallax, self.simulation.camera_offset)
+        self.profiler.overlay_refresh = quality["overlay_refresh"]
+
+    def start_race(self):
+        """
+        Loads the ghosts to race in the current session, and starts recording
+        its ghost. Only seeded games have ghosts.
+        """
+        if self.race is not None:
+            self.race.close()
+        if self.seed is None or not self.ghost_dirs:
+            self.race = GhostRace([])
+            self.ghost_writer = None
+        else:
+            self.race = GhostRace(load_ghosts(self.ghost_dirs, self.seed))
+            self.ghost_writer = GhostWriter(self.seed)
+        self.race.limit = self.governor.quality()["ghosts"]
+
+    def record_ghost(self):
+        """
+        Records the player's position after a step into the session's ghost.
+        """
+        if self.ghost_writer is not None:
+            self.ghost_writer.record(self.simulation.frame, *self.simulation.player.body.position)
+
+    def finish_race(self):
+        """
+        Unmaps the ghosts of the finished session, then saves its ghost (unless
+        it was rewound) if it is among the best on its seed.
+        """
+        self.race.close()
+        if self.ghost_writer is not None and not self.rewound:
+            save_ghost(self.ghost_writer, self.simulation.score, self.ghost_dirs[0])
+        self.ghost_writer = None
+
+    def start_recording(self):
+        """
+        Starts recording the current session, if replays are being recorded.
+        """
+        if self.record is not None:
+            from replay import ReplayWriter, replay_path
+            self.simulation.recorder = ReplayWriter(replay_path(self.record, self.simulation.seed), self.simulation.seed)
+
+    def stop_recording(self):
+        """
+        Finishes the replay of the current session, if one is being recorded.
+        """
+        if self.simulation.recorder is not None:
+            self.simulation.recorder.close()
+            self.simulation.recorder = None
 
     def quit(self):
         """
         Quits the game.
         """
+        if self.loader is not None:
+            self.loader.join()  # Pygame must not quit under the worker thread
+        self.stop_recording()
+        self.race.close()
+        self.simulation.close()
+        if self.scores is not None:
+            self.scores.close()
+        if self.capture is not None:
+            self.capture.close()
+            print(f"Captured {self.capture.captured} frames ({self.capture.dropped} dropped) to {self.capture.path}")
+        if self.profiler.path is not None:
+            self.profiler.export(self.profiler.path)
         pygame.quit() 
\ No newline at end of file
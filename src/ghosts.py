@@ -0,0 +1,378 @@
+"""
+ghosts.py
+
+This module records the player's trajectory to ghost files and races recorded
+runs as ghosts: translucent sprites that follow the recorded trajectories and
+never take part in the physics.
+
+A ghost file is a header followed by fixed-width records of the player's
+position every settings.GHOST_SAMPLE_STEPS steps (and at the last step). Ghost
+files are memory-mapped and read as NumPy arrays without copying, and a
+GhostRace copies a small window of every track at a time, so racing many long
+runs only reads the parts of their files near the current frame. Positions
+between two records are interpolated, for all ghosts at once.
+
+Only seeded games (--seed) race ghosts and save their own runs as ghosts,
+since ghosts are only meaningful on the level they were recorded on.
+
+File format (little-endian):
+- Header: magic b"PDGH", format version (u8), seed (u64), score (u32), frames
+  (u32), steps between records (u32).
+- Body: (frame u32, x f32, y f32) records, in frame order, x and y in meters.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+import settings
+
+MAGIC = b"PDGH"
+VERSION = 1
+HEADER = struct.Struct("<4sBQIII")
+RECORD = np.dtype([("frame", "<u4"), ("x", "<f4"), ("y", "<f4")])
+EXTENSION = ".pdg"
+
+class GhostWriter:
+    """
+    Records the player's position during a session, to save it as a ghost
+    file once the session ends.
+
+    Records are kept in memory (12 bytes every settings.GHOST_SAMPLE_STEPS
+    steps), so a session that should not become a ghost leaves nothing behind.
+
+    Attributes:
+        seed: The seed of the recorded session.
+        interval: The number of steps between two records.
+
+    Methods:
+        record(frame, x, y):
+            Records the position after a step.
+        save(path, score):
+            Writes the ghost file.
+    """
+    def __init__(self, seed, interval=settings.GHOST_SAMPLE_STEPS):
+        """
+        Args:
+            seed: The seed of the recorded session.
+            interval: The number of steps between two records.
+        """
+        self.seed = seed
+        self.interval = interval
+        self._records = bytearray()
+        self._last = None  # The position after the latest step, if it wasn't recorded
+
+    def record(self, frame, x, y):
+        """
+        Records the player's position after a step.
+
+        Args:
+            frame: The number of steps taken.
+            x: The player's horizontal position, in meters.
+            y: The player's height, in meters.
+        """
+        if frame % self.interval:
+            self._last = (frame, x, y)
+            return
+        self._records += np.array((frame, x, y), dtype=RECORD).tobytes()
+        self._last = None
+
+    def save(self, path, score):
+        """
+        Writes the ghost file, ending with the position after the last step.
+
+        Args:
+            path: The path of the ghost file.
+            score: The session's final score.
+        """
+        records = self._records
+        if self._last is not None:
+            records = records + np.array(self._last, dtype=RECORD).tobytes()
+        frames = int(np.frombuffer(records, RECORD)["frame"][-1]) if records else 0
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.seed, score, frames, self.interval))
+            file.write(records)
+
+
+class GhostTrack:
+    """
+    A ghost file, memory-mapped.
+
+    Attributes:
+        path: The path of the ghost file.
+        seed: The seed of the recorded session.
+        score: The recorded session's final score.
+        frames: The number of steps the recorded session lasted.
+        interval: The number of steps between two records.
+        records: The records, a NumPy array of RECORD backed by the file.
+
+    Methods:
+        close():
+            Unmaps the file.
+    """
+    def __init__(self, path):
+        """
+        Maps a ghost file.
+
+        Args:
+            path: The path of the ghost file.
+
+        Raises:
+            ValueError: If the file is not a ghost file, has an unsupported
+                        version, or records fewer than two positions.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self.seed, self.score, self.frames, self.interval = read_header(path, file)
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        count = (len(self._map) - HEADER.size) // RECORD.itemsize
+        if count < 2:
+            self._map.close()
+            raise ValueError(f"{path} records fewer than two positions")
+        self.records = np.frombuffer(self._map, RECORD, count, HEADER.size)
+
+    def __len__(self):
+        return len(self.records)
+
+    def close(self):
+        """
+        Unmaps the file.
+        """
+        self.records = None  # The array must be released before the map
+        self._map.close()
+
+
+def read_header(path, file=None):
+    """
+    Reads the header of a ghost file.
+
+    Args:
+        path: The path of the ghost file.
+        file: The file, if it is already open.
+
+    Returns:
+        A tuple (seed, score, frames, interval).
+
+    Raises:
+        ValueError: If the file is not a ghost file or has an unsupported version.
+    """
+    if file is None:
+        with open(path, "rb") as file:
+            return read_header(path, file)
+    data = file.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a ghost file")
+    magic, version, seed, score, frames, interval = HEADER.unpack(data)
+    if magic != MAGIC or not interval:
+        raise ValueError(f"{path} is not a ghost file")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported ghost version {version}")
+    return seed, score, frames, interval
+
+def ghost_files(directories, seed):
+    """
+    Lists the ghost files recorded on a seed, best score first. Files that are
+    not valid ghost files are skipped.
+
+    Args:
+        directories: The directories to look in (missing ones are skipped).
+        seed: The seed the ghosts must have been recorded on.
+
+    Returns:
+        A list of (score, path) tuples.
+    """
+    found = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if not entry.name.endswith(EXTENSION):
+                continue
+            try:
+                ghost_seed, score, _, _ = read_header(entry.path)
+            except (OSError, ValueError):
+                continue
+            if ghost_seed == seed:
+                found.append((score, entry.path))
+    found.sort(key=lambda ghost: -ghost[0])
+    return found
+
+def load_ghosts(directories, seed, count=settings.GHOST_COUNT):
+    """
+    Maps the best ghosts recorded on a seed.
+
+    Args:
+        directories: The directories to look in.
+        seed: The seed the ghosts must have been recorded on.
+        count: The most ghosts to load.
+
+    Returns:
+        A list of GhostTracks, best score first.
+    """
+    tracks = []
+    for _, path in ghost_files(directories, seed):
+        if len(tracks) == count:
+            break
+        try:
+            tracks.append(GhostTrack(path))
+        except (OSError, ValueError):
+            continue
+    return tracks
+
+def save_ghost(writer, score, directory=settings.GHOST_DIR, keep=settings.GHOST_KEEP):
+    """
+    Saves a session's ghost in a directory, then deletes the directory's worst
+    ghosts on the same seed beyond the best keep.
+
+    Args:
+        writer: The GhostWriter of the session.
+        score: The session's final score.
+        directory: The directory to save the ghost in, created if needed.
+        keep: The number of ghosts kept per seed.
+
+    Returns:
+        The path of the saved ghost, or None if it was not among the best.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = int(time.time() * 1000)
+    path = os.path.join(directory, f"{stamp}-{writer.seed}{EXTENSION}")
+    while os.path.exists(path): # Another ghost saved in the same millisecond
+        stamp += 1
+        path = os.path.join(directory, f"{stamp}-{writer.seed}{EXTENSION}")
+    writer.save(path, score)
+    saved = path
+    for _, worst in ghost_files([directory], writer.seed)[keep:]:
+        os.remove(worst)
+        if worst == path:
+            saved = None
+    return saved
+
+
+class GhostRace:
+    """
+    Races a set of ghost tracks: interpolates every ghost's position at a
+    given frame and draws them all with one blits() call.
+
+    Each ghost's records near the current frame are copied from its file into
+    a window (one row of a NumPy array per ghost), which is refilled once the
+    frame leaves it, so the per-frame work runs on all ghosts at once.
+
+    Attributes:
+        tracks: The GhostTracks raced against.
+        limit: The most ghosts drawn (the best ones), or None for all.
+
+    Methods:
+        positions(frame):
+            Returns every ghost's position at a frame.
+        draw(screen, sprite, camera_offset, frame):
+            Draws the ghosts on the screen.
+        close():
+            Unmaps the ghost files.
+    """
+    def __init__(self, tracks, window=settings.GHOST_WINDOW):
+        """
+        Args:
+            tracks: The GhostTracks to race against.
+            window: The number of records of each track held at a time.
+        """
+        self.tracks = tracks
+        self.limit = None
+        self._window_size = window
+        self._lengths = np.array([len(track) for track in tracks], dtype=np.int64)
+        self._intervals = np.array([track.interval for track in tracks], dtype=np.float64)
+        self._last_frames = np.array([track.frames for track in tracks], dtype=np.float64)
+        self._rows = np.arange(len(tracks))
+
+        # Frame, x and y of the windowed records, and each window's first record
+        self._window = np.zeros((len(tracks), window, 3))
+        self._start = np.full(len(tracks), -window, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def _fill(self, ghost, index):
+        """
+        Copies the records of a ghost's track around the given index into its
+        window, mostly after it but leaving room for rewinding.
+        """
+        track = self.tracks[ghost]
+        start = max(0, min(index - self._window_size // 4, len(track) - self._window_size))
+        records = track.records[start:start + self._window_size]
+        window = self._window[ghost]
+        window[:len(records), 0] = records["frame"]
+        window[:len(records), 1] = records["x"]
+        window[:len(records), 2] = records["y"]
+        self._start[ghost] = start
+
+    def positions(self, frame):
+        """
+        Returns every ghost's position at a frame, interpolated between the two
+        records around it.
+
+        Args:
+            frame: The frame, which may lie between two steps.
+
+        Returns:
+            A tuple (x, y, running) of NumPy arrays with one entry per ghost:
+            the position in meters, and whether the ghost's run was still going
+            at that frame.
+        """
+        # The record at or before the frame (records are evenly spaced from the
+        # first interval, except for the last one)
+        index = np.clip((frame // self._intervals).astype(np.int64) - 1, 0, self._lengths - 2)
+        offset = index - self._start
+        for ghost in np.flatnonzero((offset < 0) | (offset + 1 >= self._window_size)).tolist():
+            self._fill(ghost, int(index[ghost]))
+        offset = index - self._start
+
+        before = self._window[self._rows, offset]
+        after = self._window[self._rows, offset + 1]
+        t = np.clip((frame - before[:, 0]) / (after[:, 0] - before[:, 0]), 0, 1)[:, None]
+        x, y = (before[:, 1:] + (after[:, 1:] - before[:, 1:]) * t).T
+        return x, y, frame <= self._last_frames
+
+    def draw(self, screen, sprite, camera_offset, frame):
+        """
+        Draws the ghosts still running at a frame (at most limit of them, the
+        best first), centered on their positions.
+
+        Args:
+            screen: The Pygame screen to draw on.
+            sprite: The ghost sprite.
+            camera_offset: The vertical offset of the camera, in pixels.
+            frame: The frame to draw the ghosts at, which may lie between two steps.
+
+        Returns:
+            The list of rectangles of the screen drawn to.
+        """
+        if not self.tracks or self.limit == 0:
+            return []
+        x, y, running = self.positions(frame)
+
+        # Convert the Box2D positions to the top-left corners of the sprites
+        width, height = sprite.get_size()
+        left = x * settings.PIXELS_PER_METER - width / 2
+        top = settings.SCREEN_HEIGHT - (y * settings.PIXELS_PER_METER - camera_offset) - height / 2
+        shown = np.flatnonzero(running & (top > -height) & (top < settings.SCREEN_HEIGHT))[:self.limit]
+        if not len(shown):
+            return []
+
+        return screen.blits(zip(
+            [sprite] * len(shown),
+            zip(left[shown].astype(int).tolist(), top[shown].astype(int).tolist())
+        ))
+
+    def close(self):
+        """
+        Unmaps the ghost files.
+        """
+        for track in self.tracks:
+            track.close()
+        self.tracks = []
@@ -0,0 +1,125 @@
+"""
+governor.py
+
+This module contains the FrameGovernor class, which defends the frame rate by
+trading rendering quality for time when frames get close to their budget.
+
+Capping the frame rate (clock.tick) only helps when frames are short: on a
+slow machine every frame just takes longer. The governor watches the time
+recent frames spent working (not waiting for the cap) and steps through
+settings.QUALITY_LEVELS, from best to cheapest, while that time nears
+settings.FRAME_BUDGET, then steps back up once there is headroom again.
+
+To keep it from flapping between two levels, it lowers quality past a higher
+load than it raises it at, only judges frames rendered at the current level,
+waits longer before raising quality than before lowering it, and doubles that
+wait whenever raising quality had to be undone.
+
+Physics quality is not among the levels: the simulation must stay
+deterministic for replays, ghosts and snapshots, and with one dynamic body
+Box2D's solver iterations cost next to nothing anyway.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import time
+from collections import deque
+
+import settings
+from utils import percentile
+
+class FrameGovernor:
+    """
+    Chooses a quality level from the time recent frames took.
+
+    Attributes:
+        levels: The quality levels, from best to cheapest (see settings.QUALITY_LEVELS).
+        level: The index of the current level.
+        budget: The frame time to stay within, in seconds.
+        changes: The number of level changes so far.
+
+    Methods:
+        quality():
+            Returns the current quality level.
+        update(work, now):
+            Records the time a frame took, and changes level if needed.
+        reset():
+            Forgets the recorded frames.
+    """
+    def __init__(self, levels=settings.QUALITY_LEVELS, budget=settings.FRAME_BUDGET, window=settings.GOVERNOR_WINDOW):
+        """
+        Args:
+            levels: The quality levels, from best to cheapest.
+            budget: The frame time to stay within, in seconds.
+            window: The number of recent frames the load is judged over.
+        """
+        self.levels = levels
+        self.level = 0
+        self.budget = budget
+        self.changes = 0
+        self._frames = deque(maxlen=window)
+        self._changed_at = float("-inf")  # Free to change level at once
+        self._upgrade_hold = settings.GOVERNOR_UPGRADE_HOLD
+        self._upgraded = False  # Whether the last change raised quality
+
+    def quality(self):
+        """
+        Returns the current quality level.
+        """
+        return self.levels[self.level]
+
+    def update(self, work, now=None):
+        """
+        Records the time a frame spent working, and lowers or raises quality
+        if the load calls for it.
+
+        Args:
+            work: The time the frame took, without waiting for the frame-rate
+                  cap, in seconds.
+            now: The current time (time.monotonic() if None).
+
+        Returns:
+            True if the level changed.
+        """
+        now = time.monotonic() if now is None else now
+        self._frames.append(work)
+        if len(self._frames) < self._frames.maxlen:
+            return False
+
+        load = percentile(self._frames, settings.GOVERNOR_PERCENTILE) / self.budget
+        held = now - self._changed_at
+        if self._upgraded and held >= self._upgrade_hold:
+            # The last raise has held: forget the flaps that made raising wait longer
+            self._upgraded = False
+            self._upgrade_hold = settings.GOVERNOR_UPGRADE_HOLD
+
+        if load > settings.GOVERNOR_DOWNGRADE and self.level < len(self.levels) - 1:
+            if held < settings.GOVERNOR_DOWNGRADE_HOLD:
+                return False
+            if self._upgraded:
+                # Raising quality didn't fit in the budget: wait longer before trying again
+                self._upgrade_hold = min(2 * self._upgrade_hold, settings.GOVERNOR_MAX_HOLD)
+            self._change(self.level + 1, now, upgraded=False)
+            return True
+        if load < settings.GOVERNOR_UPGRADE and self.level > 0 and held >= self._upgrade_hold:
+            self._change(self.level - 1, now, upgraded=True)
+            return True
+        return False
+
+    def _change(self, level, now, upgraded):
+        """
+        Switches to a level, and starts judging the frames rendered at it.
+        """
+        self.level = level
+        self.changes += 1
+        self._changed_at = now
+        self._upgraded = upgraded
+        self._frames.clear()
+
+    def reset(self):
+        """
+        Forgets the recorded frames (e.g. after a pause), keeping the level.
+        """
+        self._frames.clear()
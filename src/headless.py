@@ -0,0 +1,125 @@
+"""
+headless.py
+
+This module runs game sessions without a window.
+
+A headless run steps the same Simulation used by the Game (Box2D world,
+platform generation and contact listener), but skips every surface, font and
+clock call, so it runs as fast as the CPU allows.
+
+Bots:
+- A bot is any callable that takes the Simulation and returns a bitmask of
+  simulation.INPUT_* flags for the next step.
+- BOTS maps the names accepted by the command line to bot factories, which
+  take a seed and the index of the player the bot controls.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import random
+import time
+
+from simulation import Simulation, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+from replay import ReplayWriter, replay_path
+
+def idle_bot(seed, player=0):
+    """
+    Creates a bot that never presses anything.
+    """
+    return lambda simulation: 0
+
+def random_bot(seed, player=0):
+    """
+    Creates a bot that mashes random directions and jumps.
+
+    Args:
+        seed: The seed for the bot's own random number generator.
+        player: The index of the player the bot controls.
+    """
+    rng = random.Random(seed)
+    choices = (0, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_LEFT | INPUT_JUMP, INPUT_RIGHT | INPUT_JUMP)
+    return lambda simulation: rng.choice(choices)
+
+def climber_bot(seed, player=0):
+    """
+    Creates a bot that steers towards the lowest platform above its feet and
+    keeps the jump key held down.
+    """
+    def bot(simulation):
+        x, y = simulation.players[player].body.position
+        target = None
+        for platform in simulation.platforms.between(y - 1, float("inf")):
+            if platform.y > y - 1:
+                target = (platform.x, platform.y)
+                break
+
+        inputs = INPUT_JUMP
+        if target is not None:
+            if target[0] < x - 0.3:
+                inputs |= INPUT_LEFT
+            elif target[0] > x + 0.3:
+                inputs |= INPUT_RIGHT
+        return inputs
+    return bot
+
+BOTS = {
+    "idle": idle_bot,
+    "random": random_bot,
+    "climber": climber_bot,
+}
+
+def run_headless(frames, seed=None, bot="climber", inputs=None, record=None, players=1):
+    """
+    Runs a single session without a window.
+
+    Args:
+        frames: The maximum number of steps to simulate.
+        seed: The seed for platform generation (random if None).
+        bot: The name of the bot in BOTS that provides input.
+        inputs: Optional scripted input, an iterable of INPUT_* bitmasks. When
+                given it replaces the bot, and the run ends when it runs out.
+        record: Optional directory to save a replay of the session in.
+        players: The number of players sharing the session, each controlled
+                 by its own bot.
+
+    Returns:
+        A dictionary with the seed, final score, frames simulated, whether the
+        player died, the cause of death ("timeout" if the player survived),
+        and the wall-clock time taken.
+
+    Raises:
+        ValueError: If a session shared by several players is to be recorded
+                    (replays hold one player's input).
+    """
+    if record is not None and players > 1:
+        raise ValueError("can't record a session shared by several players")
+    simulation = Simulation(seed, background=False, players=players)
+    if record is not None:
+        simulation.recorder = ReplayWriter(replay_path(record, simulation.seed), simulation.seed)
+    if inputs is None:
+        if players == 1:
+            controller = BOTS[bot](simulation.seed)
+            inputs = (controller(simulation) for _ in range(frames))
+        else:
+            # Different seeds, so random bots don't all mash the same keys
+            controllers = [BOTS[bot](simulation.seed + index, index) for index in range(players)]
+            inputs = ([controller(simulation) for controller in controllers] for _ in range(frames))
+
+    start = time.perf_counter()
+    for step_inputs in inputs:
+        if simulation.frame >= frames or not simulation.step(step_inputs):
+            break
+    elapsed = time.perf_counter() - start
+    if simulation.recorder is not None:
+        simulation.recorder.close()
+
+    return {
+        "seed": simulation.seed,
+        "score": simulation.score,
+        "frames": simulation.frame,
+        "died": simulation.game_over,
+        "cause": simulation.death_cause or "timeout",
+        "seconds": elapsed,
+    }
\ No newline at end of file
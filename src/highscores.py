@@ -0,0 +1,556 @@
+"""
+highscores.py
+
+This module keeps the score of every finished run in a local SQLite database
+and uploads them to a leaderboard server in the background.
+
+- ScoreStore is the database: every run, indexed by score for the leaderboard,
+  with a partial index over the runs not uploaded yet (the offline queue, which
+  survives restarts).
+- ScoreUploader posts batches of runs as JSON to an HTTP endpoint over one
+  kept-alive connection.
+- HighScores is what the game uses: submit() only queues the run and updates
+  the in-memory leaderboard, and a worker thread writes queued runs to the
+  store and uploads pending ones, backing off exponentially while the server
+  is unreachable. Nothing it does blocks the frame loop.
+- LeaderboardServer is a local stand-in for the real server, for development
+  and benchmarks.
+
+A run is a (score, seed, frames, finished) tuple, finished being the time the
+run ended in seconds since the epoch. Uploads identify every run by the store's
+client id and the run's row id, so a batch that is retried after its response
+was lost is not counted twice.
+
+Usage:
+    python src/highscores.py --port 8765    # Serve a stand-in leaderboard
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import argparse
+import bisect
+import http.client
+import http.server
+import json
+import queue
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit, parse_qs
+
+import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    seed INTEGER,
+    frames INTEGER NOT NULL,
+    finished REAL NOT NULL,
+    uploaded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC, id);
+CREATE INDEX IF NOT EXISTS runs_pending ON runs (id) WHERE uploaded = 0;
+"""
+
+def _connect(path):
+    """
+    Opens a SQLite database in WAL mode, so readers never wait for the writer.
+    The connection may be handed to another thread, but only used by one at a time.
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")  # Durable across crashes of the game, not of the OS
+    return connection
+
+def _run_json(client, row):
+    """
+    Converts an (id, score, seed, frames, finished) row to its upload format.
+    """
+    run_id, score, seed, frames, finished = row
+    return {"client": client, "id": run_id, "score": score, "seed": seed, "frames": frames, "finished": finished}
+
+
+class ScoreStore:
+    """
+    The local database of finished runs.
+
+    Attributes:
+        path: The database file (":memory:" for a temporary store).
+        client: A random id generated when the database was created, which
+                identifies this store's runs to the leaderboard server.
+
+    Methods:
+        add(runs):
+            Stores runs, in one transaction.
+        top(k):
+            Returns the k best runs.
+        count():
+            Returns the number of stored runs.
+        pending(limit):
+            Returns the oldest runs not uploaded yet.
+        mark_uploaded(ids):
+            Removes runs from the upload queue.
+        close():
+            Closes the database.
+    """
+    def __init__(self, path=settings.HIGH_SCORE_PATH):
+        """
+        Args:
+            path: The database file, created if missing.
+        """
+        self.path = path
+        self.connection = _connect(path)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute("INSERT OR IGNORE INTO meta VALUES ('client', ?)", (uuid.uuid4().hex,))
+        self.client = self.connection.execute("SELECT value FROM meta WHERE key = 'client'").fetchone()[0]
+
+    def add(self, runs):
+        """
+        Stores runs, in one transaction.
+
+        Args:
+            runs: An iterable of (score, seed, frames, finished) tuples.
+        """
+        with self.connection:
+            self.connection.executemany("INSERT INTO runs (score, seed, frames, finished) VALUES (?, ?, ?, ?)", runs)
+
+    def top(self, k=settings.HIGH_SCORE_TOP):
+        """
+        Returns the k best runs, best first (the earliest first among equal
+        scores). This walks the first k entries of the score index, so it takes
+        the same time however many runs are stored.
+
+        Returns:
+            A list of (score, seed, frames, finished) tuples.
+        """
+        return self.connection.execute(
+            "SELECT score, seed, frames, finished FROM runs ORDER BY score DESC, id LIMIT ?", (k,)
+        ).fetchall()
+
+    def count(self):
+        """
+        Returns the number of stored runs.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def pending(self, limit=settings.HIGH_SCORE_BATCH):
+        """
+        Returns the oldest runs not uploaded yet.
+
+        Returns:
+            A list of (id, score, seed, frames, finished) tuples.
+        """
+        return self.connection.execute(
+            "SELECT id, score, seed, frames, finished FROM runs WHERE uploaded = 0 ORDER BY id LIMIT ?", (limit,)
+        ).fetchall()
+
+    def mark_uploaded(self, ids):
+        """
+        Removes runs from the upload queue.
+
+        Args:
+            ids: The row ids of the uploaded runs.
+        """
+        with self.connection:
+            self.connection.executemany("UPDATE runs SET uploaded = 1 WHERE id = ?", ((run_id,) for run_id in ids))
+
+    def close(self):
+        """
+        Closes the database.
+        """
+        self.connection.close()
+
+
+class ScoreUploader:
+    """
+    Posts batches of runs to a leaderboard endpoint, reusing one HTTP connection.
+
+    The endpoint receives {"runs": [...]} as JSON, each run with the fields of
+    _run_json(), and must answer with a 2xx status once it has stored them.
+
+    Methods:
+        upload(client, rows):
+            Posts a batch of runs.
+        close():
+            Closes the connection.
+    """
+    def __init__(self, endpoint, timeout=settings.HIGH_SCORE_TIMEOUT):
+        """
+        Args:
+            endpoint: The http:// or https:// URL to post runs to.
+            timeout: Seconds before a request is abandoned.
+        """
+        url = urlsplit(endpoint)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported leaderboard endpoint {endpoint!r}")
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._host = url.netloc
+        self._path = url.path or "/"
+        self._connection = None
+
+    def upload(self, client, rows):
+        """
+        Posts a batch of runs.
+
+        Args:
+            client: The id of the store the runs come from.
+            rows: (id, score, seed, frames, finished) tuples from ScoreStore.pending().
+
+        Returns:
+            True if the server accepted the batch, False if it should be retried.
+        """
+        body = json.dumps({"runs": [_run_json(client, row) for row in rows]}).encode()
+        headers = {"Content-Type": "application/json"}
+        if self._connection is None:
+            self._connection = self._connection_class(self._host, timeout=self.timeout)
+        try:
+            self._connection.request("POST", self._path, body, headers)
+            response = self._connection.getresponse()
+            response.read()  # Drain the response so the connection can be reused
+        except (OSError, http.client.HTTPException):
+            # The connection is in an unknown state: open a new one next time
+            self.close()
+            return False
+        if response.will_close:
+            self.close()
+        return 200 <= response.status < 300
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class HighScores:
+    """
+    Records finished runs without blocking the game: runs are queued for a
+    worker thread that stores them and uploads them in batches.
+
+    Attributes:
+        store: The ScoreStore. It belongs to the worker thread once started.
+        uploader: The ScoreUploader, or None to keep runs local.
+        retry: The first and longest delay between failed uploads, in seconds.
+
+    Methods:
+        submit(score, seed, frames):
+            Records a finished run.
+        top(k):
+            Returns the best runs.
+        rank(score):
+            Returns the leaderboard position a score would take.
+        flush(timeout):
+            Waits until every submitted run is stored.
+        close(timeout):
+            Stops the worker thread.
+    """
+    def __init__(self, path=settings.HIGH_SCORE_PATH, endpoint=settings.HIGH_SCORE_ENDPOINT,
+                 retry=settings.HIGH_SCORE_RETRY):
+        """
+        Opens the store, loads the leaderboard and starts the worker thread.
+
+        Args:
+            path: The database file.
+            endpoint: The URL to upload runs to, or None to keep them local.
+            retry: The first and longest delay between failed uploads, in seconds.
+        """
+        self.store = ScoreStore(path)
+        self.uploader = ScoreUploader(endpoint) if endpoint is not None else None
+        self.retry = retry
+
+        # The leaderboard, kept in memory so the game never waits for the
+        # database, sorted by (-score, finished) like ScoreStore.top()
+        self._top = self.store.top(settings.HIGH_SCORE_TOP)
+        self._keys = [(-run[0], run[3]) for run in self._top]
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, name="high-scores", daemon=True)
+        self._thread.start()
+
+    def submit(self, score, seed, frames):
+        """
+        Records a finished run. This only queues it, so it returns at once.
+
+        Args:
+            score: The run's score.
+            seed: The seed of the run's level.
+            frames: The number of steps the run lasted.
+        """
+        run = (score, seed, frames, time.time())
+        key = (-score, run[3])
+        index = bisect.bisect_right(self._keys, key)
+        if index < settings.HIGH_SCORE_TOP:
+            self._keys.insert(index, key)
+            self._top.insert(index, run)
+            del self._keys[settings.HIGH_SCORE_TOP:], self._top[settings.HIGH_SCORE_TOP:]
+        self._queue.put(run)
+
+    def top(self, k=settings.HIGH_SCORE_TOP):
+        """
+        Returns the best runs (at most settings.HIGH_SCORE_TOP), best first.
+
+        Returns:
+            A list of (score, seed, frames, finished) tuples.
+        """
+        return self._top[:k]
+
+    def rank(self, score):
+        """
+        Returns the leaderboard position (1 for the best) a score would take,
+        or None if it would not make the leaderboard.
+        """
+        index = bisect.bisect_right(self._keys, (-score, float("inf")))  # After the runs it ties with
+        return index + 1 if index < settings.HIGH_SCORE_TOP else None
+
+    def flush(self, timeout=None):
+        """
+        Waits until every submitted run has been written to the store.
+
+        Returns:
+            True if they were, False if the timeout passed first.
+        """
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=settings.HIGH_SCORE_TIMEOUT):
+        """
+        Stops the worker thread once it has stored the queued runs. Runs that
+        were not uploaded stay in the store and are uploaded next time.
+
+        Args:
+            timeout: The longest to wait for the worker, in seconds.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _work(self):
+        """
+        The worker thread: stores queued runs and uploads pending ones until
+        closed.
+        """
+        pending = self.uploader is not None  # Runs left over from earlier sessions
+        failures = 0
+        retry_at = 0
+        running = True
+        while running:
+            # Sleep until a run arrives, or until the next upload attempt is due
+            timeout = None
+            if pending:
+                timeout = max(0, retry_at - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+
+            # Store everything that has been queued in one transaction
+            runs, flushed = [], []
+            while item is not False:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    flushed.append(item)
+                else:
+                    runs.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = False
+            if runs:
+                self.store.add(runs)
+                pending = self.uploader is not None
+            for done in flushed:
+                done.set()
+
+            # Upload a batch, if one is due
+            if not running or not pending or time.monotonic() < retry_at:
+                continue
+            rows = self.store.pending(settings.HIGH_SCORE_BATCH)
+            if not rows:
+                pending = False
+            elif self.uploader.upload(self.store.client, rows):
+                self.store.mark_uploaded([row[0] for row in rows])
+                failures = 0
+            else:
+                # Back off exponentially, with jitter so clients don't retry in step
+                first, longest = self.retry
+                delay = min(longest, first * 2 ** failures)
+                retry_at = time.monotonic() + delay * random.uniform(0.5, 1)
+                failures += 1
+
+        if self.uploader is not None:
+            self.uploader.close()
+        self.store.close()
+
+
+class LeaderboardServer(http.server.ThreadingHTTPServer):
+    """
+    A local stand-in for the leaderboard server.
+
+    POST /runs stores a batch of runs ({"runs": [...]}), ignoring runs it
+    already has. GET /runs?limit=K returns the K best runs as {"runs": [...]}.
+
+    Attributes:
+        fail: The number of upcoming requests to answer with 503 Service
+              Unavailable, to exercise the uploader's retries.
+        requests: The number of requests received.
+
+    Methods:
+        start():
+            Serves on a background thread.
+        url():
+            Returns the URL runs are posted to.
+        count():
+            Returns the number of stored runs.
+        close():
+            Stops serving.
+    """
+    daemon_threads = True
+
+    def __init__(self, port=0, path=":memory:"):
+        """
+        Args:
+            port: The port to listen on, on localhost (0 for any free port).
+            path: The database file for the received runs.
+        """
+        super().__init__(("127.0.0.1", port), _LeaderboardHandler)
+        self.fail = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.connection = _connect(path)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    client TEXT NOT NULL, id INTEGER NOT NULL, score INTEGER NOT NULL,
+                    seed INTEGER, frames INTEGER NOT NULL, finished REAL NOT NULL,
+                    PRIMARY KEY (client, id)
+                );
+                CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC, finished);
+            """)
+        self._thread = None
+
+    def start(self):
+        """
+        Serves on a background thread.
+
+        Returns:
+            The server.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="leaderboard", daemon=True)
+        self._thread.start()
+        return self
+
+    def url(self):
+        """
+        Returns the URL runs are posted to.
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}/runs"
+
+    def count(self):
+        """
+        Returns the number of stored runs.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self):
+        """
+        Stops serving.
+        """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        self.connection.close()
+
+
+class _LeaderboardHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Handles the requests of a LeaderboardServer.
+    """
+    protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+    disable_nagle_algorithm = True  # The headers and body are written separately
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self._failing():
+            return
+        if urlsplit(self.path).path != "/runs":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            runs = json.loads(body)["runs"]
+            rows = [(run["client"], run["id"], run["score"], run["seed"], run["frames"], run["finished"]) for run in runs]
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {"error": "bad request"})
+            return
+        with self.server.lock, self.server.connection:
+            self.server.connection.executemany("INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._reply(200, {"accepted": len(rows)})
+
+    def do_GET(self):
+        if self._failing():
+            return
+        url = urlsplit(self.path)
+        if url.path != "/runs":
+            self._reply(404, {"error": "not found"})
+            return
+        limit = int(parse_qs(url.query).get("limit", [settings.HIGH_SCORE_TOP])[0])
+        with self.server.lock:
+            rows = self.server.connection.execute(
+                "SELECT score, seed, frames, finished FROM runs ORDER BY score DESC, finished LIMIT ?", (limit,)
+            ).fetchall()
+        self._reply(200, {"runs": [dict(zip(("score", "seed", "frames", "finished"), row)) for row in rows]})
+
+    def _failing(self):
+        """
+        Counts the request, and answers it with 503 if the server is told to fail.
+        """
+        with self.server.lock:
+            self.server.requests += 1
+            failing = self.server.fail > 0
+            self.server.fail -= failing
+        if failing:
+            self._reply(503, {"error": "unavailable"})
+        return failing
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Don't print a line per request
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Pydood Jump leaderboard server")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on, on localhost")
+    parser.add_argument("--db", default=":memory:", help="database file for the received runs")
+    args = parser.parse_args()
+
+    server = LeaderboardServer(args.port, args.db)
+    print(f"Serving a leaderboard at {server.url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
@@ -0,0 +1,336 @@
+"""
+level_stream.py
+
+This module contains the LevelStreamer class, which generates the level in
+fixed-height chunks ahead of the player on a worker thread.
+
+Chunks:
+- A chunk is a plain descriptor (index, theme, and the position and kind of
+  each of its platforms). The Simulation turns it into bodies by placing pooled
+  platforms, which is cheap, so no generation work happens inside a frame.
+- Each chunk draws from its own random number generator, seeded from the
+  session's seed and the chunk's index, so a level is the same whether the
+  worker ran ahead or the Simulation had to wait for it.
+
+Themes:
+- Each theme is a generator function registered in THEMES, named after the
+  game-tiles-* sets in the assets directory. A generator fills a chunk from a
+  difficulty between 0 and 1 given by one of the DIFFICULTY_CURVES.
+- The platforms of a chunk are drawn from its theme's tile sheet
+  (settings.THEME_TILE_SHEETS).
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import math
+import queue
+import random
+import threading
+from itertools import count
+
+import settings
+
+class Chunk:
+    """
+    Describes a generated chunk of the level.
+
+    Attributes:
+        index: The position of the chunk in the level, from 0 at the bottom.
+        theme: The name of the theme the chunk was generated with.
+        difficulty: The difficulty the chunk was generated at, from 0 to 1.
+        platforms: A list of (x, y, kind) tuples in meters, in increasing y.
+        top: The height of the chunk's highest platform, where the next chunk
+             continues from.
+        bottom: The height the chunk continues from (the previous chunk's top).
+    """
+    def __init__(self, index, theme, difficulty, platforms, top, bottom):
+        self.index = index
+        self.theme = theme
+        self.difficulty = difficulty
+        self.platforms = platforms
+        self.top = top
+        self.bottom = bottom
+
+
+"""------------------------------------- Difficulty Curves ------------------------------------"""
+# Each curve maps a height (in meters) to a difficulty between 0 and 1
+DIFFICULTY_CURVES = {
+    "flat": lambda height: 0.0,
+    "linear": lambda height: min(1.0, height / settings.DIFFICULTY_HEIGHT),
+    "sqrt": lambda height: min(1.0, math.sqrt(max(0.0, height) / settings.DIFFICULTY_HEIGHT)),
+}
+
+
+"""----------------------------------------- Themes -------------------------------------------"""
+def gap(rng, difficulty, low=80, high=150):
+    """
+    Returns the vertical distance to the next platform, in meters. Harder
+    chunks spread platforms further apart, up to settings.MAX_PLATFORM_GAP.
+
+    Args:
+        rng: The chunk's random number generator.
+        difficulty: The chunk's difficulty, from 0 to 1.
+        low: The smallest gap at difficulty 0, in pixels.
+        high: The largest gap at difficulty 0, in pixels.
+    """
+    pixels = rng.randint(low, high) + difficulty * settings.DIFFICULTY_EXTRA_GAP
+    return min(pixels, settings.MAX_PLATFORM_GAP) / settings.PIXELS_PER_METER
+
+def random_x(rng, low=50, high=settings.SCREEN_WIDTH - 50):
+    """
+    Returns a random horizontal position in meters, between two pixel columns.
+    """
+    return rng.randint(low, high) / settings.PIXELS_PER_METER
+
+def space_theme(rng, y, top, difficulty):
+    """
+    The classic layout: platforms anywhere across the screen.
+    """
+    platforms = []
+    while y < top:
+        y += gap(rng, difficulty)
+        platforms.append((random_x(rng), y, "normal"))
+    return platforms
+
+def jungle_theme(rng, y, top, difficulty):
+    """
+    Platforms zig-zag between the left and right halves of the screen.
+    """
+    platforms = []
+    left = rng.random() < 0.5
+    middle = settings.SCREEN_WIDTH // 2
+    while y < top:
+        y += gap(rng, difficulty)
+        x = random_x(rng, 50, middle) if left else random_x(rng, middle, settings.SCREEN_WIDTH - 50)
+        platforms.append((x, y, "normal"))
+        left = not left
+    return platforms
+
+def underwater_theme(rng, y, top, difficulty):
+    """
+    Closer platforms that drift sideways from one to the next, like a current.
+    """
+    platforms = []
+    x = random_x(rng)
+    low, high = 50 / settings.PIXELS_PER_METER, (settings.SCREEN_WIDTH - 50) / settings.PIXELS_PER_METER
+    while y < top:
+        y += gap(rng, difficulty, 70, 130)
+        x = min(high, max(low, x + rng.randint(-120, 120) / settings.PIXELS_PER_METER))
+        platforms.append((x, y, "normal"))
+    return platforms
+
+def ice_theme(rng, y, top, difficulty):
+    """
+    The classic layout, with slippery ice platforms that get more common as
+    the difficulty rises.
+    """
+    platforms = []
+    while y < top:
+        y += gap(rng, difficulty)
+        kind = "ice" if rng.random() < 0.3 + 0.4 * difficulty else "normal"
+        platforms.append((random_x(rng), y, kind))
+    return platforms
+
+def soccer_theme(rng, y, top, difficulty):
+    """
+    Wider gaps, with some rows holding two platforms side by side.
+    """
+    platforms = []
+    middle = settings.SCREEN_WIDTH // 2
+    while y < top:
+        y += gap(rng, difficulty, 90, 160)
+        if rng.random() < 0.3:
+            platforms.append((random_x(rng, 50, middle - 40), y, "normal"))
+            platforms.append((random_x(rng, middle + 40, settings.SCREEN_WIDTH - 50), y, "normal"))
+        else:
+            platforms.append((random_x(rng), y, "normal"))
+    return platforms
+
+def bunny_theme(rng, y, top, difficulty):
+    """
+    Fewer platforms with big gaps between them, for long hops.
+    """
+    platforms = []
+    while y < top:
+        y += gap(rng, difficulty, 110, 180)
+        platforms.append((random_x(rng), y, "normal"))
+    return platforms
+
+THEMES = {
+    "space": space_theme,
+    "jungle": jungle_theme,
+    "underwater": underwater_theme,
+    "ice": ice_theme,
+    "soccer": soccer_theme,
+    "bunny": bunny_theme,
+}
+
+def generate_chunk(seed, index, y, themes=settings.LEVEL_THEMES, curve=settings.DIFFICULTY_CURVE):
+    """
+    Generates a chunk of a session's level. The chunk only depends on the
+    arguments, so every level built from the same seed (a Simulation's, or a
+    BatchEnv game's) is the same.
+
+    Args:
+        seed: The seed of the session.
+        index: The index of the chunk.
+        y: The height of the platform below the chunk, in meters.
+        themes: The names of the themes chunks cycle through.
+        curve: The name of the difficulty curve in DIFFICULTY_CURVES.
+    """
+    rng = random.Random(f"{seed}-{index}")
+    theme = themes[index // settings.CHUNKS_PER_THEME % len(themes)]
+    difficulty = DIFFICULTY_CURVES[curve](y)
+    platforms = THEMES[theme](rng, y, y + settings.CHUNK_HEIGHT, difficulty)
+    return Chunk(index, theme, difficulty, platforms, platforms[-1][1] if platforms else y, y)
+
+
+
+"""---------------------------------------- Streamer ------------------------------------------"""
+class LevelStreamer:
+    """
+    Generates chunks of the level ahead of time.
+
+    In the background, a worker thread generates chunks in order into a bounded
+    queue, mostly while the game loop sleeps waiting for the next frame. The
+    Simulation takes them with next_chunk(), which only blocks if the worker
+    has fallen behind. Without a thread (for headless runs, where nothing
+    sleeps), next_chunk() generates the chunk itself.
+
+    Attributes:
+        seed: The seed of the session.
+        themes: The names of the themes chunks cycle through, every
+                settings.CHUNKS_PER_THEME chunks.
+        curve: The name of the difficulty curve in DIFFICULTY_CURVES.
+        stalls: The number of times next_chunk() had to wait for the worker.
+        position: The (index, height) the next chunk next_chunk() returns
+                  starts from.
+
+    Methods:
+        generate_chunk(index, y):
+            Generates a chunk.
+        next_chunk():
+            Returns the next chunk of the level.
+        seek(index, y):
+            Makes next_chunk() continue from another point of the level.
+        close():
+            Stops the worker thread.
+    """
+    def __init__(self, seed, start_y=1, themes=settings.LEVEL_THEMES, curve=settings.DIFFICULTY_CURVE, background=True):
+        """
+        Args:
+            seed: The seed of the session.
+            start_y: The height the first chunk starts from, in meters.
+            themes: The names of the themes chunks cycle through.
+            curve: The name of the difficulty curve.
+            background: Whether to generate chunks on a worker thread.
+        """
+        unknown = [theme for theme in themes if theme not in THEMES or theme not in settings.THEME_TILE_SHEETS]
+        if unknown:
+            raise ValueError(f"unknown level themes: {', '.join(unknown)}")
+        if curve not in DIFFICULTY_CURVES:
+            raise ValueError(f"unknown difficulty curve: {curve}")
+
+        self.seed = seed
+        self.themes = tuple(themes)
+        self.curve = curve
+        self.stalls = 0
+        self.position = (0, start_y)
+        self._chunks = self._generate(start_y)
+
+        self._queue = None
+        self._stop = None
+        self._thread = None
+        if background:
+            self._start()
+
+    def _start(self):
+        """
+        Starts the worker thread on the current chunk generator.
+        """
+        self._queue = queue.Queue(maxsize=settings.CHUNKS_AHEAD)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, name="level-stream", daemon=True)
+        self._thread.start()
+
+    def generate_chunk(self, index, y):
+        """
+        Generates a chunk. Only depends on the seed, the index and y, so it
+        can run on any thread.
+
+        Args:
+            index: The index of the chunk.
+            y: The height of the platform below the chunk, in meters.
+        """
+        return generate_chunk(self.seed, index, y, self.themes, self.curve)
+
+    def _generate(self, y, start=0):
+        """
+        Yields the chunks of the level in order from the given index, each
+        continuing from the top of the previous one.
+        """
+        for index in count(start):
+            chunk = self.generate_chunk(index, y)
+            y = chunk.top
+            yield chunk
+
+    def _work(self):
+        """
+        The worker thread: keeps the queue full until the streamer is closed.
+        """
+        for chunk in self._chunks:
+            self._queue.put(chunk)
+            if self._stop.is_set():
+                return
+
+    def next_chunk(self):
+        """
+        Returns the next chunk of the level.
+        """
+        if self._thread is None:
+            chunk = next(self._chunks)
+        else:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                self.stalls += 1
+                chunk = self._queue.get()
+        self.position = (chunk.index + 1, chunk.top)
+        return chunk
+
+    def seek(self, index, y):
+        """
+        Makes next_chunk() continue from another point of the level (e.g.
+        after restoring a snapshot). The chunks generated ahead are dropped,
+        unless the streamer is already there.
+
+        Args:
+            index: The index of the next chunk to return.
+            y: The height that chunk continues from, in meters.
+        """
+        if (index, y) == self.position:
+            return
+        background = self._thread is not None
+        self.close()
+        self.position = (index, y)
+        self._chunks = self._generate(y, index)
+        if background:
+            self._start()
+
+    def close(self):
+        """
+        Stops the worker thread, if there is one.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        # Make room in the queue so a worker blocked on put() can see the stop flag
+        while self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(0.001)
+        self._thread = None
@@ -4,22 +4,126 @@ main.py
 This is the entry point for Pydood Jump.
 It initializes the game and starts the main game loop.
 
+Usage:
+    python src/main.py                                  # Play the game
+    python src/main.py --headless --frames N --seed S   # Simulate without a window
+    python src/main.py --record replays/                # Save a replay of every session
+    python src/main.py --replay replays/<file>.pdr      # Re-simulate a replay at full speed
+    python src/main.py --profile profile.csv            # Save the frame profile on exit (or .json)
+    python src/main.py --capture capture.pdc            # Capture every frame (or a directory, for PNG images)
+    python src/main.py --replay R.pdr --capture frames/ # Capture a replay, one frame per step
+    python src/main.py --scores-endpoint URL            # Upload finished runs to a leaderboard
+    python src/main.py --seed S --ghosts race/          # Race the ghosts in race/ (and your best runs)
+    python src/main.py --startup-report                 # Time each phase of startup (to stderr)
+    python src/main.py --players 2                      # Split the screen between local players
+
 Author:     DevXCVIII
 Date:       March 24, 2025
 License:    MIT
 """
 
+# Time startup from here, before anything else is imported (see startup.py)
+import time
+START = time.perf_counter()
+
 # Imports
-import pygame
-import Box2D
-import game
+import argparse
+import sys
+
+import settings
+from startup import StartupTimer
 
-# Initialize Pygame
-pygame.init()
+def parse_args():
+    """
+    Parses the command line arguments.
+    """
+    from headless import BOTS
+
+    parser = argparse.ArgumentParser(description="Pydood Jump")
+    parser.add_argument("--seed", type=int, default=None, help="seed for platform generation (0 to 2**63 - 1)")
+    parser.add_argument("--headless", action="store_true", help="simulate without a window, as fast as possible")
+    parser.add_argument("--frames", type=int, default=3600, help="maximum number of frames to simulate when headless")
+    parser.add_argument("--bot", default="climber", choices=sorted(BOTS), help="bot providing input when headless")
+    parser.add_argument("--record", metavar="DIR", default=None, help="save a replay of every session in DIR")
+    parser.add_argument("--replay", metavar="FILE", default=None, help="re-simulate a replay without a window")
+    parser.add_argument("--log-score", metavar="SECONDS", type=float, default=None,
+                        help="print the score to stdout at most once every SECONDS while playing")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="save the frame profile to FILE (.csv or .json) on exit")
+    parser.add_argument("--scores", metavar="FILE", default=settings.HIGH_SCORE_PATH,
+                        help="database of finished runs (default: highscores.db)")
+    parser.add_argument("--scores-endpoint", metavar="URL", default=settings.HIGH_SCORE_ENDPOINT,
+                        help="leaderboard URL to upload finished runs to (see highscores.py for a stand-in server)")
+    parser.add_argument("--capture", metavar="PATH", default=None,
+                        help="capture the rendered frames to PATH (.pdc for a raw file, otherwise a directory of PNG images)")
+    parser.add_argument("--ghosts", metavar="DIR", action="append", default=[],
+                        help="also race the ghosts recorded on the same seed in DIR (repeatable)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print the time each phase of startup takes to stderr, like python -X importtime")
+    parser.add_argument("--players", type=int, default=1, choices=range(1, len(settings.PLAYER_KEYS) + 1),
+                        help="number of local players sharing the level on a split screen")
+    args = parser.parse_args()
+    # Replays, ghosts and snapshots store the seed as a u64, and the high scores as a signed 64-bit integer
+    if args.seed is not None and not 0 <= args.seed < 2 ** 63:
+        parser.error("--seed must be between 0 and 2**63 - 1")
+    if args.players > 1 and (args.record or args.replay):
+        parser.error("replays record a single player")
+    return args
 
 if __name__ == "__main__":
-    # Initialize the game
-    game = game.Game()
+    args = parse_args()
+
+    if args.replay or args.headless:
+        from headless import run_headless
+        from replay import play_replay
+
+        if args.replay and args.capture:
+            from capture import capture_replay
+            result = capture_replay(args.replay, args.capture)
+        elif args.replay:
+            result = play_replay(args.replay)
+        else:
+            result = run_headless(args.frames, seed=args.seed, bot=args.bot, record=args.record,
+                                  players=args.players)
+        fps = result["frames"] / result["seconds"] if result["seconds"] else 0
+        print(f"seed={result['seed']} score={result['score']} frames={result['frames']} "
+              f"died={result['died']} time={result['seconds']:.3f}s ({fps:.0f} frames/s)")
+    else:
+        # Time the phases until the main menu is on screen
+        startup = StartupTimer(sys.stderr if args.startup_report else None, start=START)
+        startup.mark("parse the arguments")
+
+        # Import the game only now, so the headless modes don't pay for it
+        import pygame
+        startup.mark("import pygame")
+        import game
+        startup.mark("import the game")
+
+        # Initialize only the Pygame subsystems the game uses (no audio or joysticks)
+        pygame.display.init()
+        pygame.font.init()
+        startup.mark("initialize pygame")
+
+        # Report the score if requested
+        telemetry = None
+        if args.log_score is not None:
+            from telemetry import TelemetrySink
+            telemetry = TelemetrySink(args.log_score)
+
+        # Export the frame profile on exit if requested
+        from profiler import FrameProfiler
+        profiler = FrameProfiler(path=args.profile)
+
+        # Record finished runs, and upload them if a leaderboard is given
+        from highscores import HighScores
+        scores = HighScores(args.scores, endpoint=args.scores_endpoint)
+        startup.mark("open the high scores")
+
+        # Initialize the game, loading the gameplay images while the main menu is up
+        game = game.Game(seed=args.seed, record=args.record, telemetry=telemetry, profiler=profiler, scores=scores,
+                         ghost_dirs=[settings.GHOST_DIR, *args.ghosts], capture=args.capture,
+                         startup=startup, background_load=True, players=args.players)
 
-    # Start the game loop
-    game.run()
\ No newline at end of file
+        # Start the game loop
+        game.run()
+        game.quit()
\ No newline at end of file
@@ -1,24 +1,44 @@
 """
 platforms.py
 
-This module contains the Platform class and the generate_platforms function.
+This module contains the Platform, PlatformStore, PlatformPool and
+PlatformIndex classes.
 
 Platform:
 - Represents a single platform in the game.
-- Handles rendering and one-way collision behavior.
+- Handles activation (one-way collision itself is handled by the ContactListener).
 
-generate_platforms:
-- Dynamically generates a list of platforms at random positions.
+PlatformStore:
+- Keeps the state of every pooled platform in NumPy columns (position, kind,
+  theme, whether it is placed and whether it is active), so rendering transforms
+  all visible platforms in one vectorized pass and draws them with one blits() call.
+
+PlatformPool:
+- Owns a fixed set of static bodies that are moved around and reused, so the
+  number of bodies in the Box2D world stays constant however high the player climbs.
+
+PlatformIndex:
+- Keeps the live platforms ordered by height, so culling from the bottom and
+  "platforms between two heights" queries only touch the platforms involved
+  instead of scanning the whole list every frame.
 
 Author:     DevXCVIII
 Date:       March 24, 2025
 """
 
-import pygame
-from Box2D.b2 import staticBody, polygonShape
-import random
+import numpy as np
+from Box2D.b2 import polygonShape
+from bisect import bisect_left, bisect_right
 import settings
 
+# The kinds of platform, and the code each is stored under in PlatformStore.kind
+PLATFORM_KIND_NAMES = tuple(settings.PLATFORM_KINDS)
+PLATFORM_KIND_CODES = {kind: code for code, kind in enumerate(PLATFORM_KIND_NAMES)}
+
+# The level themes, and the code each is stored under in PlatformStore.theme
+PLATFORM_THEME_NAMES = tuple(settings.THEME_TILE_SHEETS)
+PLATFORM_THEME_CODES = {theme: code for code, theme in enumerate(PLATFORM_THEME_NAMES)}
+
 class Platform:
     """
     Represents a single platform in the game.
@@ -26,78 +46,355 @@ class Platform:
     Attributes:
         body: The Box2D body representing the platform.
         fixture: The Box2D fixture for the platform's collision shape.
+        store: The PlatformStore holding the platform's row.
+        slot: The index of the platform's row in the store.
+        x, y: The position of the platform in meters, cached so that lookups
+              do not go through the Box2D position accessor (the store keeps
+              the same values in its columns for vectorized passes).
+        active: Whether the body takes part in the simulation, mirrored here so
+                that checking it does not go through Box2D.
+        kind: The kind of platform (a key of settings.PLATFORM_KINDS).
+        theme: The theme of the chunk the platform belongs to, which picks its
+               tile sheet (a key of settings.THEME_TILE_SHEETS).
 
     Methods:
-        draw(screen, camera_offset):
-            Renders the platform on the screen.
-        update_sensor(player):
-            Updates the platform's sensor property to allow one-way collisions.
+        place(x, y, kind, theme):
+            Moves the platform to a new position.
+        set_active(active):
+            Enables or disables the platform's body.
+        park():
+            Disables the platform so it no longer takes part in the simulation.
     """
-    def __init__(self, body):
+    __slots__ = ("body", "fixture", "store", "slot", "x", "y", "active", "kind", "theme")
+
+    def __init__(self, body, store, slot):
         self.body = body
-        self.body.userData = "platform"
         self.fixture = self.body.CreateFixture(
             shape=polygonShape(box=(settings.PLATFORM_WIDTH / 2 / settings.PIXELS_PER_METER, 
                                              settings.PLATFORM_HEIGHT / 2 / settings.PIXELS_PER_METER)),
             density=0,
-            friction=0.5
+            friction=settings.PLATFORM_KINDS["normal"]["friction"],
+            categoryBits=settings.CATEGORY_PLATFORM,
+            maskBits=settings.CATEGORY_PLAYER,
+            userData=settings.CATEGORY_PLATFORM
         )
-        self.fixture.sensor = False
+        self.store = store
+        self.slot = slot
+        self.body.userData = slot  # Finds the platform from a contact's fixture
+        self.active = self.body.active
+        self.kind = "normal"
+        self.theme = PLATFORM_THEME_NAMES[0]
+        self.x, self.y = self.body.position
+        store.x[slot], store.y[slot] = self.x, self.y
+        store.kind[slot] = PLATFORM_KIND_CODES[self.kind]
+        store.theme[slot] = PLATFORM_THEME_CODES[self.theme]
+        store.active[slot] = self.active
 
-    def draw(self, screen, camera_offset):
+    def place(self, x, y, kind="normal", theme=PLATFORM_THEME_NAMES[0]):
         """
-        Draws the platform sprite on the screen.
+        Moves the platform to a new position. The platform stays disabled
+        until the Simulation activates it (see set_active).
+
+        Args:
+            x: The horizontal position in meters.
+            y: The vertical position in meters.
+            kind: The kind of platform (a key of settings.PLATFORM_KINDS).
+            theme: The theme of the platform's chunk (a key of settings.THEME_TILE_SHEETS).
+        """
+        store, slot = self.store, self.slot
+        if kind != self.kind:
+            self.kind = kind
+            self.fixture.friction = settings.PLATFORM_KINDS[kind]["friction"]
+            store.kind[slot] = PLATFORM_KIND_CODES[kind]
+        if theme != self.theme:
+            self.theme = theme
+            store.theme[slot] = PLATFORM_THEME_CODES[theme]
+        self.body.position = (x, y)
+        self.x, self.y = self.body.position  # Rounded to Box2D's single precision
+        store.x[slot], store.y[slot] = self.x, self.y
+        store.placed[slot] = True
+
+    def set_active(self, active):
+        """
+        Enables or disables the platform's body. Inactive bodies are removed
+        from the broadphase and have their contacts destroyed, but keep their
+        fixtures for reuse.
+
+        Args:
+            active: True to enable the body, False to disable it.
+        """
+        if active != self.active:
+            self.body.active = active
+            self.active = active
+            self.store.active[self.slot] = active
+
+    def park(self):
+        """
+        Disables the platform so it no longer takes part in the simulation.
+        """
+        self.set_active(False)
+        self.store.placed[self.slot] = False
+
+
+class PlatformStore:
+    """
+    The state of every pooled platform, as one NumPy column per field.
+
+    Row i belongs to the pool's i-th platform. Rows are only ever added (when
+    the pool grows), so a platform keeps its row for as long as it exists.
+
+    Attributes:
+        x, y: The positions of the platforms in meters.
+        kind: The code of each platform's kind (see PLATFORM_KIND_CODES).
+        theme: The code of each platform's theme (see PLATFORM_THEME_CODES).
+        placed: Whether each platform is in the level (False while parked in the pool).
+        active: Whether each platform's body takes part in the simulation.
+        size: The number of rows in use.
+
+    Methods:
+        add():
+            Adds a row and returns its index.
+        visible(low, high):
+            Returns the rows of the placed platforms between two heights.
+        draw(screen, sprites, camera_offset, low, high, scale):
+            Draws the placed platforms between two heights.
+    """
+    def __init__(self, capacity=settings.PLATFORM_POOL_SIZE):
+        """
+        Args:
+            capacity: The number of rows to allocate up front.
+        """
+        capacity = max(capacity, 1)
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+        self.theme = np.zeros(capacity, dtype=np.uint8)
+        self.placed = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.size = 0
+
+    def add(self):
+        """
+        Adds a row, doubling the columns when they are full.
+
+        Returns:
+            The index of the new row.
+        """
+        if self.size == len(self.x):
+            for name in ("x", "y", "kind", "theme", "placed", "active"):
+                column = getattr(self, name)
+                grown = np.zeros(2 * len(column), dtype=column.dtype)
+                grown[:len(column)] = column
+                setattr(self, name, grown)
+        self.size += 1
+        return self.size - 1
+
+    def visible(self, low, high):
+        """
+        Returns the rows of the placed platforms whose height lies in [low, high].
+
+        Args:
+            low: The lowest height in meters.
+            high: The highest height in meters.
+        """
+        y = self.y[:self.size]
+        return np.flatnonzero(self.placed[:self.size] & (y >= low) & (y <= high))
+
+    def draw(self, screen, sprites, camera_offset, low, high, scale=1):
+        """
+        Draws the placed platforms whose height lies in [low, high]. The
+        sprites' screen positions are computed for all of them at once, then
+        the sprites are drawn with a single blits() call.
 
         Args:
             screen: The Pygame screen to draw on.
-            camera_offset: The vertical offset of the camera.
-        """
-        x_pos = self.body.position.x * settings.PIXELS_PER_METER
-        y_pos = settings.SCREEN_HEIGHT - (self.body.position.y * settings.PIXELS_PER_METER - camera_offset)
-
-        pygame.draw.rect(
-            screen,
-            (0, 255, 0),
-            pygame.Rect(
-                int(x_pos - settings.PLATFORM_WIDTH / 2),
-                int(y_pos - settings.PLATFORM_HEIGHT / 2),
-                int(settings.PLATFORM_WIDTH),
-                int(settings.PLATFORM_HEIGHT)
-            ),
-            0  # Fill the rectangle
-        )
+            sprites: The sprite of each theme and kind of platform, indexed by
+                     theme code, then kind code.
+            camera_offset: The vertical offset of the camera, in pixels.
+            low: The lowest height to draw, in meters.
+            high: The highest height to draw, in meters.
+            scale: The size of the screen relative to the game's (e.g. for a
+                   split-screen viewport), which the sprites are scaled to.
+
+        Returns:
+            The list of rectangles of the screen drawn to.
+        """
+        rows = self.visible(low, high)
+        if not len(rows):
+            return []
+
+        # Convert the Box2D positions to the top-left corners of the sprites
+        left = self.x[rows] * settings.PIXELS_PER_METER - settings.PLATFORM_SPRITE_WIDTH / 2
+        top = settings.SCREEN_HEIGHT - (self.y[rows] * settings.PIXELS_PER_METER - camera_offset) - settings.PLATFORM_SPRITE_HEIGHT / 2
+        if scale != 1:
+            left *= scale
+            top *= scale
 
-    def update_sensor(self, player):
+        return screen.blits(zip(
+            [sprites[theme][kind] for theme, kind in zip(self.theme[rows].tolist(), self.kind[rows].tolist())],
+            zip(left.astype(int).tolist(), top.astype(int).tolist())
+        ))
+
+
+class PlatformPool:
+    """
+    A pool of reusable platforms.
+
+    The pool creates its static bodies and fixtures up front and hands them
+    out with acquire(). Platforms that scroll off-screen are given back with
+    release() and parked until they are needed again, instead of leaking a
+    new body into the world for every platform ever generated.
+
+    Attributes:
+        world: The Box2D world the platforms belong to.
+        store: The PlatformStore holding the state of every platform.
+        platforms: Every platform owned by the pool, in creation order (the
+                   order of their rows in the store).
+        free: The parked platforms ready to be reused.
+        size: The total number of platforms owned by the pool.
+
+    Methods:
+        reserve(size):
+            Grows the pool to at least size platforms.
+        acquire(x, y, kind, theme):
+            Returns a platform placed at the given position.
+        release(platform):
+            Parks a platform and returns it to the pool.
+        reset():
+            Parks every platform and returns them all to the pool.
+    """
+    def __init__(self, world, size=settings.PLATFORM_POOL_SIZE):
+        self.world = world
+        self.store = PlatformStore(size)
+        self.platforms = []
+        self.free = []
+        self.size = 0
+        for _ in range(size):
+            self.free.append(self._create())
+
+    def _create(self):
+        """
+        Creates a new parked platform. Only called when the pool runs dry,
+        so the pool grows to the peak number of live platforms and no further.
         """
-        Updates the platform's sensor property based on the player's position.
+        platform = Platform(self.world.CreateStaticBody(position=(0, 0)), self.store, self.store.add())
+        platform.park()
+        self.platforms.append(platform)
+        self.size += 1
+        return platform
 
-        If the player is above the platform, the platform is solid.
-        If the player is below the platform, the platform becomes a sensor,
-        allowing the player to pass through from below.
+    def reserve(self, size):
         """
-        if player.body.position.y > self.body.position.y:
-            self.fixture.sensor = False  # Solid when the player is above
-        else:
-            self.fixture.sensor = True  # Pass-through when the player is below
+        Creates parked platforms until the pool owns at least size of them.
+        The new platforms are not added to the free list.
+        """
+        while self.size < size:
+            self._create()
+
+    def acquire(self, x, y, kind="normal", theme=PLATFORM_THEME_NAMES[0]):
+        """
+        Returns a platform placed at the given position.
+
+        Args:
+            x: The horizontal position in meters.
+            y: The vertical position in meters.
+            kind: The kind of platform (a key of settings.PLATFORM_KINDS).
+            theme: The theme of the platform's chunk (a key of settings.THEME_TILE_SHEETS).
+        """
+        platform = self.free.pop() if self.free else self._create()
+        platform.place(x, y, kind, theme)
+        return platform
 
+    def release(self, platform):
+        """
+        Parks a platform and returns it to the pool.
+        """
+        platform.park()
+        self.free.append(platform)
+
+    def reset(self):
+        """
+        Parks every platform and returns them all to the pool, in the order a
+        new pool hands them out, so a reset session places the same bodies as
+        a new one.
+        """
+        for platform in self.platforms:
+            platform.park()
+        self.free = list(self.platforms)
 
-def generate_platforms(world, start_y=1, num_platforms=10):
+
+class PlatformIndex:
     """
-    Generates a list of platforms at random positions.
+    The live platforms, ordered from lowest to highest.
 
-    Args:
-        world: The Box2D world where the platforms will be created.
-        start_y: The starting vertical position for the first platform.
-        num_platforms: The number of platforms to generate.
+    Platforms are only ever added above the current highest one and removed
+    from the bottom, so the index is a list with a moving start: appending is
+    O(1), culling k platforms is O(k) and range queries are a binary search.
 
-    Returns:
-        A list of Platform objects.
+    Methods:
+        extend(platforms):
+            Adds platforms above the current highest one.
+        cull_below(y):
+            Removes and returns the platforms at or below a height.
+        between(low, high):
+            Returns the platforms whose height lies in [low, high].
     """
-    platforms = []
-    y = start_y
-    for _ in range(num_platforms):
-        x = random.randint(50, settings.SCREEN_WIDTH - 50) / settings.PIXELS_PER_METER
-        y += random.randint(80, 150) / settings.PIXELS_PER_METER
-        platform = Platform(world.CreateStaticBody(position=(x, y)))
-        platforms.append(platform)
-    return platforms
\ No newline at end of file
+    def __init__(self, platforms=()):
+        self._platforms = []
+        self._heights = []
+        self._start = 0
+        self.extend(platforms)
+
+    def __len__(self):
+        return len(self._platforms) - self._start
+
+    def __iter__(self):
+        return iter(self._platforms[self._start:])
+
+    def extend(self, platforms):
+        """
+        Adds platforms, which must be ordered by height and lie above the
+        current highest platform.
+
+        Raises:
+            ValueError: If a platform would break the ordering.
+        """
+        for platform in platforms:
+            if len(self) and platform.y < self._heights[-1]:
+                raise ValueError("platforms must be added in increasing height")
+            self._platforms.append(platform)
+            self._heights.append(platform.y)
+
+    def cull_below(self, y):
+        """
+        Removes the platforms at or below a height.
+
+        Args:
+            y: The height in meters.
+
+        Returns:
+            The list of removed platforms, lowest first.
+        """
+        end = bisect_right(self._heights, y, self._start)
+        culled = self._platforms[self._start:end]
+        self._start = end
+
+        # Drop the dead prefix once it outweighs the live platforms
+        if self._start > len(self):
+            del self._platforms[:self._start]
+            del self._heights[:self._start]
+            self._start = 0
+        return culled
+
+    def between(self, low, high):
+        """
+        Returns the platforms whose height lies in [low, high], lowest first.
+
+        Args:
+            low: The lowest height in meters.
+            high: The highest height in meters.
+        """
+        start = bisect_left(self._heights, low, self._start)
+        end = bisect_right(self._heights, high, start)
+        return self._platforms[start:end]
+
@@ -9,12 +9,15 @@ The Player class handles:
 - Rendering the player sprite on the screen.
 - Interacting with the physics world (e.g., platforms).
 
+Several players can share a world (see Simulation): each one's body userData
+is its index, which the ContactListener uses to find the player a contact
+belongs to.
+
 Author:     DevXCVIII
 Date:       March 24, 2025
 """
 
 # Imports
-import pygame
 import Box2D
 import settings
 from Box2D.b2 import polygonShape
@@ -25,58 +28,114 @@ class Player:
 
     Attributes:
         world: The Box2D world the player belongs to.
+        index: The player's index among the players sharing the world, also
+               stored in its body's userData.
+        count: The number of players sharing the world.
         body: The Box2D dynamic body representing the player.
+        fixture: The Box2D fixture for the player's hitbox.
+        previous_position: The body position before the last physics step,
+                           used to interpolate rendering between steps.
+        previous_angle: The body angle before the last physics step.
         grounded: A boolean indicating whether the player is on the ground.
         jump_cooldown: An integer cooldown timer to prevent continuous jumping.
-        sprite: The Pygame surface representing the player's sprite.
+        alive: False once the player has fallen out of the game.
+        animator: The PlayerAnimator drawing the player's sprites. It is set
+                  by the Game, so headless sessions never load them.
 
     Methods:
+        reset():
+            Puts the player back at its starting position, at rest.
+        refresh_contacts():
+            Recreates the player's hitbox and with it the player's contacts.
         update():
-            Updates the player's state (e.g., cooldown timer).
-        render(screen, camera_offset):
-            Renders the player sprite on the screen.
+            Updates the player's state (e.g., cooldown timer, animation).
+        render(screen, camera_offset, alpha, scale):
+            Renders the player's animated sprite on the screen.
         jump():
             Makes the player jump if grounded and cooldown is over.
         move(direction):
             Moves the player left or right based on the given direction.
     """
-    def __init__(self, world):
+    __slots__ = ("world", "index", "count", "body", "fixture", "previous_position", "previous_angle", "grounded",
+                 "jump_cooldown", "alive", "animator")
+
+    def __init__(self, world, index=0, count=1):
         """
         Initializes the player.
 
         Args:
             world: The Box2D world where the player will be created.
+            index: The player's index among the players sharing the world.
+            count: The number of players sharing the world, who start evenly
+                   spaced across the screen.
         """
         self.world = world
+        self.index = index
+        self.count = count
 
-        # Physics setup
-        starting_pos = (settings.SCREEN_WIDTH // 2, settings.SCREEN_HEIGHT // 4)
-        self.body = world.CreateDynamicBody(
-            position=(starting_pos[0] / settings.PIXELS_PER_METER, starting_pos[1] / settings.PIXELS_PER_METER)
-        )
+        # Physics setup (reset() places the body and creates its hitbox). The
+        # player never sleeps: Box2D's sleep timer cannot be saved in a snapshot.
+        # It never rotates either, so it lands on its feet instead of tipping
+        # over platform corners
+        self.body = world.CreateDynamicBody(allowSleep=False, fixedRotation=True, userData=index)
+        self.fixture = None
+        self.reset()
+
+        # Animation setup (provided by the Game)
+        self.animator = None
+
+    def reset(self):
+        """
+        Puts the player back at its starting position, at rest, so a new
+        session can reuse the body instead of creating a new one.
+        """
+        starting_pos = (settings.SCREEN_WIDTH * (self.index + 1) // (self.count + 1), settings.SCREEN_HEIGHT // 4)
+        self.body.position = (starting_pos[0] / settings.PIXELS_PER_METER, starting_pos[1] / settings.PIXELS_PER_METER)
+        self.body.angle = 0
+        self.body.linearVelocity = (0, 0)
+        self.body.angularVelocity = 0
+        self.body.awake = True
+        self.body.active = True
+        self.alive = True
+        self.previous_position = self.body.position.copy()
+        self.previous_angle = 0
         self.grounded = False
         self.jump_cooldown = 0
+        self.refresh_contacts()
 
-        # Create a rectangular hitbox for the player
-        hitbox = polygonShape(box=(settings.PLAYER_HITBOX_WIDTH / 2, settings.PLAYER_HITBOX_HEIGHT / 2))
-        self.body.CreateFixture(shape=hitbox, density=1, friction=0.3)
+    def refresh_contacts(self):
+        """
+        Creates the player's rectangular hitbox, replacing the existing one.
 
-        # Sprite setup
-        self.sprite = pygame.image.load("assets/space-left@2x.png").convert_alpha()
-        self.sprite = pygame.transform.scale(
-            self.sprite, (settings.PLAYER_SPRITE_WIDTH, settings.PLAYER_SPRITE_HEIGHT)
+        Destroying the fixture drops the player's contacts, and Box2D looks
+        for a new fixture's contacts before the next step, as in a new world.
+        Resets and restored snapshots call this so they play like new sessions.
+        """
+        if self.fixture is not None:
+            self.body.DestroyFixture(self.fixture)
+        hitbox = polygonShape(box=(settings.PLAYER_HITBOX_WIDTH / 2, settings.PLAYER_HITBOX_HEIGHT / 2))
+        self.fixture = self.body.CreateFixture(
+            shape=hitbox,
+            density=1,
+            friction=0.3,
+            categoryBits=settings.CATEGORY_PLAYER,
+            maskBits=settings.CATEGORY_PLATFORM,
+            userData=settings.CATEGORY_PLAYER
         )
 
     def update(self):
         """
-        Updates the player's state (e.g., position, velocity, etc.).
+        Updates the player's state (e.g., position, velocity, etc.) after a
+        physics step, and its animation.
         """
         if self.jump_cooldown > 0:
             self.jump_cooldown -= 1
+        if self.animator is not None:
+            self.animator.step(self)
 
-    def render(self, screen, camera_offset):
+    def render(self, screen, camera_offset, alpha=1.0, scale=1):
         """
-        Renders the player sprite on the screen.
+        Renders the player's animated sprite on the screen.
 
         Converts the player's position from Box2D world coordinates to Pygame screen
         coordinates. The sprite is centered on the player's physics body.
@@ -84,20 +143,30 @@ class Player:
         Args:
             screen: The Pygame screen to draw on.
             camera_offset: The vertical offset of the camera.
+            alpha: How far between the previous physics step (0) and the current
+                   one (1) to draw the player.
+            scale: The size of the screen relative to the game's (e.g. for a
+                   split-screen viewport), which the animator's sprites are
+                   baked at.
+
+        Returns:
+            The rectangle of the screen drawn to.
         """
-        # Get the player's position from the Box2D world
+        # Interpolate the player's position between the last two physics steps
+        previous_x, previous_y = self.previous_position
         x, y = self.body.position
+        x = previous_x + (x - previous_x) * alpha
+        y = previous_y + (y - previous_y) * alpha
 
         # Convert the Box2D position to Pygame coordinates
         screen_x = x * settings.PIXELS_PER_METER
         screen_y = settings.SCREEN_HEIGHT - (y * settings.PIXELS_PER_METER - camera_offset)
+        if scale != 1:
+            screen_x *= scale
+            screen_y *= scale
 
-        # Adjust for sprite size (center the sprite on the physics body)
-        screen_x -= settings.PLAYER_SPRITE_WIDTH / 2
-        screen_y -= settings.PLAYER_SPRITE_HEIGHT / 2
-
-        # Draw the sprite to the screen
-        screen.blit(self.sprite, (screen_x, screen_y))
+        # Draw the current frame of the animation, centered on the physics body
+        return self.animator.draw(screen, screen_x, screen_y)
 
     def jump(self):
         """
@@ -0,0 +1,283 @@
+"""
+profiler.py
+
+This module contains the FrameProfiler class, which times the phases of every
+frame of the game loop.
+
+FrameProfiler:
+- Records, for each of the last settings.PROFILER_FRAMES frames, the time spent
+  in each phase (event pump, input, world step, game update, level streaming and
+  culling, rendering, display flip and frame-rate wait) along with the number of physics steps, Box2D bodies,
+  contacts and contact listener callbacks, and the frame governor's quality level.
+- Draws an overlay with frame time percentiles and the world's counters (F3).
+- Exports the recorded frames to CSV or JSON (F4, or on exit with --profile).
+  The overlay shows where F4 saved them for a few seconds, even while hidden.
+
+Recording costs a few perf_counter calls per frame, so it is always on.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import csv
+import json
+import os
+import time
+from array import array
+
+import pygame
+
+import settings
+from utils import percentile
+
+PHASES = ("wait", "events", "input", "world", "update", "level", "render", "flip", "capture")
+COUNTERS = ("steps", "bodies", "contacts", "callbacks", "quality")
+COLUMNS = PHASES + ("total",) + COUNTERS
+
+class FrameProfiler:
+    """
+    Times the phases of each frame into a fixed-size ring buffer.
+
+    Phase times are in seconds while recording, and exported in milliseconds.
+
+    Attributes:
+        size: The number of frames kept.
+        frames: The number of frames recorded so far (including overwritten ones).
+        path: Optional file the profile is exported to when the game quits.
+        overlay: Whether the overlay is shown.
+        overlay_refresh: The number of seconds between two rebuilds of the overlay text.
+
+    Methods:
+        begin_frame():
+            Starts timing a new frame.
+        lap(phase, start):
+            Adds the time since start to a phase.
+        add(counter, value):
+            Adds to one of the frame's counters.
+        end_frame(world):
+            Stores the frame in the ring buffer.
+        rows():
+            Returns the recorded frames, oldest first.
+        summary():
+            Returns the p50/p95/p99 of every column.
+        toggle_overlay():
+            Shows or hides the overlay.
+        notify(text):
+            Shows a notice on the overlay for a few seconds.
+        draw_overlay(screen, font):
+            Draws the overlay, if shown, and the current notice.
+        export(path):
+            Writes the recorded frames to a CSV or JSON file.
+        export_snapshot(directory):
+            Writes the recorded frames to a new, timestamped CSV and JSON pair.
+    """
+    def __init__(self, size=settings.PROFILER_FRAMES, path=None):
+        """
+        Args:
+            size: The number of frames kept in the ring buffer.
+            path: Optional file to export the profile to when the game quits.
+        """
+        self.size = size
+        self.frames = 0
+        self.path = path
+        self.overlay = False
+        self.overlay_refresh = settings.PROFILER_OVERLAY_REFRESH
+        self._columns = {name: array("d", bytes(8 * size)) for name in COLUMNS}
+        self._current = dict.fromkeys(COLUMNS, 0)
+        self._frame_start = 0
+        self._overlay_surface = None
+        self._overlay_time = 0
+        self._notice = None
+        self._notice_end = 0
+
+    """------------------------------------- Recording ------------------------------------------"""
+    def begin_frame(self):
+        """
+        Starts timing a new frame.
+
+        Returns:
+            The current time, to be passed to the first lap().
+        """
+        for name in COLUMNS:
+            self._current[name] = 0
+        self._frame_start = time.perf_counter()
+        return self._frame_start
+
+    def lap(self, phase, start):
+        """
+        Adds the time since start to a phase.
+
+        Args:
+            phase: One of PHASES.
+            start: The time the phase started, from time.perf_counter().
+
+        Returns:
+            The current time, so laps can be chained.
+        """
+        now = time.perf_counter()
+        self._current[phase] += now - start
+        return now
+
+    def add(self, counter, value):
+        """
+        Adds to one of the frame's counters (see COUNTERS).
+        """
+        self._current[counter] += value
+
+    def end_frame(self, world):
+        """
+        Stores the frame in the ring buffer.
+
+        Args:
+            world: The Box2D world, whose body and contact counts are recorded.
+        """
+        current = self._current
+        current["total"] = time.perf_counter() - self._frame_start
+        current["bodies"] = world.bodyCount
+        current["contacts"] = world.contactCount
+
+        index = self.frames % self.size
+        for name, column in self._columns.items():
+            column[index] = current[name]
+        self.frames += 1
+
+    def rows(self):
+        """
+        Returns the recorded frames, oldest first, as dictionaries.
+        """
+        count = min(self.frames, self.size)
+        first = self.frames - count
+        return [
+            {name: column[(first + i) % self.size] for name, column in self._columns.items()}
+            for i in range(count)
+        ]
+
+    def _values(self, name):
+        """
+        Returns the recorded values of a column, in no particular order.
+        """
+        return self._columns[name][:min(self.frames, self.size)]
+
+    def summary(self):
+        """
+        Returns the p50/p95/p99 of every column (times in milliseconds).
+        """
+        summary = {}
+        for name in COLUMNS:
+            scale = 1 if name in COUNTERS else 1000
+            values = self._values(name)
+            summary[name] = {
+                label: percentile(values, fraction) * scale
+                for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            }
+        return summary
+
+    """-------------------------------------- Overlay -------------------------------------------"""
+    def toggle_overlay(self):
+        """
+        Shows or hides the overlay.
+        """
+        self.overlay = not self.overlay
+        self._overlay_surface = None
+
+    def notify(self, text):
+        """
+        Shows a line of text under the overlay (or alone, if it is hidden)
+        for settings.PROFILER_NOTICE_SECONDS.
+
+        Args:
+            text: The text to show.
+        """
+        self._notice = text
+        self._notice_end = time.monotonic() + settings.PROFILER_NOTICE_SECONDS
+        self._overlay_surface = None
+
+    def draw_overlay(self, screen, font):
+        """
+        Draws the overlay in the top-right corner, if shown, with the current
+        notice. Its text is only rebuilt every overlay_refresh seconds.
+
+        Args:
+            screen: The Pygame screen to draw on.
+            font: The font to write with.
+
+        Returns:
+            The rectangle of the screen drawn to, or None if nothing was drawn.
+        """
+        now = time.monotonic()
+        if self._notice is not None and now >= self._notice_end:
+            self._notice = None
+            self._overlay_surface = None
+        if not self.overlay and self._notice is None:
+            return None
+
+        if self._overlay_surface is None or now - self._overlay_time >= self.overlay_refresh:
+            self._overlay_surface = self._build_overlay(font)
+            self._overlay_time = now
+        return screen.blit(self._overlay_surface, (screen.get_width() - self._overlay_surface.get_width() - 8, 8))
+
+    def _build_overlay(self, font):
+        """
+        Renders the overlay text (if shown) and the notice onto a translucent panel.
+        """
+        lines = []
+        if self.overlay:
+            summary = self.summary()
+            total = summary["total"]
+            lines.append(f"frame  p50 {total['p50']:.2f}  p95 {total['p95']:.2f}  p99 {total['p99']:.2f} ms")
+            for phase in PHASES:
+                lines.append(f"{phase:<7}p50 {summary[phase]['p50']:.2f}  p95 {summary[phase]['p95']:.2f} ms")
+            lines.append(f"bodies {summary['bodies']['p50']:.0f}  contacts {summary['contacts']['p50']:.0f}  "
+                         f"callbacks {summary['callbacks']['p50']:.0f}")
+            lines.append(f"quality level p50 {summary['quality']['p50']:.0f}  p99 {summary['quality']['p99']:.0f}")
+        if self._notice is not None:
+            lines.append(self._notice)
+
+        texts = [font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(text.get_width() for text in texts) + 12
+        height = sum(text.get_height() for text in texts) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        y = 6
+        for text in texts:
+            panel.blit(text, (6, y))
+            y += text.get_height()
+        return panel
+
+    """-------------------------------------- Export --------------------------------------------"""
+    def export(self, path):
+        """
+        Writes the recorded frames to a file: JSON (frames and summary) if the
+        path ends in .json, CSV otherwise. Times are written in milliseconds.
+
+        Args:
+            path: The path of the file to write.
+        """
+        rows = [
+            {name: value if name in COUNTERS else value * 1000 for name, value in row.items()}
+            for row in self.rows()
+        ]
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump({"columns": COLUMNS, "frames": rows, "summary": self.summary()}, file, indent=1)
+        else:
+            with open(path, "w", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=COLUMNS)
+                writer.writeheader()
+                writer.writerows(rows)
+
+    def export_snapshot(self, directory=settings.PROFILE_DIR):
+        """
+        Exports the recorded frames to a new CSV and JSON pair, named after the
+        current time.
+
+        Returns:
+            The path of the CSV file.
+        """
+        base = os.path.join(directory, f"profile-{int(time.time() * 1000)}")
+        self.export(base + ".json")
+        self.export(base + ".csv")
+        return base + ".csv"
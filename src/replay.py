@@ -0,0 +1,146 @@
+"""
+replay.py
+
+This module records game sessions to compact binary replay files and reads them
+back for playback.
+
+A session is fully determined by its seed and the input bitmask of every
+simulation step, so that is all a replay stores.
+
+File format (little-endian):
+- Header: magic b"PDRP", format version (u8), seed (u64).
+- Body: run-length encoded input, as (bitmask u8, repeat count u16) records.
+
+The version changes whenever the same inputs play out differently (e.g. the
+same seed produces a different level), so old replays are rejected instead of
+playing out on the wrong platforms. Version 2 is the level streamed in chunks
+(see level_stream.py), version 3 the player that never rotates.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import struct
+import time
+
+MAGIC = b"PDRP"
+VERSION = 3
+HEADER = struct.Struct("<4sBQ")
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+class ReplayWriter:
+    """
+    Streams the inputs of a session to a replay file.
+
+    Consecutive identical inputs are merged into a single run, and runs go
+    through a buffered file, so recording costs next to nothing per step.
+
+    Attributes:
+        path: The path of the replay file.
+        seed: The seed of the recorded session.
+
+    Methods:
+        record(inputs):
+            Records the input bitmask of one step.
+        close():
+            Writes the last run and closes the file.
+    """
+    def __init__(self, path, seed, buffer_size=64 * 1024):
+        """
+        Opens the replay file and writes its header.
+
+        Args:
+            path: The path of the replay file.
+            seed: The seed of the recorded session.
+            buffer_size: The size of the write buffer, in bytes.
+        """
+        self.path = path
+        self.seed = seed
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self._inputs = None
+        self._count = 0
+
+    def record(self, inputs):
+        """
+        Records the input bitmask of one step.
+        """
+        if inputs == self._inputs and self._count < MAX_RUN:
+            self._count += 1
+            return
+        if self._count:
+            self._file.write(RUN.pack(self._inputs, self._count))
+        self._inputs = inputs
+        self._count = 1
+
+    def close(self):
+        """
+        Writes the last run and closes the file.
+        """
+        if self._file.closed:
+            return
+        if self._count:
+            self._file.write(RUN.pack(self._inputs, self._count))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_replay(path):
+    """
+    Reads a replay file.
+
+    Args:
+        path: The path of the replay file.
+
+    Returns:
+        A tuple (seed, inputs) where inputs is a generator of per-step bitmasks.
+
+    Raises:
+        ValueError: If the file is not a replay or has an unsupported version.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    magic, version, seed = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a replay file")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported replay version {version}")
+
+    def inputs():
+        for bitmask, count in RUN.iter_unpack(data[HEADER.size:]):
+            for _ in range(count):
+                yield bitmask
+
+    return seed, inputs()
+
+def replay_path(directory, seed):
+    """
+    Returns a new replay file path for a session, named after the time it
+    started and its seed, creating the directory if needed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{int(time.time() * 1000)}-{seed}.pdr")
+
+def play_replay(path):
+    """
+    Re-simulates a replay headless, as fast as the CPU allows.
+
+    Args:
+        path: The path of the replay file.
+
+    Returns:
+        The result dictionary of headless.run_headless.
+    """
+    from headless import run_headless
+
+    seed, inputs = read_replay(path)
+    return run_headless(float("inf"), seed=seed, inputs=inputs)
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+runner.py
+
+This module runs many independent headless game sessions in parallel.
+
+Episodes are spread across all cores with a ProcessPoolExecutor. Each worker
+builds its own Box2D world, Player and platforms from a per-episode seed, so a
+sweep gives the same results whatever the number of workers. Results stream back
+in chunks as they finish and are aggregated into summary statistics.
+
+Usage:
+    python src/runner.py --episodes 1000 --frames 3600 --seed 0
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import argparse
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from headless import run_headless, BOTS
+from utils import percentile
+
+def run_chunk(seeds, frames, bot):
+    """
+    Runs one episode per seed. This is the unit of work sent to each worker.
+
+    Args:
+        seeds: The seeds of the episodes to run.
+        frames: The maximum number of frames per episode.
+        bot: The name of the bot providing input.
+
+    Returns:
+        A list of result dictionaries (see headless.run_headless), each with an
+        added "frame_time" entry holding the seconds spent per frame.
+    """
+    results = []
+    for seed in seeds:
+        result = run_headless(frames, seed=seed, bot=bot)
+        result["frame_time"] = result["seconds"] / result["frames"] if result["frames"] else 0
+        results.append(result)
+    return results
+
+def run_episodes(episodes, base_seed=0, frames=3600, bot="climber", workers=None, chunk_size=16):
+    """
+    Runs episodes across a process pool and yields their results in chunks.
+
+    Episode i is seeded with base_seed + i, so any single episode of a sweep can
+    be reproduced with "python src/main.py --headless --seed <seed>".
+
+    Args:
+        episodes: The number of episodes to run.
+        base_seed: The seed of the first episode.
+        frames: The maximum number of frames per episode.
+        bot: The name of the bot providing input.
+        workers: The number of worker processes (all cores if None).
+        chunk_size: The number of episodes sent to a worker at a time.
+
+    Yields:
+        Lists of result dictionaries, in order of completion.
+    """
+    seeds = [base_seed + i for i in range(episodes)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_chunk, seeds[i:i + chunk_size], frames, bot)
+            for i in range(0, episodes, chunk_size)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+def summarize(results):
+    """
+    Aggregates episode results into summary statistics.
+
+    Args:
+        results: A list of result dictionaries.
+
+    Returns:
+        A dictionary with episode count, score and frame statistics, deaths by
+        cause, and time per frame statistics (in milliseconds).
+    """
+    scores = [result["score"] for result in results]
+    frames = [result["frames"] for result in results]
+    frame_times = [result["frame_time"] * 1000 for result in results]
+    count = len(results) or 1
+    return {
+        "episodes": len(results),
+        "score_mean": sum(scores) / count,
+        "score_p50": percentile(scores, 0.5),
+        "score_max": max(scores, default=0),
+        "frames_mean": sum(frames) / count,
+        "deaths": dict(Counter(result["cause"] for result in results)),
+        "frame_ms_mean": sum(frame_times) / count,
+        "frame_ms_p95": percentile(frame_times, 0.95),
+    }
+
+def parse_args():
+    """
+    Parses the command line arguments.
+    """
+    parser = argparse.ArgumentParser(description="Run Pydood Jump episodes in parallel")
+    parser.add_argument("--episodes", type=int, default=100, help="number of episodes to run")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--frames", type=int, default=3600, help="maximum number of frames per episode")
+    parser.add_argument("--bot", default="climber", choices=sorted(BOTS), help="bot providing input")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="episodes per unit of work")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    start = time.perf_counter()
+    results = []
+    for chunk in run_episodes(args.episodes, args.seed, args.frames, args.bot, args.workers, args.chunk_size):
+        results.extend(chunk)
+        print(f"{len(results)}/{args.episodes} episodes done")
+
+    summary = summarize(results)
+    elapsed = time.perf_counter() - start
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    print(f"wall time: {elapsed:.2f}s")
\ No newline at end of file
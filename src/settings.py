@@ -1,11 +1,84 @@
+import os
+
 # Constants
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 800
 
+# Assets
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets")
+ATLAS_SUBDIR = "atlases"                    # Atlases built by assets.py, inside ASSET_DIR
+ASSET_CACHE_BUDGET = 64 * 1024 * 1024       # Bytes of decoded pixels kept in the image cache
+BACKGROUND_PARALLAX = 0.5                   # Background scroll speed relative to the camera
+BACKGROUND_IMAGE = "space-bck@2x.png"        # Image tiled behind the game
+
+# Profiling
+PROFILER_FRAMES = 600               # Frames kept in the profiler's ring buffer
+PROFILER_OVERLAY_REFRESH = 0.25     # Seconds between updates of the profiler overlay text
+PROFILER_NOTICE_SECONDS = 3         # Seconds the profiler overlay shows where a profile was saved
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "profiles")
+
+# Ghosts
+GHOST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ghosts")
+GHOST_SAMPLE_STEPS = 4              # Physics steps between two recorded ghost positions
+GHOST_COUNT = 64                    # Most ghosts raced at once (the best runs on the seed)
+GHOST_KEEP = 10                     # Own runs kept as ghosts per seed (the best ones)
+GHOST_WINDOW = 64                   # Records of each ghost's track held in memory at a time
+GHOST_ALPHA = 110                   # Opacity of the ghost sprites (0-255)
+GHOST_IMAGE = "ghost-left@2x.png"   # Image the ghosts are drawn with
+
+# Frame pacing (see governor.py)
+FRAME_BUDGET = 1 / 60               # Frame time the governor defends, in seconds (not counting the frame-rate cap's wait)
+GOVERNOR_WINDOW = 30                # Frames the load is judged over
+GOVERNOR_PERCENTILE = 0.9           # Percentile of those frames' times compared with the budget
+GOVERNOR_DOWNGRADE = 0.8            # Load (fraction of the budget) above which quality is lowered
+GOVERNOR_UPGRADE = 0.4              # Load below which quality is raised again
+GOVERNOR_DOWNGRADE_HOLD = 0.5       # Seconds at a level before quality can be lowered again
+GOVERNOR_UPGRADE_HOLD = 3           # Seconds at a level before quality can be raised (doubled after each flap)
+GOVERNOR_MAX_HOLD = 60              # Longest the governor waits before raising quality
+QUALITY_LEVELS = (                  # From best to cheapest: ghosts drawn, scrolling background, overlay refresh
+    {"name": "high", "ghosts": GHOST_COUNT, "parallax": True, "overlay_refresh": PROFILER_OVERLAY_REFRESH},
+    {"name": "medium", "ghosts": 16, "parallax": True, "overlay_refresh": 1},
+    {"name": "low", "ghosts": 16, "parallax": False, "overlay_refresh": 1},
+    {"name": "minimum", "ghosts": 0, "parallax": False, "overlay_refresh": 2},
+)
+
+# Capture
+CAPTURE_BUFFERS = 8                 # Captured frames that can wait for the writer before new ones are dropped
+CAPTURE_PNG_LEVEL = 1               # zlib level of captured PNG images (1 is the fastest)
+CAPTURE_PNG_WRITERS = 4             # Threads encoding captured PNG images
+
+# High scores
+HIGH_SCORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "highscores.db")
+HIGH_SCORE_ENDPOINT = None          # URL finished runs are uploaded to (None to keep them local)
+HIGH_SCORE_TOP = 10                 # Best runs kept in memory for the leaderboard
+HIGH_SCORE_SHOWN = 5                # Best runs listed on the game-over screen
+HIGH_SCORE_BATCH = 50               # Runs uploaded per request
+HIGH_SCORE_TIMEOUT = 5              # Seconds before an upload request is abandoned
+HIGH_SCORE_RETRY = (1, 300)         # First and longest delay between failed uploads, in seconds
+
+# Text
+TEXT_CACHE_SIZE = 64        # Rendered text surfaces kept in the text cache
+FONT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fontcache.json")
+
+# Timing
+MAX_FPS = 144               # Render frame rate cap (0 for uncapped)
+PHYSICS_STEP = 1 / 60       # Fixed physics time step, in seconds
+MAX_STEPS_PER_FRAME = 5     # Physics steps allowed per rendered frame before dropping time
+MENU_WAIT_MS = 1000         # Longest a menu sleeps waiting for an event
+RESTART_BUDGET_MS = 5       # Longest a restart from the game-over screen should take
+STARTUP_BUDGET_MS = 500     # Longest from starting main.py until the main menu is on screen
+REWIND_FRAMES = 600         # Physics steps of history kept for rewinding
+
 # Physics
 PIXELS_PER_METER = 30
 GRAVITY = (0, -9.8)
 
+# Collision
+CATEGORY_PLAYER = 0x0001        # Category bits, also stored in fixture.userData as a type tag
+CATEGORY_PLATFORM = 0x0002
+PLATFORM_ACTIVE_BAND = 4        # Platforms within this many meters of the player take part in the simulation
+PLATFORM_ACTIVE_REFRESH = 1     # Meters the player moves before the band is recomputed
+
 # Player
 PLAYER_SPRITE_WIDTH = 64
 PLAYER_SPRITE_HEIGHT = 64
@@ -15,9 +88,84 @@ PLAYER_MAX_SPEED = 8
 JUMP_COOLDOWN = 75
 JUMP_STRENGTH = 25
 
+# Split screen (local players sharing one level)
+PLAYER_KEYS = (                     # Left, right and jump keys of each player, as pygame.key.key_code names
+    ("a", "d", "w"),
+    ("left", "right", "up"),
+    ("j", "l", "i"),
+    ("[4]", "[6]", "[8]"),
+)
+SPLIT_SCREEN_COLUMNS = 2            # Viewports side by side, each scaled down by as much
+
+# Animation (see animation.py)
+PLAYER_ANIMATION = "space"          # Animation set the player is drawn with ("space" or "hop")
+PLAYER_GEAR = None                  # Animation set the player wears ("propeller" or "jetpack"), if any
+PLAYER_SCALE = (PLAYER_SPRITE_WIDTH / 124, PLAYER_SPRITE_HEIGHT / 120)  # From the @2x player images (124x120)
+ANIMATION_LEAN = 10                 # Degrees the player leans at full horizontal speed
+ANIMATION_LEAN_STEPS = 3            # Pre-rotated lean angles on each side of upright
+ANIMATION_FACING_SPEED = 0.5        # Horizontal speed (m/s) past which the player turns to face its movement
+ANIMATIONS = {                      # Clips of each animation set: frames as file names or (sheet, rectangle)
+    # Player skins, with "stand", "jump" and "fall" clips. The jump clip isn't
+    # looped, so the bounce pose shows for its first frames only
+    "space": {
+        "scale": PLAYER_SCALE, "fps": 10, "loop": False,
+        "clips": {
+            "stand": ["space-left@2x.png"],
+            "jump": ["space-left-odskok@2x.png", "space-left-odskok@2x.png", "space-left@2x.png"],
+            "fall": ["space-left@2x.png"],
+        },
+    },
+    "hop": {
+        "scale": PLAYER_SCALE, "fps": 10, "loop": False,
+        "clips": {
+            "stand": ["hop-left-touch@2x.png"],
+            "jump": ["hop-left-touch@2x.png", "hop-left-jump@2x.png"],
+            "fall": ["hop-left-fall@2x.png"],
+        },
+    },
+    # Gear, with one "worn" clip drawn at an anchor (pixels from the player's
+    # center, facing left), played faster the faster the player moves
+    "propeller": {
+        "scale": PLAYER_SCALE, "fps": 12, "speed_rate": 0.1, "anchor": (0, -28), "behind": False,
+        "clips": {"worn": [("propeller@2x.png", ((i % 2) * 64, (i // 2) * 64, 64, 64)) for i in range(4)]},
+    },
+    "jetpack": {
+        "scale": PLAYER_SCALE, "fps": 15, "speed_rate": 0.1, "anchor": (18, 6), "behind": True,
+        "clips": {"worn": [("jetpack-space@2x.png", ((i % 4) * 64, (i // 4) * 128, 64, 128)) for i in range(10)]},
+    },
+}
+
 # Platforms
 PLATFORM_WIDTH = 60
 PLATFORM_HEIGHT = 10
+PLATFORM_SPRITE_WIDTH = 60
+PLATFORM_SPRITE_HEIGHT = 16
+PLATFORM_POOL_SIZE = 32
+PLATFORM_KINDS = {                  # Friction, tile (rectangle on the theme's tile sheet) and optional RGB tint of each kind of platform
+    "normal": {"friction": 0.5, "tile": (2, 2, 114, 30)},
+    "ice": {"friction": 0.05, "tile": (2, 36, 114, 30), "tint": (110, 190, 255)},
+}
+
+# Level
+CHUNK_HEIGHT = 20                   # Height of a generated chunk of the level, in meters
+CHUNKS_AHEAD = 3                    # Chunks the level streamer generates ahead of time
+LEVEL_LOOKAHEAD = 20                # Meters above the top of the screen the level is placed to
+LEVEL_THEMES = (                    # Themes the level cycles through (see level_stream.THEMES)
+    "space", "jungle", "underwater", "ice", "soccer", "bunny",
+)
+THEME_TILE_SHEETS = {               # Tile sheet each theme's platforms are cut from (all laid out like game-tiles@2x.png)
+    "space": "game-tiles-space@2x.png",
+    "jungle": "game-tiles-jungle@2x.png",
+    "underwater": "game-tiles-underwater@2x.png",
+    "ice": "game-tiles-ice@2x.png",
+    "soccer": "game-tiles-soccer@2x.png",
+    "bunny": "game-tiles-bunny@2x.png",
+}
+CHUNKS_PER_THEME = 10               # Chunks generated with a theme before moving to the next
+DIFFICULTY_CURVE = "linear"         # See level_stream.DIFFICULTY_CURVES
+DIFFICULTY_HEIGHT = 2000            # Height, in meters, at which the difficulty peaks
+DIFFICULTY_EXTRA_GAP = 50           # Pixels added to the gaps between platforms at full difficulty
+MAX_PLATFORM_GAP = 200              # Largest gap between platforms in pixels (a jump reaches about 240)
 
 # Ground
 GROUND_WIDTH = 50
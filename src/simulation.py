@@ -0,0 +1,392 @@
+"""
+simulation.py
+
+This module contains the Simulation class, which owns everything the game needs
+to advance one physics step: the Box2D world, the player, the platforms, the
+camera and the score.
+
+Several players can share one session (local split-screen): they play in the
+same world, on the same platforms, each with its own camera and score. The
+level is placed above the highest camera and culled below the lowest living
+player's, so every player's view is covered by a single set of platform
+bodies. A player who falls out is taken out of the world, and the game ends
+once every player has.
+
+The Simulation does not touch the display, fonts or images, so it can be driven
+by the windowed Game as well as by headless runs that step it as fast as the CPU
+allows.
+
+Input:
+- Each step takes a bitmask of the INPUT_* flags below, so that keyboard input,
+  scripted input and bots all drive the game the same way (or one bitmask per
+  player, when several share the session).
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import random
+import time
+import Box2D
+
+import settings
+from player import Player
+from platforms import PlatformIndex, PlatformPool
+from level_stream import LevelStreamer
+from contact_listener import ContactListener
+import snapshot
+
+# Input flags
+INPUT_LEFT = 1 << 0
+INPUT_RIGHT = 1 << 1
+INPUT_JUMP = 1 << 2
+INPUT_ESCAPE = 1 << 3
+
+class Simulation:
+    """
+    Represents a single game session without any rendering.
+
+    Attributes:
+        seed: The seed the session's level is generated from.
+        streamer: The LevelStreamer generating the level's chunks.
+        chunk: The last chunk placed in the level.
+        level_top: The height of the highest platform placed so far, in meters.
+        world: The Box2D world.
+        players: The Player objects, by index.
+        player: The first Player (the only one in single-player sessions).
+        living: The players whose bodies are in the world: the living ones, or
+                the last to fall once the game is over.
+        pool: The PlatformPool that owns every platform body.
+        platforms: The PlatformIndex of active platforms, ordered by height.
+        cameras: The vertical offset of each player's camera, in pixels.
+        previous_cameras: The camera offsets before the last step, for interpolation.
+        camera_offset: The first player's camera offset.
+        previous_camera_offset: The first player's camera offset before the last step.
+        scores: The highest height (in meters) reached by each player.
+        score: The highest height (in meters) reached by any player.
+        frame: The number of steps taken so far.
+        game_over: True once every player has fallen below the screen.
+        death_cause: Why the game ended ("fell"), or None while it is running.
+        recorder: An optional replay.ReplayWriter that receives every step's input.
+        profiler: An optional profiler.FrameProfiler that times the world step
+                  ("world"), the culling, streaming and enabling of platforms
+                  ("level") and the rest of the step ("update").
+        active_platforms: The platforms within settings.PLATFORM_ACTIVE_BAND of
+                          a living player, the only ones enabled in the world.
+        active_centers: The living players' heights when active_platforms was
+                        computed, or None when it must be recomputed.
+
+    Methods:
+        reset(seed):
+            Starts a new session, reusing the world and its bodies.
+        restart_streamer():
+            Starts generating the level from the bottom again.
+        close():
+            Stops the level streamer's worker thread.
+        snapshot():
+            Returns a snapshot of the complete state of the session.
+        restore(data):
+            Restores the session to a snapshot, in place.
+        step(inputs):
+            Advances the session by one fixed physics step (settings.PHYSICS_STEP).
+        update_active_platforms():
+            Enables only the platforms near the players.
+        interpolated_camera_offset(alpha, player=0):
+            Returns a player's camera offset between the last two steps.
+    """
+    def __init__(self, seed=None, background=True, players=1):
+        """
+        Initializes the session.
+
+        Args:
+            seed: The seed for platform generation. A random seed is picked
+                  (and stored) if none is given, so every session can be replayed.
+            background: Whether the level is generated on a worker thread. Runs
+                        that never wait between steps (headless ones) gain
+                        nothing from it.
+            players: The number of players sharing the session.
+        """
+        # Initialize the Box2D world with gravity
+        self.world = Box2D.b2.world(gravity=settings.GRAVITY, doSleep=True)
+
+        # Step the empty world once: Box2D scales the impulses it warm-starts
+        # contacts with by the ratio to the previous step's length, so a world
+        # restored to a snapshot must not look like it has never stepped
+        self.world.Step(settings.PHYSICS_STEP, 6, 2)
+
+        # Initialize the players and the platform bodies
+        self.players = [Player(self.world, index, players) for index in range(players)]
+        self.player = self.players[0]
+        self.pool = PlatformPool(self.world)
+
+        # Set up the contact listener for collision handling
+        self.contact_listener = ContactListener(self.players)
+        self.world.contactListener = self.contact_listener
+
+        self.recorder = None
+        self.profiler = None
+        self.background = background
+        self.streamer = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Starts a new session in the same world: the player and the pooled
+        platform bodies are moved back into place instead of being recreated.
+        A reset session plays exactly like a new Simulation with the same seed.
+
+        Args:
+            seed: The seed for platform generation (random if None).
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+
+        # Put the players back at their starting positions
+        for player in self.players:
+            player.reset()
+        self.living = list(self.players)
+        self.world.ClearForces()
+
+        # Initialize the camera offsets for scrolling
+        self.cameras = [0] * len(self.players)
+        self.previous_cameras = [0] * len(self.players)
+
+        # Place the initial chunks of the level
+        self.restart_streamer()
+        self.pool.reset()
+        self.platforms = PlatformIndex()
+        self.chunk = None
+        self.level_top = 1
+        self.stream_level()
+
+        # Enable the platforms around the players
+        self.active_platforms = []
+        self.active_centers = None
+        self.update_active_platforms()
+
+        # Initialize the score trackers
+        self.scores = [0] * len(self.players)
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+        self.death_cause = None
+
+    @property
+    def camera_offset(self):
+        return self.cameras[0]
+
+    @camera_offset.setter
+    def camera_offset(self, value):
+        self.cameras[0] = value
+
+    @property
+    def previous_camera_offset(self):
+        return self.previous_cameras[0]
+
+    @previous_camera_offset.setter
+    def previous_camera_offset(self, value):
+        self.previous_cameras[0] = value
+
+    def step(self, inputs=0):
+        """
+        Advances the session by one physics step.
+
+        Args:
+            inputs: A bitmask of INPUT_* flags held down during this step, or
+                    a list (or tuple) of one bitmask per player (a single
+                    bitmask drives the first player).
+
+        Returns:
+            True while the player is still alive, False once the game is over.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            lap = time.perf_counter()
+
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        if not isinstance(inputs, (list, tuple)):
+            inputs = (inputs,)
+
+        living = self.living
+        fallen = []
+        for player in living:
+            player_inputs = inputs[player.index] if player.index < len(inputs) else 0
+
+            # Apply an initial upward force to the player when the game starts
+            if self.cameras[player.index] == 0:  # Check if the game is just starting
+                player.body.ApplyLinearImpulse((0, 1), player.body.worldCenter, True)
+
+            # Handle player movement
+            if player_inputs & INPUT_LEFT:
+                player.move(-1)
+            elif player_inputs & INPUT_RIGHT:
+                player.move(1)
+            else:
+                player.move(0)
+
+            if player_inputs & INPUT_JUMP:
+                player.jump()
+
+            # Check if the player has fallen below the screen
+            if player.body.position.y * settings.PIXELS_PER_METER < -settings.PLAYER_SPRITE_HEIGHT:
+                player.alive = False
+                fallen.append(player)
+
+        if fallen:
+            if len(fallen) < len(living):
+                # Take the fallen players out of the world while the others play on
+                for player in fallen:
+                    player.body.active = False
+                living = self.living = [player for player in living if player.alive]
+                self.active_centers = None
+            else:
+                self.game_over = True
+                self.death_cause = "fell"
+
+        # Game Update
+        for player in living:
+            player.previous_position = player.body.position.copy()
+            player.previous_angle = player.body.angle
+        self.previous_cameras[:] = self.cameras
+        self.contact_listener.reset_counters()
+        if profiler is not None:
+            lap = profiler.lap("update", lap)
+        self.world.Step(settings.PHYSICS_STEP, 6, 2)
+        self.world.ClearForces()
+        if profiler is not None:
+            lap = profiler.lap("world", lap)
+            profiler.add("steps", 1)
+            profiler.add("callbacks", self.contact_listener.callbacks)
+        self.frame += 1
+
+        # Update the camera offsets to follow the players, and the scores
+        cameras = self.cameras
+        scores = self.scores
+        heights = []
+        for player in living:
+            player.update()
+            index = player.index
+            player_y = player.body.position.y
+            heights.append(player_y)
+            player_screen_y = settings.SCREEN_HEIGHT - (player_y * settings.PIXELS_PER_METER - cameras[index])
+            if player_screen_y < settings.SCREEN_HEIGHT / 2:
+                cameras[index] += settings.SCREEN_HEIGHT / 2 - player_screen_y
+            scores[index] = max(scores[index], int(player_y))
+        self.score = max(scores)
+        if profiler is not None:
+            lap = profiler.lap("update", lap)
+
+        # Return platforms below every living player's view to the pool
+        lowest = min([cameras[player.index] for player in living])
+        for platform in self.platforms.cull_below((lowest - settings.PLATFORM_HEIGHT) / settings.PIXELS_PER_METER):
+            self.pool.release(platform)
+
+        # Place the chunks coming into view
+        if self.stream_level():
+            self.active_centers = None  # New platforms may fall inside the bands
+
+        # Enable the platforms the players can reach during the next step
+        centers = self.active_centers
+        if centers is None or any(
+            abs(player_y - center) > settings.PLATFORM_ACTIVE_REFRESH for player_y, center in zip(heights, centers)
+        ):
+            self.update_active_platforms()
+
+        if profiler is not None:
+            profiler.lap("level", lap)
+
+        return not self.game_over
+
+    def stream_level(self):
+        """
+        Places the streamed chunks of the level until it reaches
+        settings.LEVEL_LOOKAHEAD meters above the top of the screen. Placing a
+        chunk only moves pooled platforms into position.
+
+        Returns:
+            True if any platforms were placed.
+        """
+        screen_top = (max(self.cameras) + settings.SCREEN_HEIGHT) / settings.PIXELS_PER_METER
+        placed = False
+        while self.level_top < screen_top + settings.LEVEL_LOOKAHEAD:
+            self.chunk = self.streamer.next_chunk()
+            self.platforms.extend(self.pool.acquire(x, y, kind, self.chunk.theme)
+                                  for x, y, kind in self.chunk.platforms)
+            self.level_top = self.chunk.top
+            placed = True
+        return placed
+
+    def restart_streamer(self):
+        """
+        Replaces the level streamer with a new one for the session's seed,
+        generating from the bottom of the level.
+        """
+        self.close()
+        self.streamer = LevelStreamer(self.seed, start_y=1, background=self.background)
+
+    def close(self):
+        """
+        Stops the level streamer's worker thread.
+        """
+        if self.streamer is not None:
+            self.streamer.close()
+
+    def snapshot(self):
+        """
+        Returns a snapshot of the complete state of the session (see snapshot.py).
+        """
+        return snapshot.capture(self)
+
+    def restore(self, data):
+        """
+        Restores the session to a snapshot, in place.
+
+        Args:
+            data: A snapshot from snapshot().
+        """
+        snapshot.restore(self, data)
+
+    def update_active_platforms(self):
+        """
+        Enables the platforms within settings.PLATFORM_ACTIVE_BAND of a
+        living player and disables the ones that have left every band, so
+        Box2D only tracks (and calls back about) platforms a player can touch.
+
+        The bands are only recomputed once a player has moved
+        settings.PLATFORM_ACTIVE_REFRESH meters (or platforms were added), so
+        every platform within BAND - REFRESH meters of a player is enabled.
+        """
+        self.active_centers = [player.body.position.y for player in self.living]
+        if len(self.active_centers) == 1:
+            active = self.platforms.between(self.active_centers[0] - settings.PLATFORM_ACTIVE_BAND,
+                                            self.active_centers[0] + settings.PLATFORM_ACTIVE_BAND)
+        else:
+            # Bands can overlap: keep each platform once, in height order
+            bands = {}
+            for center in sorted(self.active_centers):
+                for platform in self.platforms.between(center - settings.PLATFORM_ACTIVE_BAND,
+                                                       center + settings.PLATFORM_ACTIVE_BAND):
+                    bands[platform.slot] = platform
+            active = list(bands.values())
+
+        slots = {platform.slot for platform in active}
+        for platform in self.active_platforms:
+            if platform.slot not in slots:
+                platform.set_active(False)
+
+        self.active_platforms = active
+        for platform in self.active_platforms:
+            platform.set_active(True)
+
+    def interpolated_camera_offset(self, alpha, player=0):
+        """
+        Returns a player's camera offset between the last two steps.
+
+        Args:
+            alpha: How far between the previous step (0) and the current one (1).
+            player: The index of the player.
+        """
+        return self.previous_cameras[player] + (self.cameras[player] - self.previous_cameras[player]) * alpha
\ No newline at end of file
@@ -0,0 +1,305 @@
+"""
+snapshot.py
+
+This module saves the complete state of a Simulation into a compact binary
+buffer and restores it in place, without rebuilding the world, and keeps
+recent snapshots in a ring buffer for rewinding.
+
+What a snapshot holds:
+- The player's body (position, angle, velocities, awake), its position and
+  angle before the last step, grounded flag and jump cooldown.
+- The player's touching contacts: which platform each is with, and the
+  impulses Box2D warm-starts its solver with on the next step.
+- Every live platform's pool slot, cached position, body position (Box2D's
+  continuous collision can nudge a static body by a rounding error), kind,
+  theme and whether it is active, and the order of the pool's free list, so the same
+  bodies are handed out for the chunks placed after a restore.
+- The camera, score, frame and game-over state.
+- The level streamer's position (the seed and the last chunk placed). Chunks
+  are generated from the seed and their index, so that is the whole of the
+  level's random state.
+
+Restoring only moves the pooled bodies that differ from the snapshot. The
+player's contacts are then rebuilt by recreating its fixture and taking a
+zero-length world step, which finds and collides contacts without moving
+anything, with the player where the last step collided it (its position before
+that step), and their saved impulses are written back. A restored Simulation
+then plays exactly like the one the snapshot was taken from, except in the rare
+case where the last step ended in a continuous collision: Box2D then collided
+the contact mid-step, where it cannot be placed again, and the restored session
+can drift from the original by a rounding error.
+
+Snapshots hold single-player sessions only; sessions shared by several
+players (split-screen) cannot be captured or rewound.
+
+File format (little-endian):
+- Header: see STATE below.
+- One PLATFORM record per live platform, lowest first.
+- One u16 slot per free platform, in the order of the pool's free list.
+- One CONTACT record per touching contact of the player.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import math
+import struct
+from collections import deque
+
+from Box2D import b2Vec2
+
+import settings
+from platforms import (PlatformIndex, PLATFORM_KIND_CODES, PLATFORM_KIND_NAMES,
+                       PLATFORM_THEME_CODES, PLATFORM_THEME_NAMES)
+
+MAGIC = b"PDSS"
+VERSION = 1
+
+# magic, version, seed, frame, score, game over, death cause, camera offset,
+# previous camera offset, active center (NaN for None), player x, y, angle,
+# velocity x, y, angular velocity, previous x, y, angle, awake, grounded, jump cooldown,
+# last chunk index (-1 for none), its bottom, level top, live and free platform
+# counts, touching contact count
+STATE = struct.Struct("<4sBQIi?Bddd9f??HiddHHB")
+PLATFORM = struct.Struct("<H4f3B")
+SLOT = struct.Struct("<H")
+
+# Platform slot, point count, and the normal and tangent impulses of each point
+CONTACT = struct.Struct("<HB4f")
+
+# Death causes, stored by code
+DEATH_CAUSES = (None, "fell")
+
+def capture(simulation):
+    """
+    Captures the state of a simulation.
+
+    Args:
+        simulation: The Simulation to capture.
+
+    Returns:
+        The snapshot, as bytes.
+
+    Raises:
+        ValueError: If several players share the simulation.
+    """
+    if len(simulation.players) > 1:
+        raise ValueError("can't capture a session shared by several players")
+    player = simulation.player
+    body = player.body
+    x, y = body.position
+    velocity_x, velocity_y = body.linearVelocity
+    previous_x, previous_y = player.previous_position
+    chunk = simulation.chunk
+    live = list(simulation.platforms)
+    free = simulation.pool.free
+    contacts = [edge.contact for edge in body.contacts if edge.contact.touching]
+
+    parts = [STATE.pack(
+        MAGIC, VERSION, simulation.seed, simulation.frame, simulation.score,
+        simulation.game_over, DEATH_CAUSES.index(simulation.death_cause),
+        simulation.camera_offset, simulation.previous_camera_offset,
+        math.nan if simulation.active_centers is None else simulation.active_centers[0],
+        x, y, body.angle, velocity_x, velocity_y, body.angularVelocity,
+        previous_x, previous_y, player.previous_angle, body.awake, player.grounded, player.jump_cooldown,
+        -1 if chunk is None else chunk.index, 0 if chunk is None else chunk.bottom, simulation.level_top,
+        len(live), len(free), len(contacts)
+    )]
+    parts.extend(
+        PLATFORM.pack(platform.slot, platform.x, platform.y, *platform.body.position,
+                      PLATFORM_KIND_CODES[platform.kind], PLATFORM_THEME_CODES[platform.theme], platform.active)
+        for platform in live
+    )
+    parts.extend(SLOT.pack(platform.slot) for platform in free)
+    for contact in contacts:
+        points = contact.manifold.points
+        impulses = [0.0] * 4
+        for i, point in enumerate(points):
+            impulses[2 * i] = point.normalImpulse
+            impulses[2 * i + 1] = point.tangentImpulse
+        parts.append(CONTACT.pack(_platform_slot(contact), len(points), *impulses))
+    return b"".join(parts)
+
+def _platform_slot(contact):
+    """
+    Returns the pool slot of the platform in a player/platform contact (the
+    platform bodies' userData).
+    """
+    if contact.fixtureA.userData == settings.CATEGORY_PLATFORM:
+        return contact.fixtureA.body.userData
+    return contact.fixtureB.body.userData
+
+def restore(simulation, data):
+    """
+    Restores a simulation to a captured state, in place.
+
+    Args:
+        simulation: The Simulation to restore. It must have been created with
+                    the same settings as the captured one.
+        data: A snapshot from capture().
+
+    Raises:
+        ValueError: If the data is not a snapshot or has an unsupported
+                    version, or if several players share the simulation.
+    """
+    if len(simulation.players) > 1:
+        raise ValueError("can't restore a session shared by several players")
+    (magic, version, seed, frame, score, game_over, death_cause,
+     camera_offset, previous_camera_offset, active_center,
+     x, y, angle, velocity_x, velocity_y, angular_velocity, previous_x, previous_y, previous_angle,
+     awake, grounded, jump_cooldown,
+     chunk_index, chunk_bottom, level_top, live_count, free_count, contact_count) = STATE.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a simulation snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+
+    # Platforms: park the ones that are not live in the snapshot, then move and
+    # (de)activate only the ones that differ
+    pool = simulation.pool
+    platforms = pool.platforms
+    records = list(PLATFORM.iter_unpack(data[STATE.size:STATE.size + live_count * PLATFORM.size]))
+    offset = STATE.size + live_count * PLATFORM.size
+    free_slots = [slot for (slot,) in SLOT.iter_unpack(data[offset:offset + free_count * SLOT.size])]
+    pool.reserve(live_count + free_count)
+    live_slots = {record[0] for record in records}
+    for platform in simulation.platforms:
+        if platform.slot not in live_slots:
+            platform.park()
+
+    live = []
+    current = {platform.slot for platform in simulation.platforms}
+    for slot, platform_x, platform_y, body_x, body_y, kind, theme, active in records:
+        platform = platforms[slot]
+        kind = PLATFORM_KIND_NAMES[kind]
+        theme = PLATFORM_THEME_NAMES[theme]
+        if (slot not in current or platform.x != platform_x or platform.y != platform_y
+                or platform.kind != kind or platform.theme != theme
+                or tuple(platform.body.position) != (body_x, body_y)):
+            platform.set_active(False)
+            platform.place(body_x, body_y, kind, theme)
+            platform.x, platform.y = platform_x, platform_y
+            platform.store.x[slot], platform.store.y[slot] = platform_x, platform_y
+        platform.set_active(bool(active))
+        live.append(platform)
+
+    pool.free = [platforms[slot] for slot in free_slots]
+    simulation.platforms = PlatformIndex(live)
+    simulation.active_platforms = [platform for platform in live if platform.active]
+    simulation.active_centers = None if math.isnan(active_center) else [active_center]
+
+    # Level: continue streaming after the last chunk placed
+    if seed != simulation.seed:
+        simulation.seed = seed
+        simulation.restart_streamer()
+    if chunk_index < 0:
+        simulation.chunk = None
+    elif simulation.chunk is None or simulation.chunk.index != chunk_index:
+        simulation.chunk = simulation.streamer.generate_chunk(chunk_index, chunk_bottom)
+    simulation.streamer.seek(chunk_index + 1, level_top)
+    simulation.level_top = level_top
+
+    # Player
+    player = simulation.player
+    body = player.body
+    player.previous_position = b2Vec2(previous_x, previous_y)
+    player.previous_angle = previous_angle
+    player.grounded = grounded
+    player.jump_cooldown = jump_cooldown
+    player.alive = not game_over  # A single player only falls out when the game ends
+    body.active = True
+    simulation.living = [player]
+
+    # Contacts: Box2D collided them at the start of the last step, so collide
+    # them there again with a zero-length step (the contact callbacks this
+    # fires are undone below), then restore their warm-starting impulses. A
+    # session that has not stepped yet has no contacts to rebuild.
+    player.refresh_contacts()
+    if frame:
+        body.transform = ((previous_x, previous_y), previous_angle)
+        simulation.world.Step(0, 0, 0)
+        player.grounded = grounded
+        offset += free_count * SLOT.size
+        saved = {record[0]: record[1:] for record in CONTACT.iter_unpack(data[offset:offset + contact_count * CONTACT.size])}
+        for edge in body.contacts:
+            contact = edge.contact
+            record = saved.get(_platform_slot(contact)) if contact.touching else None
+            if record is None:
+                continue
+            for i, point in enumerate(contact.manifold.points[:record[0]]):
+                point.normalImpulse = record[1 + 2 * i]
+                point.tangentImpulse = record[2 + 2 * i]
+
+    body.transform = ((x, y), angle)
+    body.linearVelocity = (velocity_x, velocity_y)
+    body.angularVelocity = angular_velocity
+    body.awake = awake
+
+    # Camera, score and state
+    simulation.camera_offset = camera_offset
+    simulation.previous_camera_offset = previous_camera_offset
+    simulation.scores[0] = simulation.score = score
+    simulation.frame = frame
+    simulation.game_over = game_over
+    simulation.death_cause = DEATH_CAUSES[death_cause]
+
+
+class RewindBuffer:
+    """
+    A ring buffer of the most recent snapshots of a simulation.
+
+    Attributes:
+        capacity: The number of snapshots kept; older ones are dropped.
+
+    Methods:
+        push(simulation):
+            Captures a snapshot of the simulation.
+        rewind(simulation, steps):
+            Restores the simulation to an earlier snapshot.
+        clear():
+            Drops every snapshot.
+    """
+    def __init__(self, capacity=settings.REWIND_FRAMES):
+        """
+        Args:
+            capacity: The number of snapshots to keep.
+        """
+        self.capacity = capacity
+        self._snapshots = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def push(self, simulation):
+        """
+        Captures a snapshot of the simulation, dropping the oldest one if the
+        buffer is full.
+        """
+        self._snapshots.append(capture(simulation))
+
+    def rewind(self, simulation, steps=1):
+        """
+        Restores the simulation to the snapshot taken the given number of
+        pushes ago (or the oldest one kept), and drops the newer snapshots.
+        The restored snapshot stays in the buffer.
+
+        Args:
+            simulation: The Simulation to restore.
+            steps: How many snapshots to go back, 1 for the latest.
+
+        Returns:
+            True if the simulation was restored, False if the buffer is empty.
+        """
+        if not self._snapshots:
+            return False
+        for _ in range(min(steps, len(self._snapshots)) - 1):
+            self._snapshots.pop()
+        restore(simulation, self._snapshots[-1])
+        return True
+
+    def clear(self):
+        """
+        Drops every snapshot.
+        """
+        self._snapshots.clear()
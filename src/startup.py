@@ -0,0 +1,83 @@
+"""
+startup.py
+
+This module contains the StartupTimer class, which times the phases of
+starting the game, up to the main menu being on screen, for the
+--startup-report flag of main.py.
+
+The report is written as the phases end, in the style of
+"python -X importtime": the time spent in the phase itself, then the time
+since main.py started (its first line, before any import), in milliseconds.
+Phases that run on worker threads (e.g. decoding the gameplay images while
+the menu is up) report their own duration, so their self time overlaps the
+phases around them.
+
+Usage:
+    python src/main.py --startup-report
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import threading
+import time
+
+class StartupTimer:
+    """
+    Times the phases of starting the game.
+
+    Attributes:
+        stream: The text stream the report is written to as phases end, or
+                None to only record them.
+        phases: The (name, self seconds, cumulative seconds) of the phases so far.
+
+    Methods:
+        mark(name, since=None, budget=None):
+            Ends a phase.
+    """
+    def __init__(self, stream=None, start=None):
+        """
+        Starts timing.
+
+        Args:
+            stream: The text stream to write the report to (e.g. sys.stderr),
+                    or None to only record the phases.
+            start: When startup began (a time.perf_counter() value taken at
+                   the top of main.py, before any import), or None to start now.
+        """
+        self.stream = stream
+        self.phases = []
+        self._start = self._last = start if start is not None else time.perf_counter()
+        self._lock = threading.Lock()  # Worker threads end phases too
+        if stream is not None:
+            print("startup: self [ms] | cumulative [ms] | phase", file=stream, flush=True)
+
+    def mark(self, name, since=None, budget=None):
+        """
+        Ends a phase, and writes it to the report.
+
+        Args:
+            name: The name of the phase.
+            since: When the phase started (a time.perf_counter() value), for
+                   phases on worker threads. By default a phase starts when
+                   the previous one on the main thread ended.
+            budget: An optional limit on the time since startup at the end
+                    of the phase, in milliseconds, flagged in the report when
+                    it is exceeded.
+
+        Returns:
+            The time since startup, in seconds.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if since is None:
+                since, self._last = self._last, now
+            cumulative = now - self._start
+            self.phases.append((name, now - since, cumulative))
+            if self.stream is not None:
+                line = f"startup: {(now - since) * 1000:13.1f} | {cumulative * 1000:15.1f} | {name}"
+                if budget is not None and cumulative * 1000 > budget:
+                    line += f" (over the {budget} ms budget)"
+                print(line, file=self.stream, flush=True)
+        return cumulative
@@ -0,0 +1,52 @@
+"""
+telemetry.py
+
+This module contains the TelemetrySink class, an optional, rate-limited
+destination for values the game reports while running (such as the score).
+
+Writing to stdout every frame stalls the game loop whenever the output is piped
+somewhere slow, so a sink writes at most one line per metric per interval.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import sys
+import time
+
+class TelemetrySink:
+    """
+    Writes "name: value" lines to a stream, at most once per interval per name.
+
+    Methods:
+        emit(name, value):
+            Writes the value if the interval for this name has passed.
+    """
+    def __init__(self, interval, stream=None):
+        """
+        Args:
+            interval: The minimum number of seconds between two lines for the same name.
+            stream: The stream to write to (stdout if None).
+        """
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stdout
+        self._last = {}
+
+    def emit(self, name, value):
+        """
+        Writes the value if the interval for this name has passed.
+
+        Args:
+            name: The name of the metric.
+            value: The value to report.
+
+        Returns:
+            True if a line was written.
+        """
+        now = time.monotonic()
+        if now - self._last.get(name, -self.interval) < self.interval:
+            return False
+        self._last[name] = now
+        self.stream.write(f"{name}: {value}\n")
+        return True
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""
+text_cache.py
+
+This module contains helpers that avoid re-rendering text every frame.
+
+TextCache:
+- Caches rendered text surfaces keyed by (font, text, color), evicting the least
+  recently used ones once it holds more than its capacity.
+
+NumberText:
+- Renders a label followed by a number (e.g. "Score: 1234") by composing
+  pre-rendered digit glyphs, so a changing number never calls font.render.
+
+load_font:
+- Loads a system font by name, caching where it was found, so later starts
+  skip scanning the system's fonts (pygame.font.SysFont scans them all, which
+  can take seconds).
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import json
+import os
+from collections import OrderedDict
+
+import pygame
+
+import settings
+
+class TextCache:
+    """
+    An LRU cache of rendered text surfaces.
+
+    Methods:
+        render(font, text, color):
+            Returns the rendered text, rendering it only on a cache miss.
+    """
+    def __init__(self, capacity=settings.TEXT_CACHE_SIZE):
+        """
+        Args:
+            capacity: The maximum number of surfaces kept in the cache.
+        """
+        self.capacity = capacity
+        self._cache = OrderedDict()
+
+    def render(self, font, text, color):
+        """
+        Returns the rendered (antialiased) text, rendering it only on a cache miss.
+
+        Args:
+            font: The pygame Font to render with.
+            text: The string to render.
+            color: The text color, as an (r, g, b) tuple.
+        """
+        key = (font, text, color)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self._cache.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self._cache[key] = surface
+        if len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+        return surface
+
+
+class NumberText:
+    """
+    Renders a fixed label followed by a number from pre-rendered glyphs.
+
+    The composed surface is kept until the number changes, so drawing an
+    unchanged score costs a single blit.
+
+    Methods:
+        render(value):
+            Returns a surface showing the label and the value.
+    """
+    def __init__(self, font, color, label=""):
+        """
+        Pre-renders the label and the digit glyphs.
+
+        Args:
+            font: The pygame Font to render with.
+            color: The text color, as an (r, g, b) tuple.
+            label: The text drawn before the number (e.g. "Score: ").
+        """
+        self._label = font.render(label, True, color)
+        self._glyphs = {character: font.render(character, True, color) for character in "0123456789-"}
+        self._height = max(glyph.get_height() for glyph in (self._label, *self._glyphs.values()))
+        self._value = None
+        self._surface = None
+
+    def render(self, value):
+        """
+        Returns a surface showing the label and the value.
+
+        Args:
+            value: The integer to display.
+        """
+        if value == self._value:
+            return self._surface
+
+        glyphs = [self._glyphs[character] for character in str(value)]
+        width = self._label.get_width() + sum(glyph.get_width() for glyph in glyphs)
+        surface = pygame.Surface((width, self._height), pygame.SRCALPHA)
+
+        surface.blit(self._label, (0, 0))
+        x = self._label.get_width()
+        for glyph in glyphs:
+            surface.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+        self._value = value
+        self._surface = surface
+        return surface
+
+def load_font(name, size, cache_path=settings.FONT_CACHE_PATH):
+    """
+    Loads a system font by name, like pygame.font.SysFont, but only scans the
+    system's fonts the first time a name is looked up: the file found (or
+    that none was) is saved to a cache. Delete the cache to look fonts up
+    again after installing one.
+
+    Args:
+        name: The name of the font (e.g. "Arial").
+        size: The size of the font.
+        cache_path: The JSON file mapping font names to font files.
+
+    Returns:
+        The pygame Font, or pygame's default font if the system has none by
+        that name.
+    """
+    try:
+        with open(cache_path) as file:
+            paths = json.load(file)
+    except (OSError, ValueError):
+        paths = {}
+
+    if name in paths and (paths[name] is None or os.path.isfile(paths[name])):
+        path = paths[name]
+    else:
+        path = paths[name] = pygame.font.match_font(name)
+        try:
+            with open(cache_path + ".tmp", "w") as file:
+                json.dump(paths, file, indent=2)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError:
+            pass  # Look it up again next time
+    return pygame.font.Font(path, size)
@@ -7,6 +7,9 @@ def blit_text_with_anchor(screen, text_surface, anchor, offset=(0, 0)):
         text_surface: The rendered text surface.
         anchor: A tuple (x, y) where x and y are between 0 and 1 (e.g., (0.5, 0.5) for center).
         offset: A tuple (x_offset, y_offset) to adjust the position.
+
+    Returns:
+        The rectangle of the screen drawn to.
     """
     screen_width, screen_height = screen.get_size()
     text_width, text_height = text_surface.get_size()
@@ -16,4 +19,13 @@ def blit_text_with_anchor(screen, text_surface, anchor, offset=(0, 0)):
     y = screen_height * anchor[1] - text_height * anchor[1] + offset[1]
 
     # Draw the text
-    screen.blit(text_surface, (x, y))
\ No newline at end of file
+    return screen.blit(text_surface, (x, y))
+
+def percentile(values, fraction):
+    """
+    Returns the value at the given fraction (0 to 1) of the sorted values.
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
@@ -0,0 +1,113 @@
+"""
+test_assets.py
+
+Checks that the AssetManager keeps its cache within the memory budget: loading
+more images than fit evicts the least recently used ones, and the bytes it
+counts are the pixels the cache really keeps alive (an atlas sheet once while
+any image cut from it is cached, tile regions as copies).
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import pygame
+import pytest
+
+import settings
+from assets import AssetManager, build_atlas
+
+IMAGE_SIZE = (32, 32)
+IMAGE_BYTES = IMAGE_SIZE[0] * IMAGE_SIZE[1] * 4 # Converted with per-pixel alpha
+IMAGES = 12
+BUDGET = 4 * IMAGE_BYTES
+
+@pytest.fixture(autouse=True)
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+def write_images(directory, prefix, count, size=IMAGE_SIZE):
+    """
+    Writes count images of the given size and returns their file names.
+    """
+    names = []
+    for index in range(count):
+        name = f"{prefix}-{index}.png"
+        image = pygame.Surface(size, pygame.SRCALPHA)
+        image.fill((index * 20 % 256, 100, 200, 255))
+        pygame.image.save(image, os.path.join(directory, name))
+        names.append(name)
+    return names
+
+def cached_bytes(manager):
+    """
+    Returns the bytes of pixel data the cache keeps alive: every cached surface
+    that owns its pixels, and every atlas sheet an image is cut from, once.
+    """
+    owners = {}
+    for surface in manager._cache.values():
+        owner = surface.get_parent() or surface
+        owners[id(owner)] = owner
+    return sum(owner.get_width() * owner.get_height() * owner.get_bytesize() for owner in owners.values())
+
+def test_loading_past_budget_evicts(tmp_path):
+    names = write_images(tmp_path, "image", IMAGES)
+    manager = AssetManager(str(tmp_path), budget=BUDGET)
+
+    first = manager.image(names[0])
+    for name in names[1:]:
+        manager.image(name)
+        assert manager.used <= manager.budget
+        assert manager.used == cached_bytes(manager)
+    assert len(manager._cache) == BUDGET // IMAGE_BYTES
+    assert manager.image(names[0]) is not first # Evicted, then loaded again
+
+def test_atlas_sheet_counted_once(tmp_path):
+    names = write_images(tmp_path, "frame", 4)
+    build_atlas(str(tmp_path), names, os.path.join(tmp_path, settings.ATLAS_SUBDIR, "frames.png"))
+    manager = AssetManager(str(tmp_path), budget=BUDGET)
+
+    frames = [manager.image(name) for name in names]
+    sheet = frames[0].get_parent()
+    sheet_bytes = sheet.get_width() * sheet.get_height() * sheet.get_bytesize()
+    assert all(frame.get_parent() is sheet for frame in frames)
+    assert manager.used == sheet_bytes == cached_bytes(manager)
+
+    # Images loaded past the budget evict the frames, and with the last one the sheet
+    for name in write_images(tmp_path, "image", IMAGES):
+        manager.image(name)
+        assert manager.used <= manager.budget
+        assert manager.used == cached_bytes(manager)
+    assert not manager._sheets
+    assert manager.image(names[0]).get_parent() is not sheet
+
+def test_tiles_own_their_pixels(tmp_path):
+    names = write_images(tmp_path, "sheet", 1, size=(64, 32))
+    manager = AssetManager(str(tmp_path), budget=BUDGET)
+
+    tile = manager.tile(names[0], (0, 0, 16, 16))
+    assert tile.get_parent() is None
+    assert manager.used == 64 * 32 * 4 + 16 * 16 * 4 == cached_bytes(manager)
+
+    # The tile outlives its sheet in the cache without keeping the sheet alive
+    for name in write_images(tmp_path, "image", 3):
+        manager.image(name)
+    assert manager.tile(names[0], (0, 0, 16, 16)) is tile
+    assert (names[0], None, True) not in manager._cache
+    assert manager.used <= manager.budget
+    assert manager.used == cached_bytes(manager)
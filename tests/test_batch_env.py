@@ -0,0 +1,67 @@
+"""
+test_batch_env.py
+
+Checks that BatchEnv follows the Box2D path of a Simulation step for step:
+both paths play the level of the same seed with the same mixed left, right and
+jump inputs until the player falls, and must agree on every step.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import numpy as np
+import pytest
+
+from batch_env import BatchEnv
+from simulation import Simulation, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+SEEDS = range(40)
+MAX_STEPS = 3000
+TOLERANCE = 1e-4 # Meters; the paths differ only by single-precision rounding
+CHOICES = (0, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_LEFT | INPUT_JUMP, INPUT_RIGHT | INPUT_JUMP)
+
+def make_inputs(seed):
+    """
+    Returns MAX_STEPS inputs held for 5 to 40 steps at a time, drawn from
+    every combination of moving and jumping.
+    """
+    rng = random.Random(seed)
+    inputs = []
+    while len(inputs) < MAX_STEPS:
+        inputs += [rng.choice(CHOICES)] * rng.randint(5, 40)
+    return inputs[:MAX_STEPS]
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_matches_simulation(seed):
+    simulation = Simulation(seed, background=False)
+    env = BatchEnv(1, seed)
+
+    try:
+        for step, inputs in enumerate(make_inputs(seed)):
+            alive = simulation.step(inputs)
+            env.step(inputs)
+
+            error = np.abs(np.asarray(simulation.player.body.position) - env.position[0]).max()
+            assert error <= TOLERANCE, f"step {step}: positions {error:.2e} m apart"
+            assert env.grounded[0] == simulation.player.grounded, f"step {step}: grounded differs"
+            assert env.done[0] == (not alive), f"step {step}: only one path ended"
+            if not alive:
+                break
+        assert env.score[0] == simulation.score
+        assert env.frame[0] == simulation.frame
+    finally:
+        simulation.close()
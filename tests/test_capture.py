@@ -0,0 +1,127 @@
+"""
+test_capture.py
+
+Checks the PDCF capture format: frames captured to a raw file read back as the
+pixels that were on the surface, converting a raw capture gives the same PNG
+images as capturing them directly, and capturing a replay gives the same
+capture every time.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import glob
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import numpy as np
+import pygame
+import pytest
+
+import settings
+from capture import EXTENSION, HEADER, MAGIC, VERSION, FrameCapture, capture_replay, export_png, read_capture
+from headless import run_headless
+
+SIZE = (37, 21) # An odd width, so rows may be padded
+FRAMES = 6
+REPLAY_FRAMES = 60
+
+def frames():
+    """
+    Returns FRAMES surfaces of random pixels, in the display's pixel format.
+    """
+    rng = np.random.default_rng(0)
+    surfaces = []
+    for _ in range(FRAMES):
+        surface = pygame.Surface(SIZE, depth=32)
+        pygame.surfarray.blit_array(surface, rng.integers(0, 256, (*SIZE, 3), dtype=np.uint8))
+        surfaces.append(surface)
+    return surfaces
+
+def rgb(surface):
+    """
+    Returns a surface's pixels as a (height, width, 3) array.
+    """
+    return pygame.surfarray.array3d(surface).transpose(1, 0, 2)
+
+def png_files(directory):
+    """
+    Returns the PNG images in a directory by name.
+    """
+    return {os.path.basename(path): open(path, "rb").read()
+            for path in sorted(glob.glob(os.path.join(directory, "*.png")))}
+
+@pytest.fixture
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+def test_raw_capture_round_trip(tmp_path, display):
+    surfaces = frames()
+    path = str(tmp_path / f"frames{EXTENSION}")
+    capture = FrameCapture(path, surfaces[0], buffers=2, block=True)
+    for index, surface in enumerate(surfaces):
+        assert capture.capture(surface, seconds=index / 60)
+    capture.close()
+
+    read = list(read_capture(path))
+    assert [(index, seconds) for index, seconds, _ in read] == [(index, index / 60) for index in range(FRAMES)]
+    for (_, _, pixels), surface in zip(read, surfaces):
+        assert np.array_equal(pixels, rgb(surface))
+
+def test_converted_capture_matches_png_capture(tmp_path, display):
+    surfaces = frames()
+    path = str(tmp_path / f"frames{EXTENSION}")
+    for target in (path, str(tmp_path / "direct")):
+        capture = FrameCapture(target, surfaces[0], block=True)
+        for surface in surfaces:
+            capture.capture(surface)
+        capture.close()
+
+    assert export_png(path, str(tmp_path / "converted")) == FRAMES
+    converted = png_files(tmp_path / "converted")
+    assert len(converted) == FRAMES
+    assert converted == png_files(tmp_path / "direct")
+
+    # The images decode to the captured pixels
+    for name, surface in zip(sorted(converted), surfaces):
+        assert np.array_equal(rgb(pygame.image.load(str(tmp_path / "converted" / name))), rgb(surface))
+
+@pytest.mark.parametrize("header, message", [
+    (HEADER.pack(b"PDRP", VERSION, *SIZE, SIZE[0] * 4, 4, 0, 0, 0, 0), "is not a capture file"),
+    (HEADER.pack(MAGIC, VERSION + 1, *SIZE, SIZE[0] * 4, 4, 0, 0, 0, 0), "unsupported capture version"),
+])
+def test_rejects_other_files(tmp_path, header, message):
+    path = tmp_path / f"other{EXTENSION}"
+    path.write_bytes(header)
+    with pytest.raises(ValueError, match=message):
+        list(read_capture(str(path)))
+
+def test_replay_capture_is_deterministic(tmp_path):
+    run_headless(REPLAY_FRAMES, seed=3, record=str(tmp_path / "replays"))
+    replay, = glob.glob(str(tmp_path / "replays" / "*.pdr"))
+
+    first = capture_replay(replay, str(tmp_path / f"first{EXTENSION}"))
+    second = capture_replay(replay, str(tmp_path / f"second{EXTENSION}"))
+    direct = capture_replay(replay, str(tmp_path / "direct"))
+    assert first["captured"] == second["captured"] == direct["captured"] == REPLAY_FRAMES
+    assert (tmp_path / f"first{EXTENSION}").read_bytes() == (tmp_path / f"second{EXTENSION}").read_bytes()
+
+    # One frame per physics step, timed by the simulation
+    read = list(read_capture(str(tmp_path / f"first{EXTENSION}")))
+    assert [seconds for _, seconds, _ in read] == [frame * settings.PHYSICS_STEP for frame in range(1, REPLAY_FRAMES + 1)]
+
+    export_png(str(tmp_path / f"first{EXTENSION}"), str(tmp_path / "converted"))
+    assert png_files(tmp_path / "converted") == png_files(tmp_path / "direct")
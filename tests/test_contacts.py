@@ -0,0 +1,58 @@
+"""
+test_contacts.py
+
+Checks that the ContactListener looks players up by their body's index when
+several players share one world: each player's grounded flag follows that
+player's own contacts with the platforms, whatever the other players touch.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import pytest
+
+from headless import BOTS
+from simulation import Simulation
+
+PLAYERS = 3
+STEPS = 1500
+
+def touching(player):
+    """
+    Returns the number of platforms a player's body touches.
+    """
+    return sum(1 for edge in player.body.contacts if edge.contact.touching)
+
+@pytest.mark.parametrize("seed", [1, 4, 7])
+def test_grounded_follows_own_contacts(seed):
+    simulation = Simulation(seed, background=False, players=PLAYERS)
+    # Two players climbing on their own, and one standing still
+    bots = [BOTS["climber"](seed, 0), BOTS["climber"](seed, 1), BOTS["idle"](seed, 2)]
+    grounded = {index: set() for index in range(PLAYERS)}
+    differed = False
+    try:
+        for step in range(STEPS):
+            if not simulation.step([bot(simulation) for bot in bots]):
+                break
+            for player in simulation.living:
+                count = touching(player)
+                if count <= 1: # With two platforms, leaving one clears the flag
+                    assert player.grounded == (count == 1), (step, player.index)
+                grounded[player.index].add(player.grounded)
+            states = {player.grounded for player in simulation.living}
+            differed = differed or len(states) > 1
+    finally:
+        simulation.close()
+
+    # Every player landed and took off again, not always together
+    assert all(flags == {True, False} for flags in grounded.values())
+    assert differed
@@ -0,0 +1,114 @@
+"""
+test_ghosts.py
+
+Checks the PDGH ghost format: files written by a GhostWriter parse back to the
+recorded header and positions, files that aren't ghosts are skipped or
+rejected, saving keeps the best runs on a seed, and a GhostRace interpolates
+every ghost's recorded positions across window refills.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import numpy as np
+import pytest
+
+from ghosts import (EXTENSION, HEADER, MAGIC, VERSION, GhostRace, GhostTrack, GhostWriter,
+                    ghost_files, load_ghosts, read_header, save_ghost)
+
+def trajectory(frame):
+    """
+    A made-up position of the player after a step.
+    """
+    return 5 + np.sin(frame / 30), 2 + frame / 20
+
+def write_ghost(path, seed, score, frames, interval=4):
+    """
+    Records a session of the given number of steps and saves it as a ghost.
+    """
+    writer = GhostWriter(seed, interval)
+    for frame in range(1, frames + 1):
+        writer.record(frame, *trajectory(frame))
+    writer.save(str(path), score)
+    return str(path)
+
+def test_round_trip(tmp_path):
+    path = write_ghost(tmp_path / f"run{EXTENSION}", 2 ** 64 - 1, 123, 1001)
+    track = GhostTrack(path)
+    try:
+        assert (track.seed, track.score, track.frames, track.interval) == (2 ** 64 - 1, 123, 1001, 4)
+        frames = list(range(4, 1001, 4)) + [1001] # Every interval, and the last step
+        assert track.records["frame"].tolist() == frames
+        x, y = trajectory(np.array(frames))
+        assert np.array_equal(track.records["x"], x.astype(np.float32))
+        assert np.array_equal(track.records["y"], y.astype(np.float32))
+    finally:
+        track.close()
+
+@pytest.mark.parametrize("data, message", [
+    (b"PDGH", "is not a ghost file"),
+    (HEADER.pack(b"PDRP", VERSION, 1, 10, 100, 4), "is not a ghost file"),
+    (HEADER.pack(MAGIC, VERSION, 1, 10, 100, 0), "is not a ghost file"),
+    (HEADER.pack(MAGIC, VERSION + 1, 1, 10, 100, 4), "unsupported ghost version"),
+])
+def test_rejects_other_files(tmp_path, data, message):
+    path = tmp_path / f"other{EXTENSION}"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match=message):
+        read_header(str(path))
+    with pytest.raises(ValueError, match=message):
+        GhostTrack(str(path))
+
+def test_rejects_single_record(tmp_path):
+    path = write_ghost(tmp_path / f"short{EXTENSION}", 1, 0, 3)
+    with pytest.raises(ValueError, match="fewer than two positions"):
+        GhostTrack(path)
+
+def test_lists_ghosts_on_the_seed(tmp_path):
+    write_ghost(tmp_path / f"a{EXTENSION}", 7, 10, 100)
+    write_ghost(tmp_path / f"b{EXTENSION}", 7, 30, 100)
+    write_ghost(tmp_path / f"c{EXTENSION}", 8, 50, 100)
+    write_ghost(tmp_path / "d.pdr", 7, 60, 100) # Not a ghost's extension
+    (tmp_path / f"e{EXTENSION}").write_bytes(b"not a ghost")
+
+    found = ghost_files([str(tmp_path), str(tmp_path / "missing")], 7)
+    assert [(score, os.path.basename(path)) for score, path in found] == [(30, f"b{EXTENSION}"), (10, f"a{EXTENSION}")]
+    tracks = load_ghosts([str(tmp_path)], 7, count=1)
+    assert [track.score for track in tracks] == [30]
+    tracks[0].close()
+
+def test_save_keeps_the_best(tmp_path):
+    saved = []
+    for score in (10, 40, 20, 30, 5):
+        writer = GhostWriter(3, 4)
+        for frame in range(1, 50):
+            writer.record(frame, *trajectory(frame))
+        saved.append(save_ghost(writer, score, str(tmp_path), keep=3))
+
+    assert saved[-1] is None # Worse than the three kept
+    assert [score for score, _ in ghost_files([str(tmp_path)], 3)] == [40, 30, 20]
+
+def test_race_interpolates_records(tmp_path):
+    tracks = [GhostTrack(write_ghost(tmp_path / f"{frames}{EXTENSION}", 1, frames, frames, interval))
+              for frames, interval in ((500, 4), (97, 4), (300, 1))]
+    expected = [(track.records["frame"].copy(), track.records["x"].copy(), track.records["y"].copy(), track.frames)
+                for track in tracks]
+    race = GhostRace(tracks, window=8) # Small, so the windows are refilled often
+
+    # Forwards, then rewound
+    for frame in [*np.arange(0, 520, 0.25), *np.arange(300, 0, -0.5)]:
+        x, y, running = race.positions(frame)
+        for ghost, (frames, xs, ys, last) in enumerate(expected):
+            assert x[ghost] == pytest.approx(np.interp(frame, frames, xs), abs=1e-6)
+            assert y[ghost] == pytest.approx(np.interp(frame, frames, ys), abs=1e-6)
+            assert running[ghost] == (frame <= last)
+    race.close()
@@ -0,0 +1,130 @@
+"""
+test_highscores.py
+
+Checks the high score store and its uploads: the store keeps the leaderboard
+order and the offline queue across restarts, HighScores keeps its in-memory
+leaderboard in step with the store, and the worker thread uploads every run
+once, backing off while the leaderboard server fails.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import pytest
+
+import settings
+from highscores import HighScores, LeaderboardServer, ScoreStore
+
+TIMEOUT = 10 # Seconds a test waits for the worker thread or the server
+
+@pytest.fixture
+def server():
+    server = LeaderboardServer().start()
+    yield server
+    server.close()
+
+def wait_until(condition):
+    """
+    Waits for a condition to hold, failing the test after TIMEOUT seconds.
+    """
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def unused_url():
+    """
+    Returns a leaderboard URL nothing listens on.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/runs"
+
+def test_store_orders_and_queues_runs(tmp_path):
+    path = str(tmp_path / "scores.db")
+    store = ScoreStore(path)
+    store.add([(10, 1, 100, 1.0), (30, 2, 300, 2.0), (10, 3, 120, 3.0), (20, 4, 200, 4.0)])
+
+    assert store.count() == 4
+    assert [run[0] for run in store.top(3)] == [30, 20, 10]
+    assert store.top()[-2:] == [(10, 1, 100, 1.0), (10, 3, 120, 3.0)] # Earliest first among ties
+    pending = store.pending(2)
+    assert [row[1:] for row in pending] == [(10, 1, 100, 1.0), (30, 2, 300, 2.0)]
+    store.mark_uploaded([row[0] for row in pending])
+    client = store.client
+    store.close()
+
+    # The client id and the upload queue survive a restart
+    store = ScoreStore(path)
+    assert store.client == client
+    assert [row[1] for row in store.pending()] == [10, 20]
+    store.close()
+
+def test_leaderboard_matches_store(tmp_path):
+    path = str(tmp_path / "scores.db")
+    scores = HighScores(path)
+    for score in (5, 50, 25, 50, 1) + tuple(range(100, 112)):
+        scores.submit(score, 7, score * 10)
+    assert scores.flush(TIMEOUT)
+
+    top = scores.top()
+    assert len(top) == settings.HIGH_SCORE_TOP
+    assert [run[0] for run in top] == list(range(111, 101, -1))
+    assert scores.rank(1000) == 1
+    assert scores.rank(105) == 8 # After the run it ties with
+    assert scores.rank(0) is None
+    scores.close()
+
+    # A new session loads the same leaderboard from the store
+    scores = HighScores(path)
+    assert scores.top() == top
+    scores.close()
+
+def test_uploads_every_run_once(tmp_path, server):
+    scores = HighScores(str(tmp_path / "scores.db"), endpoint=server.url())
+    for index in range(2 * settings.HIGH_SCORE_BATCH + 3):
+        scores.submit(index, 1, 100)
+    wait_until(lambda: server.count() == 2 * settings.HIGH_SCORE_BATCH + 3)
+    scores.close()
+    assert server.count() == 2 * settings.HIGH_SCORE_BATCH + 3
+
+def test_backs_off_while_server_fails(tmp_path, server):
+    server.fail = 10 ** 6
+    scores = HighScores(str(tmp_path / "scores.db"), endpoint=server.url(), retry=(0.05, 0.2))
+    scores.submit(10, 1, 100)
+    time.sleep(1)
+
+    # Delays of 0.025 to 0.05, 0.05 to 0.1, then 0.1 to 0.2 seconds (with jitter):
+    # 6 to 12 requests in a second, not the hundreds retrying at once would make
+    assert 3 <= server.requests <= 15
+    assert server.count() == 0
+
+    # Uploads resume once the server recovers
+    server.fail = 0
+    wait_until(lambda: server.count() == 1)
+    scores.close()
+
+def test_offline_runs_upload_after_restart(tmp_path, server):
+    path = str(tmp_path / "scores.db")
+    scores = HighScores(path, endpoint=unused_url(), retry=(0.01, 0.05))
+    scores.submit(10, 1, 100)
+    scores.submit(20, 2, 200)
+    assert scores.flush(TIMEOUT)
+    scores.close()
+    assert server.count() == 0
+
+    scores = HighScores(path, endpoint=server.url())
+    wait_until(lambda: server.count() == 2)
+    scores.close()
@@ -0,0 +1,68 @@
+"""
+test_replay.py
+
+Checks the PDRP replay format: inputs written by a ReplayWriter read back
+unchanged, files that aren't current replays are rejected, and replaying a
+recorded session plays it out exactly as it was played.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import glob
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import pytest
+
+from headless import run_headless
+from replay import HEADER, MAGIC, MAX_RUN, VERSION, ReplayWriter, play_replay, read_replay
+from simulation import INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP
+
+def test_inputs_round_trip(tmp_path):
+    rng = random.Random(0)
+    inputs = [rng.choice((0, INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP, INPUT_LEFT | INPUT_JUMP))
+              for _ in range(5000) for _ in range(rng.randint(1, 20))]
+    inputs += [INPUT_RIGHT] * (2 * MAX_RUN + 7) # Longer than a run can hold
+    path = str(tmp_path / "session.pdr")
+
+    with ReplayWriter(path, 2 ** 63 - 1) as writer:
+        for bitmask in inputs:
+            writer.record(bitmask)
+    seed, replayed = read_replay(path)
+
+    assert seed == 2 ** 63 - 1
+    assert list(replayed) == inputs
+
+def test_empty_replay(tmp_path):
+    path = str(tmp_path / "empty.pdr")
+    ReplayWriter(path, 5).close()
+    seed, replayed = read_replay(path)
+    assert seed == 5
+    assert list(replayed) == []
+
+@pytest.mark.parametrize("header, message", [
+    (HEADER.pack(b"PDGH", VERSION, 1), "is not a replay"),
+    (HEADER.pack(MAGIC, VERSION - 1, 1), "unsupported replay version"),
+])
+def test_rejects_other_files(tmp_path, header, message):
+    path = tmp_path / "other.pdr"
+    path.write_bytes(header)
+    with pytest.raises(ValueError, match=message):
+        read_replay(str(path))
+
+@pytest.mark.parametrize("seed, bot", [(3, "climber"), (7, "random"), (11, "climber")])
+def test_replay_plays_out_the_session(tmp_path, seed, bot):
+    recorded = run_headless(3000, seed=seed, bot=bot, record=str(tmp_path))
+    path, = glob.glob(str(tmp_path / "*.pdr"))
+    replayed = play_replay(path)
+
+    for key in ("seed", "score", "frames", "died", "cause"):
+        assert replayed[key] == recorded[key]
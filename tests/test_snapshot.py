@@ -0,0 +1,125 @@
+"""
+test_snapshot.py
+
+Checks that PDSS snapshots restore a Simulation exactly: a session restored
+from a snapshot (in place, or into another Simulation) plays the same inputs
+step for step like the session the snapshot was taken from, and captures the
+same state again.
+
+Author:     DevXCVIII
+Date:       March 24, 2025
+"""
+
+# Imports
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
+
+import pytest
+
+from headless import BOTS
+from simulation import Simulation
+from snapshot import RewindBuffer, capture, restore
+
+SEEDS = range(12)
+MAX_STEPS = 2000
+REPLAYED_STEPS = 400
+SNAPSHOTS = 3
+SNAPSHOT_INTERVAL = 25
+
+def play(simulation, inputs):
+    """
+    Steps a simulation through inputs, and returns its state after every step.
+    """
+    states = []
+    for bitmask in inputs:
+        alive = simulation.step(bitmask)
+        body = simulation.player.body
+        states.append((tuple(body.position), body.angle, tuple(body.linearVelocity),
+                       simulation.player.grounded, simulation.camera_offset, simulation.score, alive))
+        if not alive:
+            break
+    return states
+
+def record_session(seed):
+    """
+    Plays a session with the climber bot, capturing a snapshot every
+    SNAPSHOT_INTERVAL steps. Returns the simulation, its inputs and a few of
+    the snapshots (picked at random) by step.
+    """
+    simulation = Simulation(seed, background=False)
+    bot = BOTS["climber"](seed)
+    inputs = []
+    snapshots = {}
+    for step in range(MAX_STEPS):
+        if step % SNAPSHOT_INTERVAL == 0:
+            snapshots[step] = capture(simulation)
+        inputs.append(bot(simulation))
+        if not simulation.step(inputs[-1]):
+            break
+    steps = random.Random(seed).sample(sorted(snapshots), min(SNAPSHOTS, len(snapshots)))
+    return simulation, inputs, {step: snapshots[step] for step in steps}
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_restore_plays_like_the_original(seed):
+    simulation, inputs, snapshots = record_session(seed)
+    try:
+        for step, data in snapshots.items():
+            reference = Simulation(seed, background=False)
+            play(reference, inputs[:step])
+            expected = play(reference, inputs[step:step + REPLAYED_STEPS])
+            reference.close()
+
+            # In place, from the end of the session
+            restore(simulation, data)
+            assert capture(simulation) == data
+            assert play(simulation, inputs[step:step + REPLAYED_STEPS]) == expected
+
+            # Into another session, on another seed
+            other = Simulation(seed + 1000, background=False)
+            restore(other, data)
+            assert other.seed == seed
+            assert play(other, inputs[step:step + REPLAYED_STEPS]) == expected
+            other.close()
+    finally:
+        simulation.close()
+
+def test_rewind_restores_earlier_snapshots():
+    simulation = Simulation(3, background=False)
+    bot = BOTS["climber"](3)
+    rewind = RewindBuffer(capacity=50)
+    snapshots = []
+    for _ in range(80):
+        rewind.push(simulation)
+        snapshots.append(capture(simulation))
+        simulation.step(bot(simulation))
+
+    assert len(rewind) == 50
+    assert rewind.rewind(simulation, 10)
+    assert capture(simulation) == snapshots[-10]
+    assert len(rewind) == 41
+    assert rewind.rewind(simulation, 100) # Back to the oldest snapshot kept
+    assert capture(simulation) == snapshots[-50]
+    rewind.clear()
+    assert not rewind.rewind(simulation)
+    simulation.close()
+
+def test_rejects_other_data():
+    simulation = Simulation(3, background=False)
+    data = capture(simulation)
+    with pytest.raises(ValueError, match="not a simulation snapshot"):
+        restore(simulation, b"PDRP" + data[4:])
+    with pytest.raises(ValueError, match="unsupported snapshot version"):
+        restore(simulation, data[:4] + bytes([data[4] + 1]) + data[5:])
+    simulation.close()
+
+def test_rejects_shared_sessions():
+    simulation = Simulation(3, background=False, players=2)
+    with pytest.raises(ValueError, match="several players"):
+        capture(simulation)
+    simulation.close()